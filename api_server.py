@@ -0,0 +1,253 @@
+"""
+Headless async HTTP API for resume extraction and the saved-resume store
+
+Usage:
+    python api_server.py                      # or: uvicorn api_server:app --workers 4
+
+Endpoints:
+    GET  /health                  Liveness check
+    POST /extract                 Multipart upload of one resume ("file": PDF, DOCX, RTF, HTML or
+                                  plain text, detected from the content); returns the outcome and
+                                  saved record. With ?background=true the upload is queued as a
+                                  background job and 202 is returned with the job id
+    GET  /jobs/{job_id}           Status and result of a background job; while it runs, "partial"
+                                  holds the resume sections streamed from the model so far
+    POST /jobs/{job_id}/retry     Run a failed background job again (409 if it is not failed);
+                                  failed jobs are otherwise only rerun when uploaded again
+    POST /extract/batch           Multipart upload of several resumes ("files"); streams one NDJSON
+                                  line per document as soon as it finishes
+    GET  /resumes                 Saved resume summaries, filtered by ?skill=...&match=all|any
+                                  with ?limit= and ?offset= pagination
+    GET  /resumes/{record}        Full structured record of one saved resume
+    GET  /resumes/{record}/similar
+                                  Saved resumes most similar to this one, with ?limit=
+    POST /match                   JSON {"job_description": ..., "limit": ...}; saved resumes
+                                  ranked by TF-IDF similarity to the job description
+    GET  /metrics                 Pipeline metrics of this worker process in the Prometheus text
+                                  format (?format=json for a JSON snapshot)
+
+Requests larger than API_MAX_REQUEST_MB are rejected with 413 while the body is still
+being received, and each uploaded file is limited to API_MAX_FILE_MB. Every worker
+process has its own Gemini rate limiter, so GEMINI_RPM/GEMINI_TPM apply per worker.
+"""
+import os
+import json
+import asyncio
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from resume_pipeline import process_document
+from document_parser import detect_format, UnsupportedFormatError
+from resume_store import get_resume_store
+from job_queue import get_job_manager
+from metrics import get_metrics, render_prometheus
+
+HOST = os.getenv("API_HOST", "0.0.0.0")
+PORT = int(os.getenv("API_PORT", "8000"))
+WORKERS = int(os.getenv("API_WORKERS", "2"))
+
+MAX_REQUEST_BYTES = int(float(os.getenv("API_MAX_REQUEST_MB", "100")) * 1024 * 1024)
+MAX_FILE_BYTES = int(float(os.getenv("API_MAX_FILE_MB", "10")) * 1024 * 1024)
+MAX_BATCH_FILES = int(os.getenv("API_MAX_BATCH_FILES", "50"))
+# Documents of one batch request processed at the same time
+BATCH_CONCURRENCY = int(os.getenv("API_BATCH_CONCURRENCY", "4"))
+MAX_PAGE_SIZE = 500
+
+class BodySizeLimitMiddleware:
+    """ASGI middleware rejecting request bodies over max_bytes with 413, without buffering them first"""
+
+    def __init__(self, app, max_bytes: int = MAX_REQUEST_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_bytes:
+                await JSONResponse({"error": "Request body too large"}, status_code=413)(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail="Request body too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+async def _read_upload(upload) -> tuple:
+    """Validate an uploaded form file and return (filename, content)"""
+    if not isinstance(upload, UploadFile):
+        raise HTTPException(status_code=400, detail="Expected a file upload")
+    content = await upload.read(MAX_FILE_BYTES + 1)
+    if len(content) > MAX_FILE_BYTES:
+        raise HTTPException(status_code=413, detail=f"File {upload.filename} exceeds {MAX_FILE_BYTES} bytes")
+    try:
+        detect_format(content)
+    except UnsupportedFormatError:
+        raise HTTPException(status_code=415, detail=f"File {upload.filename} is not a supported document format")
+    return upload.filename or "upload", content
+
+def _with_record(result: dict) -> dict:
+    """Attach the saved structured record to a pipeline outcome"""
+    record = result.get("record")
+    if record:
+        return {**result, "resume": get_resume_store().get_resume(record)}
+    return result
+
+async def _extract_one(filename: str, content: bytes) -> dict:
+    try:
+        result = await run_in_threadpool(process_document, filename, content)
+    except Exception as e:
+        print(f"Error processing {filename}: {str(e)}")
+        result = {"status": "failed", "error": str(e) or type(e).__name__}
+    return {"filename": filename, **await run_in_threadpool(_with_record, result)}
+
+async def _form(request: Request, max_files: int):
+    try:
+        return await request.form(max_files=max_files)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid multipart body: {str(e)}")
+
+# Endpoints
+
+async def health(request: Request):
+    return JSONResponse({"status": "ok"})
+
+async def extract(request: Request):
+    form = await _form(request, max_files=1)
+    try:
+        filename, content = await _read_upload(form.get("file"))
+    finally:
+        await form.close()
+    if request.query_params.get("background", "").lower() in ("1", "true", "yes"):
+        job_id = await run_in_threadpool(get_job_manager().submit, content, filename, True)
+        return JSONResponse({"job_id": job_id, "status_url": f"/jobs/{job_id}"}, status_code=202)
+    return JSONResponse(await _extract_one(filename, content))
+
+async def job_status(request: Request):
+    job = await run_in_threadpool(get_job_manager().get, request.path_params["job_id"])
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["result"]:
+        job["result"] = await run_in_threadpool(_with_record, job["result"])
+    return JSONResponse(job)
+
+async def retry_job(request: Request):
+    job_id = request.path_params["job_id"]
+    if not await run_in_threadpool(get_job_manager().retry, job_id):
+        raise HTTPException(status_code=409, detail="Job is not a failed job that can be retried")
+    return JSONResponse({"job_id": job_id, "status_url": f"/jobs/{job_id}"}, status_code=202)
+
+async def extract_batch(request: Request):
+    form = await _form(request, max_files=MAX_BATCH_FILES)
+    try:
+        uploads = [await _read_upload(upload) for upload in form.getlist("files")]
+    finally:
+        await form.close()
+    if not uploads:
+        raise HTTPException(status_code=400, detail="No files uploaded under 'files'")
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run(index: int, filename: str, content: bytes) -> dict:
+        async with semaphore:
+            return {"index": index, **await _extract_one(filename, content)}
+
+    async def results():
+        tasks = [asyncio.create_task(run(index, *upload)) for index, upload in enumerate(uploads)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished, ensure_ascii=False) + "\n"
+        finally:
+            # Client went away: drop documents that have not started yet
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+async def list_resumes(request: Request):
+    params = request.query_params
+    skills = [skill for skill in params.getlist("skill") if skill.strip()]
+    match_all = params.get("match", "all").lower() != "any"
+    try:
+        limit = min(int(params.get("limit", 100)), MAX_PAGE_SIZE)
+        offset = max(int(params.get("offset", 0)), 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="limit and offset must be integers")
+    resumes = await run_in_threadpool(get_resume_store().list_resumes, skills or None, limit, offset, match_all)
+    return JSONResponse({"resumes": resumes, "limit": limit, "offset": offset})
+
+async def get_resume(request: Request):
+    resume = await run_in_threadpool(get_resume_store().get_resume, request.path_params["record"])
+    if resume is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return JSONResponse(resume)
+
+def _limit(params, default: int = 10) -> int:
+    try:
+        return max(min(int(params.get("limit", default)), MAX_PAGE_SIZE), 1)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="limit must be an integer")
+
+async def similar_resumes(request: Request):
+    store = get_resume_store()
+    record = request.path_params["record"]
+    if not await run_in_threadpool(store.has_resume, record):
+        raise HTTPException(status_code=404, detail="Resume not found")
+    matches = await run_in_threadpool(store.similar_resumes, "", record, _limit(request.query_params))
+    return JSONResponse({"resumes": matches})
+
+async def match(request: Request):
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON object")
+    if not isinstance(body, dict) or not str(body.get("job_description") or "").strip():
+        raise HTTPException(status_code=400, detail="job_description is required")
+    matches = await run_in_threadpool(get_resume_store().similar_resumes, str(body["job_description"]), None, _limit(body))
+    return JSONResponse({"resumes": matches})
+
+async def metrics(request: Request):
+    if request.query_params.get("format") == "json":
+        return JSONResponse(get_metrics().snapshot())
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+async def http_error(request: Request, exc: HTTPException):
+    return JSONResponse({"error": exc.detail}, status_code=exc.status_code)
+
+routes = [
+    Route("/health", health),
+    Route("/extract", extract, methods=["POST"]),
+    Route("/extract/batch", extract_batch, methods=["POST"]),
+    Route("/jobs/{job_id}", job_status),
+    Route("/jobs/{job_id}/retry", retry_job, methods=["POST"]),
+    Route("/resumes", list_resumes),
+    Route("/resumes/{record}", get_resume),
+    Route("/resumes/{record}/similar", similar_resumes),
+    Route("/match", match, methods=["POST"]),
+    Route("/metrics", metrics),
+]
+
+app = BodySizeLimitMiddleware(Starlette(routes=routes, exception_handlers={HTTPException: http_error}))
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("api_server:app", host=HOST, port=PORT, workers=WORKERS)
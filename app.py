@@ -2,262 +2,271 @@
 Main Streamlit application file for Resume Skill Extractor
 """
 import streamlit as st
-from pdf_parser import extract_text_from_pdf
-from llm_extractor import extract_structured_data, extract_contact_info, is_valid_resume
-import json
+from extraction_cache import get_extraction_cache
+from resume_store import get_resume_store
+from document_parser import supported_extensions
+from job_queue import get_job_manager, ACTIVE_STATUSES, STATUS_FAILED
 import os
-import io
-import uuid
-import re
+import time
+from html import escape
 
 DATA_DIR = "resumes_data"
 
+# Seconds between status checks while an upload is being processed in the background
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.5"))
+# Shorter interval while a job is extracting, so streamed sections appear promptly
+JOB_PARTIAL_POLL_INTERVAL = float(os.getenv("JOB_PARTIAL_POLL_INTERVAL", "0.5"))
+
 # Create data directory if it doesn't exist
 os.makedirs('resumes_data', exist_ok=True)
 
-def sanitize_filename(filename: str) -> str:
-    """Sanitize filename by removing special characters and replacing spaces with underscores"""
-    # Remove special characters, keep only alphanumeric, dots, and underscores
-    sanitized = re.sub(r'[^a-zA-Z0-9._]', '', filename)
-    # Replace spaces with underscores
-    sanitized = sanitized.replace(' ', '_')
-    return sanitized
+# Styles for the pre-rendered resume fragments, injected once per page run
+RESUME_CSS = """
+<style>
+.section-header {
+    font-size: 1.2em;
+    color: #f1c40f; /* bright yellow for good contrast */
+    margin-top: 20px;
+    margin-bottom: 10px;
+}
 
-def save_extracted_data(data_to_save: dict, original_pdf_filename: str, raw_text: str) -> bool:
-    """Save extracted resume data to JSON file"""
-    try:
-        # Add raw text to the data
-        data_with_text = data_to_save.copy()
-        data_with_text['raw_text'] = raw_text
-        
-        # Generate sanitized filename
-        sanitized_name = sanitize_filename(original_pdf_filename)
-        json_filename = f"{sanitized_name}_{uuid.uuid4()}.json"
-        full_path = os.path.join(DATA_DIR, json_filename)
-        
-        # Write JSON file
-        with open(full_path, 'w', encoding='utf-8') as f:
-            json.dump(data_with_text, f, indent=2, ensure_ascii=False)
-        
-        return True
-    except Exception as e:
-        print(f"Error saving data: {str(e)}")
-        return False
+.entry-header {
+    font-size: 1.1em;
+    color: #1abc9c; /* light teal for variety and contrast */
+    margin-bottom: 5px;
+}
 
-def load_all_saved_resumes() -> list:
-    """Load all saved resume data from JSON files"""
+.field-label {
+    font-weight: bold;
+    color: #ecf0f1; /* very light gray for readability */
+}
+</style>
+"""
+
+# Number of resumes listed per page in the saved-resume browser
+PAGE_SIZE = 25
+# Number of resumes listed by job-description matching and "similar resumes"
+SIMILAR_RESULTS = 10
+
+def _field(label: str, value) -> str:
+    return f"<div><span class='field-label'>{label}:</span> {escape(str(value or 'N/A'))}</div>"
+
+def _block(label: str, value) -> str:
+    return f"<div class='field-label'>{label}:</div><p>{escape(str(value or 'N/A'))}</p>"
+
+def render_resume_html(data: dict, partial: bool = False) -> str:
+    """
+    Render a structured resume record as one escaped HTML fragment styled by RESUME_CSS.
+
+    With partial=True only the sections present in data are rendered, for records that
+    are still being extracted.
+    """
+    parts = []
+    if not partial or any(key in data for key in ('name', 'email', 'phone')):
+        parts.append("<div class='section-header'>Personal Information</div>")
+        parts += [_field("Name", data.get('name')), _field("Email", data.get('email')), _field("Phone", data.get('phone')), "<hr>"]
+    
+    if not partial or 'skills' in data:
+        parts.append("<div class='section-header'>Skills</div>")
+        skills = data.get('skills') or []
+        if skills:
+            parts.append("<ul class='skills-list'>" + "".join(f"<li>{escape(str(skill))}</li>" for skill in skills) + "</ul>")
+        parts.append("<hr>")
+    
+    if not partial or 'work_experience' in data:
+        parts.append("<div class='section-header'>Work Experience</div>")
+    for exp in data.get('work_experience') or []:
+        parts.append(f"<div class='entry-header'>{escape(exp.get('company') or 'N/A')} - {escape(exp.get('role') or 'N/A')}</div>")
+        parts += [_field("Dates", exp.get('dates')), _block("Description", exp.get('description')), "<hr>"]
+    
+    if not partial or 'education' in data:
+        parts.append("<div class='section-header'>Education</div>")
+    for edu in data.get('education') or []:
+        parts.append(f"<div class='entry-header'>{escape(edu.get('degree') or 'N/A')} from {escape(edu.get('institution') or 'N/A')}</div>")
+        parts.append(_field("Dates", edu.get('graduation_date')))
+        if edu.get('details'):
+            parts.append(_block("Details", edu['details']))
+        parts.append("<hr>")
+    
+    certifications = data.get('certifications') or []
+    if certifications:
+        parts.append("<div class='section-header'>Certifications</div>")
+        for cert in certifications:
+            parts.append(f"<div class='entry-header'>{escape(cert.get('name') or 'N/A')}</div>")
+            parts += [_field("Issued by", cert.get('issuing_organization')), _field("Date", cert.get('date_obtained'))]
+            if cert.get('details'):
+                parts.append(_block("Details", cert['details']))
+            parts.append("<hr>")
+    return "\n".join(parts)
+
+def display_structured_data(data, partial: bool = False):
+    """Display the structured data as a single pre-rendered HTML fragment; partial data shows only finished sections"""
+    st.subheader("Structured Information")
+    st.markdown(render_resume_html(data, partial), unsafe_allow_html=True)
+
+# Cached store reads. Every function takes the store's data version, which each save bumps,
+# so results are reused across reruns and sessions until a resume is saved anywhere.
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_skill_options(version: int) -> list:
+    """(normalized skill, "label (count)") pairs for the skill filter, most popular first"""
+    return [(skill, f"{label} ({count})") for skill, label, count in get_resume_store().skill_frequencies()]
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def cached_search_page(version: int, query: str, skills: tuple, match_all: bool, page: int) -> tuple:
+    """One page of resume summaries matching the search and skill filter, with the total match count"""
     try:
-        resumes = []
-        # Get all JSON files in the directory
-        json_files = [f for f in os.listdir(DATA_DIR) if f.endswith('.json')]
-        
-        for filename in json_files:
-            try:
-                filepath = os.path.join(DATA_DIR, filename)
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    resume_data = json.load(f)
-                    # Add filename for identification
-                    resume_data['__filename'] = filename
-                    resumes.append(resume_data)
-            except Exception as e:
-                print(f"Warning: Failed to load {filename}: {str(e)}")
-                continue
-        
-        return resumes
+        return get_resume_store().search_resumes(query, list(skills), match_all, PAGE_SIZE, page * PAGE_SIZE)
     except Exception as e:
         print(f"Error loading resumes: {str(e)}")
-        return []
+        return [], 0
 
-def display_structured_data(data):
-    """Display the structured data in a nice format"""
-    # Create a copy of data without raw_text if it exists
-    display_data = {k: v for k, v in data.items() if k != 'raw_text'}
-    
-    st.subheader("Structured Information")
-    
-    st.markdown("""
-    <style>
-    .section-header {
-        font-size: 1.2em;
-        color: #f1c40f; /* bright yellow for good contrast */
-        margin-top: 20px;
-        margin-bottom: 10px;
-    }
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_resume_fragment(version: int, filename: str) -> str | None:
+    """Pre-rendered HTML of one saved resume, or None if it does not exist"""
+    resume_data = get_resume_store().get_resume(filename)
+    if resume_data is None:
+        return None
+    return render_resume_html(resume_data)
 
-    .entry-header {
-        font-size: 1.1em;
-        color: #1abc9c; /* light teal for variety and contrast */
-        margin-bottom: 5px;
-    }
+def display_retry_button(job: dict):
+    """Offer to run a failed job again; failed jobs are never rerun by polling alone"""
+    st.caption(f"Attempts so far: {job['attempts']}")
+    if st.button("Retry extraction", key=f"retry_{job['id']}"):
+        if get_job_manager().retry(job['id']):
+            st.rerun()
+        st.warning("This upload can no longer be retried. Please upload the file again.")
 
-    .field-label {
-        font-weight: bold;
-        color: #ecf0f1; /* very light gray for readability */
-    }
-    </style>
-    """, unsafe_allow_html=True)
+def display_job_status(job_id: str):
+    """Show the status of a background upload job, polling until it finishes, then render its result"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        st.error("The processing job could not be found. Please upload the file again.")
+        return
     
-    # Personal Info
-    st.markdown("""
-    <div class='section-header'>Personal Information</div>
-    """, unsafe_allow_html=True)
-    st.write(f"Name: {display_data['name']}")
-    st.write(f"Email: {display_data['email']}")
-    st.write(f"Phone: {display_data['phone']}")
-    st.markdown("---")
+    if job['status'] in ACTIVE_STATUSES:
+        if job['status'] == "queued" and job.get('position'):
+            st.info(f"Queued for processing ({job['position']} upload(s) ahead)...")
+        else:
+            st.info("Extracting resume data in the background...")
+            # Sections streamed from the model so far
+            sections = {key: value for key, value in (job.get('partial') or {}).items() if key != 'is_valid_resume'}
+            if sections:
+                display_structured_data(sections, partial=True)
+        # Rerun the script to poll; the session stays responsive between checks
+        time.sleep(JOB_PARTIAL_POLL_INTERVAL if job['status'] == "running" else JOB_POLL_INTERVAL)
+        st.rerun()
     
-    # Skills
-    st.markdown("""
-    <div class='section-header'>Skills</div>
-    """, unsafe_allow_html=True)
-    skills = display_data.get('skills', [])
-    if skills:
-        st.markdown("""
-        <ul class='skills-list'>
-            {skills_list}
-        </ul>
-        """.format(
-            skills_list="\n".join([f"<li>{skill}</li>" for skill in skills])
-        ), unsafe_allow_html=True)
-    st.markdown("---")
+    if job['status'] == STATUS_FAILED:
+        st.error(f"Failed to process the resume: {job['error']}")
+        display_retry_button(job)
+        return
     
-    # Work Experience
-    st.markdown("""
-    <div class='section-header'>Work Experience</div>
-    """, unsafe_allow_html=True)
-    work_experience = display_data.get('work_experience', [])
-    for exp in work_experience:
-        try:
-            st.markdown("""
-            <div class='entry-header'>
-                {company} - {role}
-            </div>
-            """.format(company=exp.get('company', 'N/A'), role=exp.get('role', 'N/A')), unsafe_allow_html=True)
-            st.write(f"<div class='field-label'>Dates:</div> {exp.get('dates', 'N/A')}", unsafe_allow_html=True)
-            st.markdown("""
-            <div class='field-label'>Description:</div>
-            """, unsafe_allow_html=True)
-            st.write(exp.get('description', 'N/A'))
-            st.markdown("---")
-        except KeyError as e:
-            st.error(f"Error displaying work experience: Missing field {str(e)}")
+    result = job['result']
+    if result['status'] == "rejected":
+        st.warning(f"The uploaded document does not appear to be a valid resume: {result['error']}.")
+        return
+    if result['status'] == "failed":
+        st.error(f"Failed to extract data from the resume: {result['error']}. Please try again with a different file.")
+        display_retry_button(job)
+        return
     
-    # Education
-    st.markdown("""
-    <div class='section-header'>Education</div>
-    """, unsafe_allow_html=True)
-    education = display_data.get('education', [])
-    for edu in education:
-        try:
-            st.markdown("""
-            <div class='entry-header'>
-                {degree} from {institution}
-            </div>
-            """.format(degree=edu.get('degree', 'N/A'), institution=edu.get('institution', 'N/A')), unsafe_allow_html=True)
-            st.write(f"<div class='field-label'>Dates:</div> {edu.get('graduation_date', 'N/A')}", unsafe_allow_html=True)
-            if edu.get('details'):
-                st.markdown("""
-                <div class='field-label'>Details:</div>
-                """, unsafe_allow_html=True)
-                st.write(edu['details'])
-            st.markdown("---")
-        except KeyError as e:
-            st.error(f"Error displaying education: Missing field {str(e)}")
+    resume_data = get_resume_store().get_resume(result['record'], include_raw_text=True)
+    if resume_data is None:
+        st.error("The saved resume could not be loaded.")
+        return
     
-    # Certifications (if any)
-    certifications = display_data.get('certifications', [])
-    if certifications:
-        st.markdown("""
-        <div class='section-header'>Certifications</div>
-        """, unsafe_allow_html=True)
-        for cert in certifications:
-            try:
-                st.markdown("""
-                <div class='entry-header'>
-                    {name}
-                </div>
-                """.format(name=cert.get('name', 'N/A')), unsafe_allow_html=True)
-                st.write(f"<div class='field-label'>Issued by:</div> {cert.get('issuing_organization', 'N/A')}", unsafe_allow_html=True)
-                st.write(f"<div class='field-label'>Date:</div> {cert.get('date_obtained', 'N/A')}", unsafe_allow_html=True)
-                if cert.get('details'):
-                    st.markdown("""
-                    <div class='field-label'>Details:</div>
-                    """, unsafe_allow_html=True)
-                    st.write(cert['details'])
-                st.markdown("---")
-            except KeyError as e:
-                st.error(f"Error displaying certification: Missing field {str(e)}")
+    # Show preview of extracted text
+    st.subheader("Raw Extracted Text (Preview)")
+    st.text(resume_data.get('raw_text', '')[:500])
+    
+    display_structured_data(resume_data)
+    if result['status'] == "duplicate" and result.get('match'):
+        st.info(f"A near-duplicate of this resume ({result['similarity']:.0%} text overlap) was already saved as "
+                f"{result['record']}, so it was not extracted again.")
+    elif result['status'] == "duplicate":
+        st.info(f"This resume was already extracted and saved as {result['record']}.")
+    else:
+        st.success("Resume validated and saved successfully!")
+        if result.get('duplicate_of'):
+            st.info(f"Linked to the same candidate as {result['duplicate_of']} (matched by {result['match']}).")
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_similar_resumes(version: int, text: str, filename: str | None) -> list:
+    """Saved resumes ranked by similarity to a job description or to another saved resume"""
+    try:
+        return get_resume_store().similar_resumes(text, filename, SIMILAR_RESULTS)
+    except Exception as e:
+        print(f"Error ranking resumes: {str(e)}")
+        return []
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_candidate_resumes(version: int, filename: str) -> list:
+    """Other saved resumes linked to the same candidate (near-duplicate text, same email or phone)"""
+    try:
+        return get_resume_store().candidate_resumes(filename)
+    except Exception as e:
+        print(f"Error loading candidate resumes: {str(e)}")
+        return []
+
+def display_job_matches(version: int):
+    """Rank saved resumes against a pasted job description and show the selected match"""
+    with st.expander("🎯 Match a Job Description"):
+        job_description = st.text_area("Paste a job description:", key="job_description", height=150)
+        if not job_description.strip():
+            return
+        matches = cached_similar_resumes(version, job_description.strip(), None)
+        if not matches:
+            st.info("No saved resume matches this job description.")
+            return
+        labels = {m['__filename']: f"{m.get('name') or 'Unknown Name'} — {m['score']:.0%} match" for m in matches}
+        selected = st.selectbox(
+            "Best matches:",
+            [None] + list(labels),
+            format_func=lambda filename: "Select a match..." if filename is None else labels[filename],
+            key="job_match_selector",
+        )
+        if selected is not None:
+            fragment = cached_resume_fragment(version, selected)
+            if fragment is not None:
+                st.markdown(fragment, unsafe_allow_html=True)
 
 def main():
+    # Shared styles for every resume fragment rendered on this page
+    st.markdown(RESUME_CSS, unsafe_allow_html=True)
+    
     # Sidebar navigation
     page = st.sidebar.radio(
         "Navigation",
         ["📝 Extract New Resume", "📂 View & Filter Saved Resumes"],
         key="page_selector"
     )
+    
+    # Extraction cache counters
+    cache_stats = get_extraction_cache().stats()
+    st.sidebar.caption(
+        f"Extraction cache: {cache_stats['pdf_hits'] + cache_stats['text_hits']} hits, "
+        f"{cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate)"
+    )
 
     if page == "📝 Extract New Resume":
         st.title("📝 Extract New Resume")
         
         # File uploader
-        uploaded_file = st.file_uploader("Upload your Resume (PDF)", type=['pdf'])
+        uploaded_file = st.file_uploader(
+            "Upload your Resume (PDF, DOCX, RTF, HTML or text)",
+            type=[extension.lstrip('.') for extension in supported_extensions()],
+        )
         
         if uploaded_file is not None:
-            # Clear previous session state when new file is uploaded
-            if 'extracted_data' in st.session_state:
-                del st.session_state['extracted_data']
-            
-            # Convert uploaded file to BytesIO for pdfplumber
-            pdf_file = io.BytesIO(uploaded_file.getvalue())
-            
-            # Extract text from PDF
-            extracted_text = extract_text_from_pdf(pdf_file)
-            
-            if not extracted_text:
-                st.error("Failed to extract text from PDF.")
-                return
-            
-            # Show preview of extracted text
-            st.subheader("Raw Extracted Text (Preview)")
-            st.text(extracted_text[:500])
-            
-            # Step 1: Extract contact info first
-            contact_info = extract_contact_info(extracted_text)
-            
-            # Step 2: Primary validation - check for name and email
-            if not contact_info or not contact_info.get('name') or not contact_info.get('email'):
-                st.warning("The uploaded document does not appear to be a valid resume. Could not find a recognizable name or email address.")
-                return  # Stop further processing
-            
-            # Step 3: Secondary validation - check for resume sections
-            if not is_valid_resume(extracted_text):
-                st.warning("Found contact info, but the document seems to be missing typical resume sections (e.g., Experience, Skills).")
-                return  # Stop further processing
-            
-            # If we reach here, both validations passed
-            st.success("Resume validated successfully! Proceeding with full data extraction and saving.")
-            
-            # Extract structured data using the existing function
-            extracted_data = extract_structured_data(extracted_text)
-            
-            # Save to session state
-            if extracted_data:
-                st.session_state['extracted_data'] = extracted_data
-                st.session_state['raw_text'] = extracted_text
-                
-                # Save to file and display data
-                if extracted_data:
-                    success = save_extracted_data(extracted_data, uploaded_file.name, extracted_text)
-                    if success:
-                        display_structured_data(extracted_data)
-                    else:
-                        st.error("Failed to save data.")
-                else:
-                    st.error("Failed to extract data from the resume. Please try again with a different file.")
-            if success:
-                st.success("Data saved successfully!")
-            else:
-                st.error("Failed to save data.")
+            # Enqueue each upload once (keyed by content hash); reruns while the file stays in the
+            # uploader reuse its job, so a failed job only runs again on a new upload or a retry
+            submitted = st.session_state.setdefault('submitted_uploads', {})
+            job_id = submitted.get(uploaded_file.file_id)
+            if job_id is None:
+                job_id = get_job_manager().submit(uploaded_file.getvalue(), uploaded_file.name, retry_failed=True)
+                submitted[uploaded_file.file_id] = job_id
+            display_job_status(job_id)
                     
     elif page == "📂 View & Filter Saved Resumes":
         st.title("📂 View & Filter Saved Resumes")
@@ -265,66 +274,80 @@ def main():
     
 
 def display_saved_resumes():
-    """Display section for viewing saved resumes"""
+    """Display section for browsing saved resumes page by page"""
     st.subheader("View Saved Resumes")
     
-    # Load all saved resumes
-    all_resumes = load_all_saved_resumes()
+    store = get_resume_store()
+    version = store.data_version()
     
-    if not all_resumes:
+    if store.count() == 0:
         st.info("No resumes saved yet.")
         return
     
-    # Extract unique skills
-    all_skills = set()
-    for resume in all_resumes:
-        all_skills.update(resume.get('skills', []))
-    
-    # Sort skills alphabetically
-    sorted_skills = sorted(all_skills)
+    display_job_matches(version)
     
-    # Skill filter
+    # Search over the summary columns and skill filter from the inverted skill index
+    query = st.text_input("Search by name, email or file:", key="resume_search", placeholder="Type to search...")
+    skill_options = cached_skill_options(version)
+    skill_labels = dict(skill_options)
     selected_skills = st.multiselect(
         "Filter by Skills:",
-        sorted_skills,
+        [skill for skill, _ in skill_options],
+        format_func=lambda skill: skill_labels.get(skill, skill),
         key="skills_filter"
     )
+    match_all = st.radio("Match", ["All selected skills", "Any selected skill"], horizontal=True, key="skills_match") == "All selected skills"
     
-    # Filter resumes based on selected skills
-    filtered_resumes = [
-        r for r in all_resumes
-        if not selected_skills or all(skill in r.get('skills', []) for skill in selected_skills)
-    ]
+    # Go back to the first page whenever the filter changes
+    filter_key = (query.strip().lower(), tuple(selected_skills), match_all)
+    if st.session_state.get('resume_filter') != filter_key:
+        st.session_state['resume_filter'] = filter_key
+        st.session_state['resume_page'] = 0
+    page = st.session_state.get('resume_page', 0)
     
-    if not filtered_resumes:
+    summaries, total = cached_search_page(version, query.strip(), tuple(selected_skills), match_all, page)
+    if total == 0:
         st.info("No resumes match the current filter.")
         return
     
-    # Add a blank option at the start
-    display_names = ["Select a resume..."] + [
-        f"{r.get('name', 'Unknown Name')} ({r.get('__filename')})"
-        for r in filtered_resumes
-    ]
+    page_count = (total + PAGE_SIZE - 1) // PAGE_SIZE
+    previous_col, status_col, next_col = st.columns([1, 3, 1])
+    if previous_col.button("◀ Previous", disabled=page == 0):
+        st.session_state['resume_page'] = page - 1
+        st.rerun()
+    status_col.caption(f"Page {page + 1} of {page_count} ({total} matching resumes)")
+    if next_col.button("Next ▶", disabled=page + 1 >= page_count):
+        st.session_state['resume_page'] = page + 1
+        st.rerun()
     
-    # Selectbox for viewing resumes
-    selected_index = st.selectbox(
+    # Only the current page is listed; the full record is rendered when one is selected
+    labels = {r['__filename']: f"{r.get('name') or 'Unknown Name'} ({r['__filename']})" for r in summaries}
+    selected = st.selectbox(
         "Select a Resume to View:",
-        display_names,
-        key="resume_selector",
-        index=0  # Default to first option (blank)
+        [None] + list(labels),
+        format_func=lambda filename: "Select a resume..." if filename is None else labels[filename],
+        key=f"resume_selector_{page}",
     )
     
-    # Only display resume details if a resume is actually selected
-    if selected_index != "Select a resume...":
-        # Get the corresponding resume data
-        selected_resume = filtered_resumes[display_names.index(selected_index) - 1]  # -1 because of the added blank option
+    if selected is not None:
+        fragment = cached_resume_fragment(version, selected)
+        if fragment is None:
+            st.error("The selected resume could not be loaded.")
+            return
+        st.subheader(f"Resume Details: {labels[selected].rsplit(' (', 1)[0]}")
+        st.markdown(fragment, unsafe_allow_html=True)
         
-        # Create a copy of data without raw_text if it exists
-        display_resume = {k: v for k, v in selected_resume.items() if k != 'raw_text'}
+        versions = cached_candidate_resumes(version, selected)
+        if versions:
+            st.markdown("**Other resumes of this candidate:**")
+            for other in versions:
+                st.caption(f"{other.get('name') or 'Unknown Name'} ({other['__filename']})")
         
-        # Display the selected resume
-        st.subheader(f"Resume Details: {display_resume.get('name', 'Unknown Name')}")
-        display_structured_data(display_resume)
+        similar = cached_similar_resumes(version, "", selected)
+        if similar:
+            st.markdown("**Similar resumes:**")
+            for match in similar:
+                st.caption(f"{match.get('name') or 'Unknown Name'} ({match['__filename']}) — {match['score']:.0%}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,226 @@
+"""
+Headless bulk ingestion of resume documents from a directory or zip archive
+
+Usage:
+    python batch_ingest.py <directory-or-zip> [--manifest PATH] [--parse-workers N] [--llm-concurrency N]
+
+Files with the extension of a supported format (PDF, DOCX, RTF, HTML, text) are picked up
+and each one is parsed according to the format detected from its content. Parsing runs in
+a pool of spawned processes sized to the available cores, which the time budget
+(DOCUMENT_TIMEOUT) is enforced on from here, while LLM extraction and saving run in a
+bounded thread pool sized to the API concurrency limit. Every processed file is appended to a JSONL manifest as soon as it finishes; the manifest is
+also the checkpoint, so re-running the same command skips files that already succeeded
+and retries only failures and files that were never reached.
+"""
+import os
+import sys
+import json
+import time
+import zipfile
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from extraction_cache import get_extraction_cache
+from resume_pipeline import parse_document_bytes, extract_and_save
+from document_parser import supported_extensions, UnsupportedFormatError, DOCUMENT_TIMEOUT
+
+DEFAULT_MANIFEST = "batch_manifest.jsonl"
+DEFAULT_LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
+
+# Manifest statuses that mean a file needs no further work
+DONE_STATUSES = {"saved", "duplicate", "rejected"}
+
+# How often running parse tasks are checked against the time budget
+DEADLINE_POLL_SECONDS = 1.0
+
+def discover_documents(source: str) -> list:
+    """
+    List the documents to ingest.
+
+    Args:
+        source: A directory (searched recursively) or a .zip archive
+
+    Returns:
+        list: (document id, reader) pairs; calling reader() returns the document bytes
+    """
+    documents = []
+    extensions = supported_extensions()
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            members = [m for m in archive.infolist() if not m.is_dir() and m.filename.lower().endswith(extensions)]
+        for member in sorted(members, key=lambda m: m.filename):
+            documents.append((f"{source}:{member.filename}", _zip_reader(source, member.filename)))
+    elif os.path.isdir(source):
+        for root, _, filenames in os.walk(source):
+            for filename in sorted(filenames):
+                if filename.lower().endswith(extensions):
+                    path = os.path.join(root, filename)
+                    documents.append((path, _file_reader(path)))
+        documents.sort(key=lambda doc: doc[0])
+    else:
+        raise ValueError("Input must be a directory or a zip archive")
+    return documents
+
+def _zip_reader(archive_path: str, member: str):
+    def read() -> bytes:
+        with zipfile.ZipFile(archive_path) as archive:
+            return archive.read(member)
+    return read
+
+def _file_reader(path: str):
+    def read() -> bytes:
+        with open(path, 'rb') as f:
+            return f.read()
+    return read
+
+def load_checkpoint(manifest_path: str) -> dict:
+    """Return the latest manifest entry per document id from a previous run"""
+    entries = {}
+    if not os.path.exists(manifest_path):
+        return entries
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                entries[entry['document']] = entry
+            except (ValueError, KeyError):
+                continue
+    return entries
+
+def ingest(source: str, manifest_path: str = DEFAULT_MANIFEST, parse_workers: int | None = None,
+           llm_concurrency: int = DEFAULT_LLM_CONCURRENCY) -> dict:
+    """
+    Ingest every document under source, resuming from the manifest of an earlier run.
+
+    Args:
+        source: Directory or zip archive of resume documents
+        manifest_path: JSONL manifest/checkpoint file
+        parse_workers: Size of the parsing process pool (defaults to the CPU count)
+        llm_concurrency: Maximum number of concurrent LLM calls
+
+    Returns:
+        dict: Count of documents per final status for this run
+    """
+    parse_workers = parse_workers or os.cpu_count() or 1
+    checkpoint = load_checkpoint(manifest_path)
+    documents = [
+        (doc_id, reader) for doc_id, reader in discover_documents(source)
+        if checkpoint.get(doc_id, {}).get('status') not in DONE_STATUSES
+    ]
+    total = len(documents)
+    skipped = sum(1 for entry in checkpoint.values() if entry.get('status') in DONE_STATUSES)
+    print(f"Found {total} document(s) to ingest ({skipped} already done)", file=sys.stderr)
+
+    counts = {}
+    cache = get_extraction_cache()
+    started = time.time()
+    # Bound how many documents are held in memory between the two pools
+    max_in_flight = max(parse_workers, llm_concurrency) * 4
+    # Parse workers are spawned rather than forked from this process, where the LLM threads are
+    # running; each parses without a budget of its own, the deadline is enforced here instead
+    parse_pool = ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context("spawn"))
+    parse_deadlines = {}
+    overran = False
+
+    try:
+        with open(manifest_path, 'a', encoding='utf-8') as manifest, \
+                ThreadPoolExecutor(max_workers=llm_concurrency) as llm_pool:
+
+            def record_result(doc_id: str, result: dict) -> None:
+                entry = {"document": doc_id, "finished_at": time.time(), **result}
+                manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                manifest.flush()
+                counts[result['status']] = counts.get(result['status'], 0) + 1
+                done = sum(counts.values())
+                rate = done / max(time.time() - started, 1e-9)
+                print(f"[{done}/{total}] {result['status']:<9} {doc_id} ({rate:.1f} docs/s)", file=sys.stderr)
+
+            pending = {}
+            queue = iter(documents)
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < max_in_flight:
+                    try:
+                        doc_id, reader = next(queue)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    try:
+                        content = reader()
+                    except Exception as e:
+                        record_result(doc_id, {"status": "failed", "error": f"Could not read file: {str(e)}"})
+                        continue
+                    cached = cache.get_by_pdf(content)
+                    if cached:
+                        future = llm_pool.submit(extract_and_save, doc_id, content, cached['text'], cached)
+                        pending[future] = ("extract", doc_id, content)
+                    else:
+                        future = parse_pool.submit(parse_document_bytes, content, 0)
+                        pending[future] = ("parse", doc_id, content)
+                        parse_deadlines[future] = None
+
+                if not pending:
+                    continue
+                timeout = None
+                if DOCUMENT_TIMEOUT and parse_deadlines:
+                    now = time.monotonic()
+                    for future, deadline in list(parse_deadlines.items()):
+                        # The budget starts once a worker picks the document up
+                        if deadline is None and future.running():
+                            parse_deadlines[future] = deadline = now + DOCUMENT_TIMEOUT
+                        if deadline is not None and deadline <= now and not future.done():
+                            del parse_deadlines[future]
+                            _, doc_id, _ = pending.pop(future)
+                            overran = True
+                            record_result(doc_id, {"status": "failed", "error": "parse failed: the time budget was exceeded"})
+                    timeout = DEADLINE_POLL_SECONDS
+                    if not pending:
+                        continue
+                finished, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    parse_deadlines.pop(future, None)
+                    stage, doc_id, content = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except UnsupportedFormatError as e:
+                        record_result(doc_id, {"status": "rejected", "error": str(e)})
+                        continue
+                    except Exception as e:
+                        record_result(doc_id, {"status": "failed", "error": f"{stage} failed: {str(e)}"})
+                        continue
+                    if stage == "parse":
+                        text, pdf_backend = result
+                        future = llm_pool.submit(extract_and_save, doc_id, content, text, None, pdf_backend)
+                        pending[future] = ("extract", doc_id, content)
+                    else:
+                        record_result(doc_id, result)
+    finally:
+        if overran:
+            # Workers still stuck on documents that overran the budget would block shutdown forever
+            for process in list(parse_pool._processes.values()):
+                process.terminate()
+        parse_pool.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.time() - started
+    print(f"Finished {sum(counts.values())} document(s) in {elapsed:.1f}s: {counts}", file=sys.stderr)
+    return counts
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-ingest resume documents from a directory or zip archive")
+    parser.add_argument("source", help="Directory (searched recursively) or .zip archive of resume documents")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST, help="JSONL manifest used as resumable checkpoint")
+    parser.add_argument("--parse-workers", type=int, default=None, help="Document parsing processes (default: CPU count)")
+    parser.add_argument("--llm-concurrency", type=int, default=DEFAULT_LLM_CONCURRENCY,
+                        help="Maximum concurrent LLM calls (default: $LLM_CONCURRENCY or 4)")
+    args = parser.parse_args(argv)
+
+    try:
+        counts = ingest(args.source, args.manifest, args.parse_workers, args.llm_concurrency)
+    except ValueError as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 2
+    return 1 if counts.get("failed") else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+"""
+Package of offline benchmarks for the resume extraction pipeline
+"""
@@ -0,0 +1,375 @@
+"""
+Generator of a synthetic, reproducible resume PDF corpus
+
+Usage:
+    python -m benchmarks.corpus <output-dir> [--count N] [--seed S]
+
+Every document is built from a seeded random generator, so the same seed always yields
+byte-identical PDFs. Documents vary in page count (1 to 12 pages), layout (single column,
+two column, table rows, dense text with running headers and footers) and file size (an
+optional uncompressed image inflates the file without adding text). The corpus directory
+gets a manifest.json listing every file with its layout, page count, size and the ground
+truth record it was generated from.
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import textwrap
+
+LAYOUTS = ("single_column", "two_column", "table", "dense")
+PAGE_COUNTS = (1, 1, 2, 2, 3, 5, 12)
+# Sizes (KiB) of the image added to page one; 0 for none
+IMAGE_SIZES_KB = (0, 0, 0, 64, 512)
+
+MANIFEST_FILENAME = "manifest.json"
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN = 50
+
+FIRST_NAMES = ("Aarav", "Maria", "James", "Priya", "Chen", "Fatima", "Lukas", "Sofia", "Kwame", "Elena",
+               "Omar", "Hannah", "Diego", "Yuki", "Noah", "Amara", "Ivan", "Leila", "Mateo", "Grace")
+LAST_NAMES = ("Sharma", "Garcia", "Smith", "Patel", "Wang", "Khan", "Muller", "Rossi", "Mensah", "Petrova",
+              "Haddad", "Schmidt", "Lopez", "Tanaka", "Brown", "Okafor", "Ivanov", "Karimi", "Silva", "Kim")
+SKILLS = ("Python", "Java", "JavaScript", "TypeScript", "Go", "Rust", "C++", "SQL", "PostgreSQL", "MongoDB",
+          "React", "Django", "Flask", "FastAPI", "Docker", "Kubernetes", "AWS", "GCP", "Azure", "Terraform",
+          "Pandas", "NumPy", "PyTorch", "TensorFlow", "Spark", "Kafka", "Redis", "Linux", "Git", "CI/CD",
+          "GraphQL", "REST APIs", "Machine Learning", "Data Analysis", "Leadership", "Communication")
+COMPANIES = ("Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Enterprises",
+             "Hooli", "Pied Piper", "Vandelay Industries", "Soylent Systems", "Cyberdyne", "Tyrell Analytics")
+ROLES = ("Software Engineer", "Senior Software Engineer", "Data Scientist", "Backend Developer",
+         "Machine Learning Engineer", "DevOps Engineer", "Full Stack Developer", "Engineering Manager")
+INSTITUTIONS = ("State University", "Institute of Technology", "City College", "National University",
+                "University of Applied Sciences")
+DEGREES = ("Bachelor of Science in Computer Science", "Master of Science in Data Science",
+           "Bachelor of Engineering in Electronics", "Master of Computer Applications")
+CERTIFICATIONS = (("AWS Certified Solutions Architect", "Amazon Web Services"),
+                  ("Certified Kubernetes Administrator", "CNCF"),
+                  ("Professional Data Engineer", "Google Cloud"),
+                  ("Deep Learning Specialization", "Coursera"),
+                  ("Scrum Master Certification", "Scrum Alliance"))
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+VERBS = ("Designed", "Built", "Led", "Migrated", "Optimized", "Automated", "Maintained", "Delivered")
+OBJECTS = ("a streaming data pipeline", "the billing service", "an internal analytics dashboard",
+           "a recommendation engine", "the CI/CD platform", "a customer-facing REST API",
+           "the search infrastructure", "a fraud detection model", "the mobile backend")
+OUTCOMES = ("cutting latency by {n}%", "serving {n}k daily users", "reducing costs by {n}%",
+            "improving test coverage to {n}%", "handling {n}M events per day", "for a team of {n} engineers")
+
+# Standard Type1 fonts every PDF reader ships; no embedding needed
+FONTS = {"F1": "Helvetica", "F2": "Helvetica-Bold"}
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def build_pdf(pages: list, image: bytes | None = None) -> bytes:
+    """
+    Serialize pages of positioned text runs into a PDF.
+
+    Args:
+        pages: One list per page of (font, size, x, y, text) runs; font is a key of FONTS
+        image: Optional 8-bit grayscale pixels of a square image drawn on the first page
+
+    Returns:
+        bytes: The PDF document
+    """
+    objects = {}
+    font_ids = {}
+    next_id = 3
+    for key in FONTS:
+        font_ids[key] = next_id
+        objects[next_id] = f"<< /Type /Font /Subtype /Type1 /BaseFont /{FONTS[key]} >>".encode('latin-1')
+        next_id += 1
+    image_id = None
+    if image:
+        side = int(len(image) ** 0.5)
+        image_id = next_id
+        next_id += 1
+        pixels = image[:side * side]
+        objects[image_id] = (
+            f"<< /Type /XObject /Subtype /Image /Width {side} /Height {side} /ColorSpace /DeviceGray "
+            f"/BitsPerComponent 8 /Length {len(pixels)} >>\nstream\n".encode('latin-1') + pixels + b"\nendstream"
+        )
+    fonts = " ".join(f"/{key} {font_id} 0 R" for key, font_id in font_ids.items())
+
+    page_ids = []
+    for index, runs in enumerate(pages):
+        operations = [f"BT /{font} {size} Tf 1 0 0 1 {x} {y} Tm ({_escape(text)}) Tj ET" for font, size, x, y, text in runs]
+        resources = f"/Font << {fonts} >>"
+        if image_id is not None and index == 0:
+            operations.insert(0, f"q 96 0 0 96 {PAGE_WIDTH - MARGIN - 96} {PAGE_HEIGHT - MARGIN - 96} cm /Im1 Do Q")
+            resources += f" /XObject << /Im1 {image_id} 0 R >>"
+        content = "\n".join(operations).encode('latin-1')
+        content_id, page_id = next_id, next_id + 1
+        next_id += 2
+        objects[content_id] = f"<< /Length {len(content)} >>\nstream\n".encode('latin-1') + content + b"\nendstream"
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Contents {content_id} 0 R /Resources << {resources} >> >>"
+        ).encode('latin-1')
+        page_ids.append(page_id)
+
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[2] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode('latin-1')
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(out)
+        out += f"{object_id} 0 obj\n".encode('latin-1') + objects[object_id] + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    out += "".join(f"{offsets[object_id]:010d} 00000 n \n" for object_id in sorted(objects)).encode('latin-1')
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1')
+    return bytes(out)
+
+# Synthetic resume content
+
+def _date_range(rng: random.Random, year: int) -> str:
+    end = "Present" if year >= 2024 else f"{rng.choice(MONTHS)} {year}"
+    return f"{rng.choice(MONTHS)} {year - rng.randint(1, 4)} - {end}"
+
+def _achievement(rng: random.Random) -> str:
+    outcome = rng.choice(OUTCOMES).format(n=rng.randint(2, 90))
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}, {outcome}."
+
+def synthetic_record(rng: random.Random, index: int, jobs: int = 3) -> dict:
+    """
+    Return a random structured resume record in the shape the extractor produces.
+
+    Args:
+        rng: Seeded random generator
+        index: Position in the corpus; makes the email address unique
+        jobs: Number of work experience entries
+
+    Returns:
+        dict: Record with contact fields, skills, work_experience, education and certifications
+    """
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    year = 2024
+    work_experience = []
+    for _ in range(jobs):
+        work_experience.append({
+            "company": rng.choice(COMPANIES),
+            "role": rng.choice(ROLES),
+            "dates": _date_range(rng, year),
+            "description": " ".join(_achievement(rng) for _ in range(rng.randint(2, 4))),
+        })
+        year -= rng.randint(2, 4)
+    return {
+        "name": f"{first} {last}",
+        "email": f"{first.lower()}.{last.lower()}{index}@example.com",
+        "phone": f"+1 {rng.randint(200, 989)} {rng.randint(200, 989)} {rng.randint(1000, 9999)}",
+        "skills": rng.sample(SKILLS, rng.randint(5, 14)),
+        "work_experience": work_experience,
+        "education": [{
+            "institution": rng.choice(INSTITUTIONS),
+            "degree": rng.choice(DEGREES),
+            "graduation_date": str(year - rng.randint(0, 2)),
+            "details": "",
+        }],
+        "certifications": [
+            {"name": name, "issuing_organization": issuer, "date_obtained": str(rng.randint(2018, 2024)), "details": ""}
+            for name, issuer in rng.sample(CERTIFICATIONS, rng.randint(0, 3))
+        ],
+    }
+
+def _sections(record: dict, width: int) -> list:
+    """Return (heading, lines) pairs of the resume body, wrapped to width characters"""
+    experience = []
+    for job in record['work_experience']:
+        experience.append(f"{job['role']} - {job['company']}")
+        experience.append(job['dates'])
+        experience += textwrap.wrap(job['description'], width)
+    education = [f"{entry['degree']}" for entry in record['education']]
+    education += [f"{entry['institution']}, {entry['graduation_date']}" for entry in record['education']]
+    certifications = [
+        f"{entry['name']}, {entry['issuing_organization']} ({entry['date_obtained']})" for entry in record['certifications']
+    ]
+    sections = [
+        ("Experience", experience),
+        ("Education", [line for entry in education for line in textwrap.wrap(entry, width)]),
+        ("Skills", textwrap.wrap(", ".join(record['skills']), width)),
+    ]
+    if certifications:
+        sections.append(("Certifications", [line for entry in certifications for line in textwrap.wrap(entry, width)]))
+    return sections
+
+def _flow(blocks: list, x: int, size: float, leading: float, top: float, bottom: float) -> list:
+    """Lay out (font, text) lines top to bottom, starting a new page whenever the column is full"""
+    pages = [[]]
+    y = top
+    for font, text in blocks:
+        if y < bottom:
+            pages.append([])
+            y = top
+        pages[-1].append((font, size, x, round(y, 1), text))
+        y -= leading
+    return pages
+
+def _heading_blocks(sections: list) -> list:
+    blocks = []
+    for heading, lines in sections:
+        blocks.append(("F2", heading))
+        blocks += [("F1", line) for line in lines]
+    return blocks
+
+def _merge_columns(*columns: list) -> list:
+    pages = []
+    for index in range(max(len(column) for column in columns)):
+        pages.append([run for column in columns if index < len(column) for run in column[index]])
+    return pages
+
+def render_resume(record: dict, layout: str, rng: random.Random, min_pages: int = 1) -> list:
+    """
+    Lay a record out as pages of text runs, adding project entries until min_pages is reached.
+
+    Args:
+        record: Record from synthetic_record(); its "projects" key receives the filler entries
+        layout: One of LAYOUTS
+        rng: Seeded random generator used for filler text
+        min_pages: Minimum page count of the result
+
+    Returns:
+        list: Pages of (font, size, x, y, text) runs for build_pdf()
+    """
+    record.setdefault('projects', [])
+    while True:
+        pages = _render(record, layout)
+        if len(pages) >= min_pages:
+            return pages
+        for _ in range(6):
+            record['projects'].append(f"{rng.choice(OBJECTS).capitalize()}: {_achievement(rng)}")
+
+def _render(record: dict, layout: str) -> list:
+    header = [("F2", record['name']), ("F1", record['email']), ("F1", record['phone'])]
+    top, bottom = PAGE_HEIGHT - MARGIN, MARGIN
+    width = 90 if layout == "dense" else 80
+
+    def with_projects(sections, wrap_width):
+        if not record['projects']:
+            return sections
+        lines = [line for entry in record['projects'] for line in textwrap.wrap(entry, wrap_width)]
+        return sections + [("Projects", lines)]
+
+    if layout == "two_column":
+        sections = with_projects(_sections(record, 52), 52)
+        side = [section for section in sections if section[0] in ("Education", "Skills", "Certifications")]
+        main = [section for section in sections if section[0] not in ("Education", "Skills", "Certifications")]
+        side = [("Contact", [line for _, text in header[1:] for line in textwrap.wrap(text, 28)])] + [
+            (heading, [line for text in lines for line in textwrap.wrap(text, 28)]) for heading, lines in side
+        ]
+        left = _flow(_heading_blocks(side), MARGIN, 9, 12, top - 30, bottom)
+        right = _flow([header[0]] + _heading_blocks(main), 220, 10, 13, top, bottom)
+        return _merge_columns(left, right)
+
+    if layout == "table":
+        runs = _flow(header, MARGIN, 11, 14, top, bottom)[0]
+        y = top - 3 * 14 - 10
+        pages = [runs]
+
+        def row(cells):
+            nonlocal y
+            if y < bottom:
+                pages.append([])
+                y = top
+            for font, x, text in cells:
+                pages[-1].append((font, 9, x, round(y, 1), text))
+            y -= 12
+
+        row([("F2", MARGIN, "Experience")])
+        row([("F2", MARGIN, "Company"), ("F2", 200, "Role"), ("F2", 420, "Dates")])
+        for job in record['work_experience']:
+            row([("F1", MARGIN, job['company']), ("F1", 200, job['role']), ("F1", 420, job['dates'])])
+            for line in textwrap.wrap(job['description'], 95):
+                row([("F1", MARGIN, line)])
+        for heading, lines in with_projects(_sections(record, 95)[1:], 95):
+            row([("F2", MARGIN, heading)])
+            if heading == "Skills":
+                skills = record['skills']
+                for start in range(0, len(skills), 4):
+                    row([("F1", MARGIN + 130 * offset, skill) for offset, skill in enumerate(skills[start:start + 4])])
+            else:
+                for line in lines:
+                    row([("F1", MARGIN, line)])
+        return pages
+
+    size, leading = (8, 10) if layout == "dense" else (11, 14)
+    blocks = header + _heading_blocks(with_projects(_sections(record, width), width))
+    if layout != "dense":
+        return _flow(blocks, MARGIN, size, leading, top, bottom)
+
+    # Dense pages repeat a running header and a numbered footer, like exported CVs often do
+    pages = _flow(blocks, MARGIN, size, leading, top - 20, bottom + 20)
+    for number, runs in enumerate(pages, start=1):
+        runs.insert(0, ("F1", 7, MARGIN, top, f"{record['name']} - Curriculum Vitae"))
+        runs.append(("F1", 7, PAGE_WIDTH // 2, MARGIN, f"Page {number} of {len(pages)}"))
+    return pages
+
+def generate_document(rng: random.Random, index: int) -> tuple:
+    """
+    Generate one synthetic resume PDF.
+
+    Args:
+        rng: Seeded random generator
+        index: Position in the corpus
+
+    Returns:
+        tuple: (PDF bytes, manifest entry with layout, pages, bytes and the ground truth record)
+    """
+    layout = LAYOUTS[index % len(LAYOUTS)]
+    min_pages = rng.choice(PAGE_COUNTS)
+    image_kb = rng.choice(IMAGE_SIZES_KB)
+    record = synthetic_record(rng, index, jobs=rng.randint(1, 5))
+    pages = render_resume(record, layout, rng, min_pages)
+    image = rng.randbytes(image_kb * 1024) if image_kb else None
+    pdf_bytes = build_pdf(pages, image)
+    truth = {**record, "projects": list(record['projects'])}
+    return pdf_bytes, {"layout": layout, "pages": len(pages), "bytes": len(pdf_bytes), "image_kb": image_kb, "truth": truth}
+
+def generate_corpus(output_dir: str, count: int = 40, seed: int = 0) -> dict:
+    """
+    Write count synthetic resumes and their manifest to output_dir.
+
+    Returns:
+        dict: The manifest, mapping file names to their manifest entries
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed)
+    manifest = {}
+    for index in range(count):
+        pdf_bytes, entry = generate_document(rng, index)
+        filename = f"resume_{index:04d}_{entry['layout']}.pdf"
+        with open(os.path.join(output_dir, filename), 'wb') as f:
+            f.write(pdf_bytes)
+        manifest[filename] = entry
+    with open(os.path.join(output_dir, MANIFEST_FILENAME), 'w', encoding='utf-8') as f:
+        json.dump({"seed": seed, "documents": manifest}, f, indent=2)
+    return manifest
+
+def load_manifest(corpus_dir: str) -> dict:
+    """Return the documents of a corpus manifest, or an empty dict for a corpus without one"""
+    try:
+        with open(os.path.join(corpus_dir, MANIFEST_FILENAME), 'r', encoding='utf-8') as f:
+            return json.load(f)["documents"]
+    except FileNotFoundError:
+        return {}
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume PDF corpus")
+    parser.add_argument("output", help="Directory to write the PDFs and manifest.json to")
+    parser.add_argument("--count", type=int, default=40, help="Number of documents (default: 40)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args(argv)
+
+    manifest = generate_corpus(args.output, args.count, args.seed)
+    pages = sum(entry['pages'] for entry in manifest.values())
+    size = sum(entry['bytes'] for entry in manifest.values())
+    print(f"Wrote {len(manifest)} documents ({pages} pages, {size / 1024:.0f} KiB) to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Benchmark of the PDF text backends on a sample corpus
+
+Usage:
+    python -m benchmarks.pdf_backends <directory-of-pdfs> [--max-pages N] [--output results.json]
+
+For every PDF the text is extracted with each available backend. The report lists the
+time per page of each backend and its text fidelity, measured as the token-level F1
+score against pdfplumber's output (the reference, since it does full layout analysis).
+It also shows how often the fast-path quality check accepts a backend's text and the
+time per page of the automatic backend chain used by the app.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+
+from pdf_parser import (
+    PDF_BACKENDS,
+    assess_text_quality,
+    available_backends,
+    extract_text_and_backend,
+    iter_pdf_pages,
+)
+
+REFERENCE_BACKEND = "pdfplumber"
+
+def token_f1(candidate: str, reference: str) -> float:
+    """Token-level F1 score of candidate text against reference text (bag of whitespace tokens)"""
+    candidate_tokens = Counter(candidate.split())
+    reference_tokens = Counter(reference.split())
+    if not candidate_tokens and not reference_tokens:
+        return 1.0
+    overlap = sum((candidate_tokens & reference_tokens).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(candidate_tokens.values())
+    recall = overlap / sum(reference_tokens.values())
+    return 2 * precision * recall / (precision + recall)
+
+def _time_backend(pdf_bytes: bytes, backend: str, max_pages: int) -> tuple:
+    started = time.perf_counter()
+    pages = list(iter_pdf_pages(pdf_bytes, max_pages=max_pages, max_chars=0, timeout=0, parallel=False, backend=backend))
+    elapsed = time.perf_counter() - started
+    return "\n".join(page for page in pages if page).strip(), len(pages), elapsed
+
+def run(corpus_dir: str, max_pages: int = 0) -> dict:
+    """
+    Benchmark every available backend on the PDFs in corpus_dir.
+
+    Args:
+        corpus_dir: Directory searched recursively for PDFs
+        max_pages: Maximum number of pages read per document (0 for no limit)
+
+    Returns:
+        dict: Per-backend totals and per-document measurements
+    """
+    paths = sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(corpus_dir)
+        for name in names if name.lower().endswith('.pdf')
+    )
+    backends = [name for name in PDF_BACKENDS if name in available_backends() or name == REFERENCE_BACKEND]
+    totals = {name: {"seconds": 0.0, "pages": 0, "f1_sum": 0.0, "accepted": 0, "failed": 0} for name in backends}
+    totals["auto"] = {"seconds": 0.0, "pages": 0, "chosen": Counter()}
+    documents = []
+
+    for path in paths:
+        with open(path, 'rb') as f:
+            pdf_bytes = f.read()
+        texts = {}
+        row = {"document": path}
+        for name in backends:
+            try:
+                text, pages, elapsed = _time_backend(pdf_bytes, name, max_pages)
+            except Exception as e:
+                totals[name]["failed"] += 1
+                row[name] = {"error": str(e)}
+                continue
+            texts[name] = text
+            accepted = assess_text_quality(text, pages) is None
+            totals[name]["seconds"] += elapsed
+            totals[name]["pages"] += pages
+            totals[name]["accepted"] += accepted
+            row[name] = {"pages": pages, "ms_per_page": 1000 * elapsed / max(pages, 1), "accepted": accepted}
+
+        reference = texts.get(REFERENCE_BACKEND)
+        for name, text in texts.items():
+            if reference is not None:
+                row[name]["f1"] = token_f1(text, reference)
+                totals[name]["f1_sum"] += row[name]["f1"]
+
+        started = time.perf_counter()
+        try:
+            _, chosen = extract_text_and_backend(pdf_bytes, max_pages=max_pages, max_chars=0, timeout=0, parallel=False)
+        except Exception as e:
+            row["auto"] = {"error": str(e)}
+        else:
+            totals["auto"]["seconds"] += time.perf_counter() - started
+            totals["auto"]["pages"] += row.get(REFERENCE_BACKEND, {}).get("pages", 0)
+            totals["auto"]["chosen"][chosen] += 1
+            row["auto"] = {"backend": chosen}
+        documents.append(row)
+
+    summary = {}
+    for name in backends:
+        measured = len(paths) - totals[name]["failed"]
+        summary[name] = {
+            "documents": measured,
+            "failed": totals[name]["failed"],
+            "ms_per_page": 1000 * totals[name]["seconds"] / max(totals[name]["pages"], 1),
+            "mean_f1": totals[name]["f1_sum"] / max(measured, 1),
+            "quality_accept_rate": totals[name]["accepted"] / max(measured, 1),
+        }
+    summary["auto"] = {
+        "ms_per_page": 1000 * totals["auto"]["seconds"] / max(totals["auto"]["pages"], 1),
+        "chosen": dict(totals["auto"]["chosen"]),
+    }
+    return {"corpus": corpus_dir, "documents": len(paths), "summary": summary, "per_document": documents}
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare PDF text backends on a sample corpus")
+    parser.add_argument("corpus", help="Directory of sample PDFs (searched recursively)")
+    parser.add_argument("--max-pages", type=int, default=0, help="Pages read per document (default: all)")
+    parser.add_argument("--output", help="Write the full JSON results to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.corpus, args.max_pages)
+    print(f"{'backend':<12} {'ms/page':>9} {'mean F1':>8} {'accepted':>9}")
+    for name, stats in results["summary"].items():
+        if name == "auto":
+            continue
+        print(f"{name:<12} {stats['ms_per_page']:>9.2f} {stats['mean_f1']:>8.3f} {stats['quality_accept_rate']:>8.0%}")
+    auto = results["summary"]["auto"]
+    print(f"{'auto':<12} {auto['ms_per_page']:>9.2f}  chosen: {auto['chosen']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
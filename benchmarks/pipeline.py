@@ -0,0 +1,429 @@
+"""
+Offline benchmark suite for the extraction pipeline
+
+Usage:
+    python -m benchmarks.pipeline [--scenarios parse,e2e,store,memory] [--corpus DIR] [--output FILE]
+    python -m benchmarks.pipeline --compare old.json new.json
+
+Scenarios:
+    parse   Parse throughput (documents, pages and MB per second) over the corpus, per layout
+    e2e     End-to-end latency percentiles of process_document, cold (LLM) and warm (cache hit),
+            with a per-stage time breakdown from the pipeline metrics
+    store   Store load, filter and similarity-match latencies at 1k, 10k and 100k records (--store-sizes)
+    memory  Peak Python heap while parsing and processing the corpus, plus the process max RSS
+
+Nothing touches the network or the repository's resumes_data: the corpus is generated
+with benchmarks.corpus unless --corpus is given, Gemini is replaced by a RecordedBackend
+(replaying --replay recordings, answering other prompts from the corpus ground truth) and
+the run works in a temporary directory. Results are written as JSON together with the
+commit they were measured on; --compare prints the relative change of every metric
+between two result files.
+"""
+import os
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+import contextlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.corpus import generate_corpus, load_manifest, synthetic_record, ROLES, SKILLS
+from benchmarks.recorded_backend import (
+    RecordedBackend,
+    load_recordings,
+    truth_responder,
+    heuristic_responder,
+)
+
+SCENARIOS = ("parse", "e2e", "store", "memory")
+DEFAULT_STORE_SIZES = (1_000, 10_000, 100_000)
+
+def percentiles(values: list) -> dict:
+    """Return count, mean and nearest-rank p50/p90/p99/max of a list of seconds, in milliseconds"""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def rank(p):
+        return 1000 * ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": 1000 * sum(ordered) / len(ordered),
+        "p50_ms": rank(50),
+        "p90_ms": rank(90),
+        "p99_ms": rank(99),
+        "max_ms": 1000 * ordered[-1],
+    }
+
+def _timed_call(func, *args, **kwargs) -> tuple:
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+def _load_corpus(corpus_dir: str) -> list:
+    """Return (filename, bytes, manifest entry) for every PDF in the corpus directory"""
+    manifest = load_manifest(corpus_dir)
+    documents = []
+    for filename in sorted(os.listdir(corpus_dir)):
+        if filename.lower().endswith('.pdf'):
+            with open(os.path.join(corpus_dir, filename), 'rb') as f:
+                documents.append((filename, f.read(), manifest.get(filename, {})))
+    return documents
+
+def git_revision() -> dict:
+    """Return the commit the benchmark runs on and whether the tree has local changes"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+# Scenarios
+
+def bench_parse(documents: list) -> dict:
+    """Parse every document with the automatic backend chain, one document at a time"""
+    from pdf_parser import extract_text_and_backend
+
+    by_layout = defaultdict(lambda: {"documents": 0, "pages": 0, "bytes": 0, "seconds": 0.0})
+    latencies, backends = [], defaultdict(int)
+    for filename, pdf_bytes, entry in documents:
+        (_, backend), elapsed = _timed_call(extract_text_and_backend, pdf_bytes, parallel=False)
+        latencies.append(elapsed)
+        backends[backend] += 1
+        for key in ("all", entry.get('layout', 'unknown')):
+            totals = by_layout[key]
+            totals["documents"] += 1
+            totals["pages"] += entry.get('pages', 0)
+            totals["bytes"] += len(pdf_bytes)
+            totals["seconds"] += elapsed
+
+    throughput = {}
+    for layout, totals in sorted(by_layout.items()):
+        seconds = max(totals["seconds"], 1e-9)
+        throughput[layout] = {
+            "documents": totals["documents"],
+            "docs_per_s": totals["documents"] / seconds,
+            "pages_per_s": totals["pages"] / seconds,
+            "mb_per_s": totals["bytes"] / seconds / 1e6,
+        }
+    return {"throughput": throughput, "latency": percentiles(latencies), "backends": dict(backends)}
+
+def _stage_totals() -> dict:
+    from metrics import get_metrics, STAGE_METRIC
+
+    return get_metrics().snapshot().get(STAGE_METRIC, {})
+
+def _stage_breakdown(before: dict, after: dict) -> dict:
+    """Return count and total milliseconds per stage label set recorded between two snapshots"""
+    breakdown = {}
+    for labels, series in after.items():
+        previous = before.get(labels, {"count": 0, "sum": 0.0})
+        count = series["count"] - previous["count"]
+        if count:
+            breakdown[labels] = {"count": count, "total_ms": 1000 * (series["sum"] - previous["sum"])}
+    return breakdown
+
+def _flush_pipeline_cache() -> None:
+    """Persist the counters of the shared extraction cache while its directory still exists, not at exit"""
+    import extraction_cache
+
+    if extraction_cache._default_cache is not None:
+        extraction_cache._default_cache.flush_stats()
+
+def _isolate_pipeline(name: str) -> None:
+    """Point the shared store and extraction cache at empty ones under name, so runs start cold"""
+    import resume_store
+    import extraction_cache
+
+    _flush_pipeline_cache()
+    extraction_cache._default_cache = extraction_cache.ExtractionCache(os.path.join(name, ".extraction_cache"))
+    resume_store._default_store = resume_store.ResumeStore(os.path.join(name, "resumes.db"))
+
+def bench_e2e(documents: list, concurrency: int) -> dict:
+    """Run process_document over the corpus twice: cold (parse and LLM) and warm (extraction cache hits)"""
+    from resume_pipeline import process_document
+
+    _isolate_pipeline("e2e_bench")
+
+    def run_one(document):
+        filename, pdf_bytes, _ = document
+        return _timed_call(process_document, filename, pdf_bytes, parallel=False)
+
+    results = {}
+    for run in ("cold", "warm"):
+        before = _stage_totals()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            outcomes = list(executor.map(run_one, documents))
+        wall = time.perf_counter() - started
+        statuses = defaultdict(int)
+        for outcome, _ in outcomes:
+            statuses[outcome['status']] += 1
+        results[run] = {
+            "latency": percentiles([elapsed for _, elapsed in outcomes]),
+            "docs_per_s": len(documents) / max(wall, 1e-9),
+            "statuses": dict(statuses),
+            "stages": _stage_breakdown(before, _stage_totals()),
+        }
+    results["concurrency"] = concurrency
+    return results
+
+def _raw_text(record: dict) -> str:
+    lines = [record['name'], record['email'], record['phone'], "Skills", ", ".join(record['skills']), "Experience"]
+    for job in record['work_experience']:
+        lines += [f"{job['role']} - {job['company']}", job['dates'], job['description']]
+    return "\n".join(lines)
+
+def bench_store(sizes: list, repeat: int, seed: int) -> dict:
+    """
+    Grow one store through every size and time saves, then list, search, skill filter and load queries.
+
+    Records are written through ResumeStore.save() one at a time, as the pipeline does, so
+    the insert rate includes the skill index maintenance.
+    """
+    from resume_store import ResumeStore
+
+    rng = random.Random(seed)
+    store = ResumeStore(os.path.join("store_bench", "resumes.db"))
+    results = {}
+    loaded = 0
+    for size in sorted(sizes):
+        started = time.perf_counter()
+        for index in range(loaded, size):
+            record = synthetic_record(rng, index)
+            store.save(record, f"record_{index}.json", _raw_text(record))
+        elapsed = time.perf_counter() - started
+        inserted = size - loaded
+        loaded = size
+
+        queries = {
+            "list_page": lambda: store.list_resumes(limit=25, offset=rng.randrange(size)),
+            "search_text": lambda: store.search_resumes(rng.choice(("smith", "maria", "example.com", "zz")), limit=25),
+            "filter_all": lambda: store.search_resumes("", rng.sample(SKILLS, 2), match_all=True, limit=25),
+            "filter_any": lambda: store.search_resumes("", rng.sample(SKILLS, 3), match_all=False, limit=25),
+            "search_and_filter": lambda: store.search_resumes("a", rng.sample(SKILLS, 1), limit=25),
+            "load_record": lambda: store.get_resume(f"record_{rng.randrange(size)}.json"),
+            "match_job": lambda: store.similar_resumes(
+                f"Hiring a {rng.choice(ROLES)} with {', '.join(rng.sample(SKILLS, 4))} experience", limit=10),
+            "similar_resume": lambda: store.similar_resumes(filename=f"record_{rng.randrange(size)}.json", limit=10),
+            "skill_frequencies": store.skill_frequencies,
+        }
+        timings = {}
+        for name, query in queries.items():
+            timings[name] = percentiles([_timed_call(query)[1] for _ in range(repeat)])
+        db_bytes = sum(
+            os.path.getsize(store.db_path + suffix) for suffix in ("", "-wal") if os.path.exists(store.db_path + suffix)
+        )
+        results[str(size)] = {
+            "inserted": inserted,
+            "inserts_per_s": inserted / max(elapsed, 1e-9),
+            "db_mb": db_bytes / 1e6,
+            "queries": timings,
+        }
+    return results
+
+def _max_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return rss / 1e6 if sys.platform == "darwin" else rss / 1e3
+
+def bench_memory(documents: list) -> dict:
+    """Measure the peak Python heap of parsing each document and of processing the whole corpus"""
+    from pdf_parser import extract_text_and_backend
+    from resume_pipeline import process_document
+
+    _isolate_pipeline("memory_bench")
+    parse_peaks = {}
+    tracemalloc.start()
+    try:
+        for filename, pdf_bytes, entry in documents:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            extract_text_and_backend(pdf_bytes, parallel=False)
+            parse_peaks[filename] = (tracemalloc.get_traced_memory()[1] - baseline, entry.get('pages', 0), len(pdf_bytes))
+
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        for filename, pdf_bytes, _ in documents:
+            process_document(filename, pdf_bytes, parallel=False)
+        pipeline_peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    largest = max(parse_peaks.items(), key=lambda item: item[1][0])
+    return {
+        "parse_peak_mb": largest[1][0] / 1e6,
+        "parse_peak_document": {"file": largest[0], "pages": largest[1][1], "bytes": largest[1][2]},
+        "parse_mean_peak_mb": sum(peak for peak, _, _ in parse_peaks.values()) / len(parse_peaks) / 1e6,
+        "pipeline_peak_mb": pipeline_peak / 1e6,
+        "max_rss_mb": _max_rss_mb(),
+    }
+
+# Runner
+
+def install_backend(corpus_dir: str, replay: str | None, latency_scale: float, requests_per_minute: int) -> RecordedBackend:
+    """Make the shared Gemini client answer from recordings and the corpus ground truth"""
+    from gemini_client import GeminiClient, set_gemini_client
+    from llm_extractor import MODEL_NAME
+
+    manifest = load_manifest(corpus_dir)
+    backend = RecordedBackend(
+        load_recordings(replay) if replay else None,
+        fallback=truth_responder(manifest) if manifest else heuristic_responder,
+        latency_scale=latency_scale,
+    )
+    set_gemini_client(GeminiClient(MODEL_NAME, backend=backend, requests_per_minute=requests_per_minute,
+                                   tokens_per_minute=10 ** 9))
+    return backend
+
+def run(args) -> dict:
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    results = {
+        "meta": {
+            **git_revision(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "scenarios": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="resume-bench-") as workdir:
+        corpus_dir = os.path.abspath(args.corpus) if args.corpus else os.path.join(workdir, "corpus")
+        if not args.corpus:
+            generate_corpus(corpus_dir, args.count, args.seed)
+        replay = os.path.abspath(args.replay) if args.replay else None
+
+        # The store, extraction cache and metrics log resolve paths relative to the working directory
+        previous_cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            documents = _load_corpus(corpus_dir)
+            results["meta"]["corpus"] = {
+                "documents": len(documents),
+                "pages": sum(entry.get('pages', 0) for _, _, entry in documents),
+                "bytes": sum(len(pdf_bytes) for _, pdf_bytes, _ in documents),
+                "generated": not args.corpus,
+            }
+            backend = install_backend(corpus_dir, replay, args.latency_scale, args.rpm)
+            for name in scenarios:
+                print(f"Running {name} scenario...", file=sys.stderr)
+                # Per-document progress lines of the pipeline would drown the report
+                with contextlib.redirect_stdout(io.StringIO()):
+                    if name == "parse":
+                        result = bench_parse(documents)
+                    elif name == "e2e":
+                        result = bench_e2e(documents, args.concurrency)
+                    elif name == "store":
+                        result = bench_store(args.store_sizes, args.repeat, args.seed)
+                    else:
+                        result = bench_memory(documents)
+                results["scenarios"][name] = result
+            results["meta"]["llm_backend"] = {"recorded_hits": backend.hits, "fallback_responses": backend.misses}
+        finally:
+            _flush_pipeline_cache()
+            os.chdir(previous_cwd)
+    return results
+
+def _flatten(value, prefix: str = "") -> dict:
+    if isinstance(value, dict):
+        flat = {}
+        for key, item in value.items():
+            flat.update(_flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+        return flat
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+def compare(old: dict, new: dict) -> list:
+    """Return (metric, old value, new value, relative change) for every metric present in both results"""
+    old_flat, new_flat = _flatten(old.get("scenarios", {})), _flatten(new.get("scenarios", {}))
+    rows = []
+    for key in sorted(old_flat.keys() & new_flat.keys()):
+        before, after = old_flat[key], new_flat[key]
+        change = (after - before) / before if before else None
+        rows.append((key, before, after, change))
+    return rows
+
+def _print_summary(results: dict) -> None:
+    scenarios = results["scenarios"]
+    if "parse" in scenarios:
+        overall = scenarios["parse"]["throughput"]["all"]
+        print(f"parse   {overall['docs_per_s']:.1f} docs/s, {overall['pages_per_s']:.1f} pages/s, "
+              f"{overall['mb_per_s']:.2f} MB/s")
+    if "e2e" in scenarios:
+        for run in ("cold", "warm"):
+            latency = scenarios["e2e"][run]["latency"]
+            print(f"e2e     {run}: p50 {latency['p50_ms']:.1f} ms, p90 {latency['p90_ms']:.1f} ms, "
+                  f"p99 {latency['p99_ms']:.1f} ms  {scenarios['e2e'][run]['statuses']}")
+    for size, result in scenarios.get("store", {}).items():
+        queries = result["queries"]
+        print(f"store   {size:>7} records: {result['inserts_per_s']:.0f} inserts/s, "
+              f"filter p50 {queries['filter_all']['p50_ms']:.2f} ms, search p50 {queries['search_text']['p50_ms']:.2f} ms, "
+              f"match p50 {queries['match_job']['p50_ms']:.2f} ms")
+    if "memory" in scenarios:
+        memory = scenarios["memory"]
+        print(f"memory  parse peak {memory['parse_peak_mb']:.1f} MB, pipeline peak {memory['pipeline_peak_mb']:.1f} MB, "
+              f"max RSS {memory['max_rss_mb']} MB")
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the offline pipeline benchmarks")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenarios to run")
+    parser.add_argument("--corpus", help="Directory of PDFs to use instead of a generated corpus")
+    parser.add_argument("--count", type=int, default=40, help="Documents in the generated corpus (default: 40)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the corpus and store records")
+    parser.add_argument("--replay", help="JSON-lines file of recorded Gemini responses to replay")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="Factor applied to recorded and simulated LLM latencies (0 for none)")
+    parser.add_argument("--rpm", type=int, default=1_000_000,
+                        help="Gemini requests per minute allowed by the client (e.g. 15 to include quota waits)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Documents processed at once in the e2e scenario")
+    parser.add_argument("--store-sizes", type=lambda value: [int(size) for size in value.split(",")],
+                        default=list(DEFAULT_STORE_SIZES), help="Comma-separated store sizes (default: 1000,10000,100000)")
+    parser.add_argument("--repeat", type=int, default=50, help="Repetitions of every store query (default: 50)")
+    parser.add_argument("--output", help="Result file (default: benchmark-<commit>-<timestamp>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        loaded = []
+        for path in args.compare:
+            with open(path, 'r', encoding='utf-8') as f:
+                loaded.append(json.load(f))
+        print(f"{'metric':<72} {'old':>12} {'new':>12} {'change':>8}")
+        for key, before, after, change in compare(*loaded):
+            change_text = f"{change:+.1%}" if change is not None else "n/a"
+            print(f"{key:<72} {before:>12.3f} {after:>12.3f} {change_text:>8}")
+        return 0
+
+    results = run(args)
+    _print_summary(results)
+    output = args.output or f"benchmark-{(results['meta']['commit'] or 'nogit')[:10]}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
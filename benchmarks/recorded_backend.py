@@ -0,0 +1,131 @@
+"""
+Recorded-response Gemini backends for offline benchmark runs
+
+RecordingBackend wraps a live backend and appends every prompt's response and latency to
+a JSON-lines file. RecordedBackend replays such a file: prompts are matched by the
+SHA-256 of their text and answered with the recorded response after the recorded latency
+(optionally scaled). Prompts that were never recorded go to a fallback responder; the
+synthetic corpus supplies one answering from its ground truth, and heuristic_responder
+answers any prompt from the local pre-extractor.
+"""
+import json
+import time
+import asyncio
+import hashlib
+import threading
+
+from gemini_client import Completion, GeminiError, estimate_tokens
+from local_extractor import pre_extract, VERDICT_NOT_RESUME
+from llm_extractor import RESUME_LIST_FIELDS
+
+# Latency (seconds) applied to fallback responses, roughly a gemini-1.5-flash extraction call
+DEFAULT_FALLBACK_LATENCY = 1.5
+
+def prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+def load_recordings(path: str) -> dict:
+    """Return recorded responses by prompt key; later lines win for repeated prompts"""
+    recordings = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                recordings[entry['prompt_sha256']] = entry
+    return recordings
+
+def prompt_document_text(prompt: str) -> str:
+    """Return the resume text embedded in a combined extraction prompt"""
+    _, _, rest = prompt.partition("Text:")
+    text, _, _ = rest.rpartition("Return ONLY the JSON object")
+    return text.strip() if text else rest.strip()
+
+def combined_response(record: dict, is_valid_resume: bool = True) -> str:
+    """Serialize a structured record as a response to the combined extraction prompt"""
+    resume = {field: record.get(field, "") for field in ("name", "email", "phone")}
+    resume.update({field: record.get(field) or [] for field in RESUME_LIST_FIELDS})
+    return json.dumps({"is_valid_resume": is_valid_resume, "resume": resume})
+
+def heuristic_responder(prompt: str) -> str:
+    """Answer a combined extraction prompt from the local pre-extractor (contact fields and verdict only)"""
+    pre = pre_extract(prompt_document_text(prompt))
+    return combined_response(pre['contact'], pre['verdict'] != VERDICT_NOT_RESUME)
+
+def truth_responder(manifest: dict):
+    """
+    Return a responder answering prompts from the ground truth of a synthetic corpus.
+
+    The document is identified by its unique email address; prompts for a later chunk of a
+    long resume, which no longer contain it, get the local heuristic answer instead.
+    """
+    truth_by_email = {entry['truth']['email']: entry['truth'] for entry in manifest.values()}
+
+    def respond(prompt: str) -> str:
+        text = prompt_document_text(prompt)
+        for email, truth in truth_by_email.items():
+            if email in text:
+                return combined_response(truth)
+        return heuristic_responder(prompt)
+
+    return respond
+
+class RecordedBackend:
+    """
+    Gemini backend replaying recorded responses.
+
+    Args:
+        recordings: Entries by prompt key, as returned by load_recordings()
+        fallback: Callable answering prompts without a recording; None makes them fail
+        latency_scale: Factor applied to recorded latencies (0 replays instantly)
+        fallback_latency: Seconds to wait before a fallback response, before scaling
+    """
+
+    def __init__(self, recordings: dict | None = None, fallback=None, latency_scale: float = 1.0,
+                 fallback_latency: float = DEFAULT_FALLBACK_LATENCY):
+        self.recordings = recordings or {}
+        self.fallback = fallback
+        self.latency_scale = latency_scale
+        self.fallback_latency = fallback_latency
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    async def generate(self, prompt: str, timeout: float | None = None) -> Completion:
+        entry = self.recordings.get(prompt_key(prompt))
+        with self._lock:
+            if entry is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is None and self.fallback is None:
+            raise GeminiError("No recorded response for prompt")
+        latency = entry['latency'] if entry is not None else self.fallback_latency
+        if latency * self.latency_scale > 0:
+            await asyncio.sleep(latency * self.latency_scale)
+        if entry is not None:
+            return Completion(entry['response'], entry.get('prompt_tokens') or estimate_tokens(prompt),
+                              entry.get('response_tokens') or estimate_tokens(entry['response']))
+        text = self.fallback(prompt)
+        return Completion(text, estimate_tokens(prompt), estimate_tokens(text))
+
+class RecordingBackend:
+    """Gemini backend forwarding to another backend and appending every response to a JSON-lines file"""
+
+    def __init__(self, inner, path: str):
+        self.inner = inner
+        self.path = path
+        self._lock = threading.Lock()
+
+    async def generate(self, prompt: str, timeout: float | None = None) -> Completion:
+        started = time.perf_counter()
+        completion = await self.inner.generate(prompt, timeout=timeout)
+        entry = {
+            "prompt_sha256": prompt_key(prompt),
+            "latency": round(time.perf_counter() - started, 4),
+            "response": completion.text,
+            "prompt_tokens": completion.prompt_tokens,
+            "response_tokens": completion.response_tokens,
+        }
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return completion
@@ -0,0 +1,394 @@
+"""
+Module for extracting text from resume documents in any supported format
+
+The format of a document is detected from its content, never from its file name: libmagic
+(python-magic) is asked for the MIME type first and each format's own signature check is
+used when libmagic is unavailable or only reports a generic type such as application/zip.
+Every format registers an extractor in FORMATS; extractors share one streaming interface,
+yielding blocks of text (pages, paragraphs) straight from the document bytes, so no format
+is converted to another on disk first. The dispatcher applies the same character and time
+budgets to all of them.
+
+Supported formats: PDF, DOCX, RTF, HTML and plain text. Add more with register_format().
+"""
+import io
+import os
+import re
+import time
+import codecs
+import zipfile
+from html.parser import HTMLParser
+from dataclasses import dataclass, field
+from xml.etree.ElementTree import iterparse
+
+from metrics import timed
+from pdf_parser import iter_best_pdf_pages, MAX_PAGES, MAX_CHARS, TIMEOUT_SECONDS, PAGE_BREAK
+
+try:
+    import magic
+except ImportError:  # libmagic or python-magic missing; signature checks only
+    magic = None
+
+# Bytes inspected by libmagic and the signature checks
+SNIFF_BYTES = 8192
+# Budgets for non-PDF formats default to the PDF ones
+DOCUMENT_MAX_CHARS = int(os.getenv("DOCUMENT_MAX_CHARS", str(MAX_CHARS)))
+DOCUMENT_TIMEOUT = float(os.getenv("DOCUMENT_TIMEOUT", str(TIMEOUT_SECONDS)))
+# Share of control characters above which undecodable bytes are not treated as text
+MAX_TEXT_CONTROL_RATIO = 0.01
+# libmagic types too generic to pick a format; the signature checks decide between the candidates
+GENERIC_MIME_TYPES = {"text/plain", "text/xml", "application/xml", "application/zip", "application/octet-stream"}
+
+class UnsupportedFormatError(ValueError):
+    """Raised when a document is not in any registered format"""
+
+class DocumentTimeoutError(TimeoutError):
+    """Raised when text extraction exceeds the per-document time budget"""
+
+@dataclass
+class ExtractionContext:
+    """Budgets handed to an extractor; extractors may set backend to name what produced the text"""
+    max_chars: int = DOCUMENT_MAX_CHARS
+    deadline: float | None = None
+    parallel: bool = True
+    backend: str = ""
+
+@dataclass
+class DocumentFormat:
+    """
+    A registered document format.
+
+    Attributes:
+        name: Format name, also the default backend name stored with saved records
+        mime_types: MIME types libmagic reports for the format
+        sniff: sniff(head) -> bool, signature check on the first SNIFF_BYTES of the content
+        extract: extract(content, context) -> iterator of text blocks, in document order
+        separator: String placed between consecutive blocks
+        extensions: Usual file extensions, used only to filter file pickers and directory scans
+    """
+    name: str
+    mime_types: tuple
+    sniff: object
+    extract: object
+    separator: str = "\n"
+    extensions: tuple = field(default_factory=tuple)
+
+# Registered formats in signature-check order; plain text must stay last as it accepts most inputs
+FORMATS = {}
+
+def register_format(document_format: DocumentFormat, before: str | None = None) -> None:
+    """Register a document format, optionally checked before an already registered one"""
+    if before is None or before not in FORMATS:
+        FORMATS[document_format.name] = document_format
+        return
+    items = [(name, fmt) for name, fmt in FORMATS.items() if name != document_format.name]
+    FORMATS.clear()
+    for name, fmt in items:
+        if name == before:
+            FORMATS[document_format.name] = document_format
+        FORMATS[name] = fmt
+
+def supported_extensions() -> tuple:
+    """File extensions of the registered formats, for file pickers and directory scans"""
+    return tuple(ext for fmt in FORMATS.values() for ext in fmt.extensions)
+
+def detect_format(content: bytes) -> DocumentFormat:
+    """
+    Detect the format of a document from its content.
+
+    Raises:
+        UnsupportedFormatError: If no registered format recognizes the content
+    """
+    head = bytes(content[:SNIFF_BYTES])
+    if magic is not None:
+        try:
+            mime_type = magic.from_buffer(head, mime=True)
+        except Exception as e:
+            print(f"Warning: libmagic failed, using signature checks: {str(e)}")
+            mime_type = None
+        if mime_type not in GENERIC_MIME_TYPES:
+            for fmt in FORMATS.values():
+                if mime_type in fmt.mime_types:
+                    return fmt
+    for fmt in FORMATS.values():
+        if fmt.sniff(head):
+            return fmt
+    raise UnsupportedFormatError("Unsupported document format")
+
+def iter_document_text(content: bytes, max_chars: int = DOCUMENT_MAX_CHARS, timeout: float = DOCUMENT_TIMEOUT,
+                       parallel: bool = True, context: ExtractionContext | None = None,
+                       document_format: DocumentFormat | None = None):
+    """
+    Lazily yield the text blocks of a document, stopping at the character budget.
+
+    Args:
+        content: Document bytes
+        max_chars: Maximum number of characters to yield (0 for no limit)
+        timeout: Per-document time budget in seconds (0 for no limit), checked between blocks
+        parallel: Allow extractors to use worker processes (page-parallel PDF parsing)
+        context: Optional context receiving the backend name; created when omitted
+        document_format: Format of the content when the caller already detected it
+
+    Yields:
+        str: Next block of text
+
+    Raises:
+        UnsupportedFormatError: If the format is not recognized
+        DocumentTimeoutError: If the time budget is exceeded
+    """
+    fmt = document_format or detect_format(content)
+    context = context or ExtractionContext()
+    context.max_chars, context.parallel, context.backend = max_chars, parallel, fmt.name
+    context.deadline = time.monotonic() + timeout if timeout else None
+    chars = 0
+    for block in fmt.extract(content, context):
+        if context.deadline is not None and time.monotonic() > context.deadline:
+            raise DocumentTimeoutError("Document text extraction exceeded the time budget")
+        if max_chars and chars + len(block) >= max_chars:
+            yield block[:max_chars - chars]
+            return
+        chars += len(block)
+        yield block
+
+def extract_text_and_format(content: bytes, max_chars: int = DOCUMENT_MAX_CHARS, timeout: float = DOCUMENT_TIMEOUT,
+                            parallel: bool = True) -> tuple:
+    """
+    Extract the text of a document of any supported format.
+
+    Returns:
+        tuple: (extracted text, backend that produced it: the PDF backend for PDFs, else the format name)
+
+    Raises:
+        UnsupportedFormatError: If the format is not recognized
+        Exception: If the document cannot be read or the time budget is exceeded
+    """
+    fmt = detect_format(content)
+    context = ExtractionContext()
+    blocks = []
+    with timed("document_extract", format=fmt.name):
+        for block in iter_document_text(content, max_chars, timeout, parallel, context, fmt):
+            # Runs of empty blocks collapse into one, which keeps the blank line between paragraphs
+            # that heading detection and chunking rely on
+            if block.strip():
+                blocks.append(block)
+            elif blocks and blocks[-1]:
+                blocks.append("")
+    return fmt.separator.join(blocks).strip(), context.backend
+
+# Text decoding
+
+def decode_text(content: bytes) -> str:
+    """Decode text bytes using their BOM, else UTF-8, else Windows-1252"""
+    for bom, encoding in ((codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16')):
+        if content.startswith(bom):
+            return content.decode(encoding, errors='replace')
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        return content.decode('cp1252', errors='replace')
+
+def _looks_like_text(head: bytes) -> bool:
+    if not head or (b"\x00" in head and not head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE))):
+        return False
+    text = decode_text(head)
+    controls = sum(1 for char in text if ord(char) < 32 and char not in "\n\r\t\f")
+    return controls <= MAX_TEXT_CONTROL_RATIO * len(text)
+
+# PDF
+
+def _sniff_pdf(head: bytes) -> bool:
+    # Readers accept a header anywhere in the first kilobyte
+    return b"%PDF-" in head[:1024]
+
+def _extract_pdf(content: bytes, context: ExtractionContext):
+    """Stream pages from the PDF backends, recording the backend that produced them; pages without text are dropped"""
+    timeout = max(0.001, context.deadline - time.monotonic()) if context.deadline is not None else 0
+    pages = iter_best_pdf_pages(content, MAX_PAGES, context.max_chars, timeout, context.parallel,
+                                on_backend=lambda backend: setattr(context, 'backend', backend))
+    yield from (page_text for page_text in pages if page_text)
+
+# DOCX
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+def _sniff_docx(head: bytes) -> bool:
+    # Part names are stored uncompressed in the zip local headers, so the word/ parts show up early
+    return head.startswith(b"PK\x03\x04") and b"word/" in head
+
+def _extract_docx(content: bytes, context: ExtractionContext):
+    """Stream paragraphs (including table cells) out of word/document.xml without unpacking the archive"""
+    with zipfile.ZipFile(io.BytesIO(content)) as archive, archive.open("word/document.xml") as document:
+        parts = []
+        for event, element in iterparse(document, events=("start", "end")):
+            if event == "start":
+                continue
+            if element.tag == WORD_NS + "t":
+                parts.append(element.text or "")
+            elif element.tag == WORD_NS + "tab":
+                parts.append("\t")
+            elif element.tag in (WORD_NS + "br", WORD_NS + "cr"):
+                parts.append("\n")
+            elif element.tag == WORD_NS + "p":
+                yield "".join(parts)
+                parts = []
+                element.clear()
+
+# RTF
+
+# Destinations holding no document text
+RTF_SKIPPED_DESTINATIONS = {
+    "fonttbl", "colortbl", "stylesheet", "info", "pict", "header", "footer", "headerl", "headerr",
+    "footerl", "footerr", "object", "themedata", "colorschememapping", "latentstyles", "datastore",
+    "listtable", "listoverridetable", "rsidtbl", "generator", "xmlnstbl", "mmathPr",
+}
+RTF_SYMBOLS = {"par": "\n", "line": "\n", "tab": "\t", "emdash": "\u2014", "endash": "\u2013",
+               "bullet": "\u2022", "lquote": "\u2018", "rquote": "\u2019", "ldblquote": "\u201c", "rdblquote": "\u201d"}
+_RTF_TOKEN_RE = re.compile(rb"\\([a-zA-Z]+)(-?\d+)? ?|\\'([0-9a-fA-F]{2})|\\(.)|([{}])|[\r\n]+|([^\\{}\r\n]+)", re.S)
+
+def _sniff_rtf(head: bytes) -> bool:
+    return head.lstrip().startswith(b"{\\rtf")
+
+def _extract_rtf(content: bytes, context: ExtractionContext):
+    """Stream paragraphs out of RTF, decoding \\'hh escapes as Windows-1252 and \\uN as Unicode"""
+    stack = []
+    skipping = False
+    # Characters after a \uN escape that stand in for it in readers without Unicode support
+    unicode_skip = 1
+    pending_skip = 0
+    parts = []
+    for match in _RTF_TOKEN_RE.finditer(content):
+        word, argument, hex_code, symbol, brace, text = match.groups()
+        if brace == b"{":
+            stack.append((skipping, unicode_skip))
+        elif brace == b"}":
+            if stack:
+                skipping, unicode_skip = stack.pop()
+        elif word is not None:
+            name = word.decode('ascii')
+            if name in RTF_SKIPPED_DESTINATIONS:
+                skipping = True
+            elif skipping:
+                continue
+            elif name == "uc":
+                unicode_skip = int(argument or 1)
+            elif name == "u":
+                code = int(argument or 0)
+                parts.append(chr(code + 65536 if code < 0 else code))
+                pending_skip = unicode_skip
+            elif name in RTF_SYMBOLS:
+                if name == "par":
+                    yield "".join(parts)
+                    parts = []
+                else:
+                    parts.append(RTF_SYMBOLS[name])
+        elif symbol == b"*":
+            # Ignorable destination unknown to this reader
+            skipping = True
+        elif skipping:
+            continue
+        elif hex_code is not None:
+            if pending_skip:
+                pending_skip -= 1
+            else:
+                parts.append(bytes([int(hex_code, 16)]).decode('cp1252', errors='replace'))
+        elif symbol is not None:
+            if symbol in (b"\\", b"{", b"}"):
+                parts.append(symbol.decode('ascii'))
+            elif symbol == b"~":
+                parts.append("\u00a0")
+        elif text is not None:
+            decoded = text.decode('cp1252', errors='replace')
+            if pending_skip:
+                skipped = min(pending_skip, len(decoded))
+                decoded, pending_skip = decoded[skipped:], pending_skip - skipped
+            parts.append(decoded)
+    if parts:
+        yield "".join(parts)
+
+# HTML
+
+HTML_SKIPPED_TAGS = {"script", "style", "head", "noscript", "template", "svg"}
+HTML_BLOCK_TAGS = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article",
+                   "header", "footer", "table", "ul", "ol", "dl", "dt", "dd", "blockquote", "pre", "hr"}
+# Bytes fed to the HTML parser at a time
+HTML_FEED_BYTES = 16384
+
+def _sniff_html(head: bytes) -> bool:
+    start = head.lstrip(codecs.BOM_UTF8 + b" \t\r\n").lower()
+    if start.startswith((b"<!doctype html", b"<html")):
+        return True
+    # XHTML behind an XML declaration, or markup starting with a comment
+    return start.startswith((b"<?xml", b"<!--")) and b"<html" in start
+
+class _HTMLTextParser(HTMLParser):
+    """Collect visible text, ending a block at every block-level tag"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = []
+        self._parts = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HTML_SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in HTML_BLOCK_TAGS:
+            self._end_block()
+        elif tag in ("td", "th"):
+            self._parts.append("\t")
+
+    def handle_endtag(self, tag):
+        if tag in HTML_SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in HTML_BLOCK_TAGS:
+            self._end_block()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._parts.append(data)
+
+    def _end_block(self):
+        block = re.sub(r"[ \t\r\n]+", " ", "".join(self._parts)).strip()
+        if block:
+            self.blocks.append(block)
+        self._parts = []
+
+    def close(self):
+        super().close()
+        self._end_block()
+
+def _html_encoding(head: bytes) -> str:
+    match = re.search(rb"<meta[^>]+charset=[\"']?([\w-]+)", head, re.I)
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode('ascii')).name
+        except LookupError:
+            pass
+    return 'utf-8'
+
+def _extract_html(content: bytes, context: ExtractionContext):
+    """Feed the markup to the parser in chunks and yield the blocks completed by each one"""
+    decoder = codecs.getincrementaldecoder(_html_encoding(content[:SNIFF_BYTES]))(errors='replace')
+    parser = _HTMLTextParser()
+    for start in range(0, len(content), HTML_FEED_BYTES):
+        parser.feed(decoder.decode(content[start:start + HTML_FEED_BYTES]))
+        yield from parser.blocks
+        parser.blocks = []
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    yield from parser.blocks
+
+# Plain text
+
+def _extract_text(content: bytes, context: ExtractionContext):
+    yield from decode_text(content).splitlines()
+
+register_format(DocumentFormat("pdf", ("application/pdf",), _sniff_pdf, _extract_pdf, PAGE_BREAK, (".pdf",)))
+register_format(DocumentFormat(
+    "docx", ("application/vnd.openxmlformats-officedocument.wordprocessingml.document",),
+    _sniff_docx, _extract_docx, "\n", (".docx",),
+))
+register_format(DocumentFormat("rtf", ("text/rtf", "application/rtf"), _sniff_rtf, _extract_rtf, "\n", (".rtf",)))
+register_format(DocumentFormat("html", ("text/html", "application/xhtml+xml"), _sniff_html, _extract_html, "\n",
+                               (".html", ".htm")))
+register_format(DocumentFormat("text", ("text/plain",), _looks_like_text, _extract_text, "\n", (".txt", ".md")))
@@ -0,0 +1,303 @@
+"""
+Module for detecting near-duplicate resumes with MinHash/LSH text fingerprints and contact keys
+
+Usage:
+    python duplicate_index.py [--output report.json]    # duplicate report over the saved store
+
+Every saved resume gets a fingerprint: its normalized email and phone number and a MinHash
+signature of the word shingles of its text. Signatures are split into LSH bands stored in
+SQLite, so resumes sharing a band are found with an indexed lookup instead of comparing the
+new text with every saved one; candidates are then confirmed by the Jaccard similarity
+estimated from the full signatures. Resumes matching by text, email or phone are linked to
+the same candidate.
+"""
+import re
+import sys
+import json
+import zlib
+import sqlite3
+import argparse
+from dataclasses import dataclass
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resume_fingerprints (
+    resume_id INTEGER PRIMARY KEY REFERENCES resumes(id) ON DELETE CASCADE,
+    candidate_id INTEGER NOT NULL,
+    email TEXT NOT NULL DEFAULT '',
+    phone TEXT NOT NULL DEFAULT '',
+    signature BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_fingerprints_email ON resume_fingerprints(email) WHERE email != '';
+CREATE INDEX IF NOT EXISTS idx_fingerprints_phone ON resume_fingerprints(phone) WHERE phone != '';
+CREATE INDEX IF NOT EXISTS idx_fingerprints_candidate ON resume_fingerprints(candidate_id);
+CREATE TABLE IF NOT EXISTS resume_lsh_bands (
+    band_key INTEGER NOT NULL,
+    resume_id INTEGER NOT NULL REFERENCES resumes(id) ON DELETE CASCADE,
+    PRIMARY KEY (band_key, resume_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_lsh_bands_resume ON resume_lsh_bands(resume_id);
+"""
+
+VERSION_KEY = 'duplicate_index_version'
+
+# Words per shingle
+SHINGLE_SIZE = 3
+# MinHash permutations, split into LSH_BANDS bands of NUM_PERMUTATIONS / LSH_BANDS rows;
+# 16 bands of 8 rows make resumes above ~0.7 Jaccard similarity share a band
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16
+# Estimated Jaccard similarity at which two resume texts count as near-duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.8
+# Trailing digits compared for phone numbers, so country-code prefixes do not matter
+PHONE_DIGITS = 10
+# Phone numbers with fewer digits are not used as keys
+MIN_PHONE_DIGITS = 7
+# Resumes fingerprinted per batch when the index is built for an existing store
+REBUILD_BATCH_SIZE = 500
+
+# Match reasons, strongest first
+MATCH_TEXT = "text"
+MATCH_EMAIL = "email"
+MATCH_PHONE = "phone"
+
+_rng = np.random.default_rng(0x5EED)
+# Multiply-shift hash functions h(x) = (a * x + b) >> 32 over 64-bit words, one per permutation
+_MULTIPLIERS = _rng.integers(1, 2 ** 63, NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_OFFSETS = _rng.integers(0, 2 ** 63, NUM_PERMUTATIONS, dtype=np.uint64)
+
+@dataclass
+class Fingerprint:
+    """Contact keys and MinHash signature of one resume"""
+    email: str = ""
+    phone: str = ""
+    # uint32 MinHash signature, or None for texts too short to shingle
+    signature: np.ndarray | None = None
+
+def normalize_email(email) -> str:
+    return str(email or '').strip().lower()
+
+def normalize_phone(phone) -> str:
+    digits = re.sub(r"\D", "", str(phone or ''))
+    return digits[-PHONE_DIGITS:] if len(digits) >= MIN_PHONE_DIGITS else ''
+
+def minhash_signature(text: str) -> np.ndarray | None:
+    """
+    MinHash signature of the word shingles of a text.
+
+    The text is lowercased and reduced to its words, so layout, punctuation and spacing
+    differences between two exports of the same resume do not change the shingles.
+
+    Returns:
+        np.ndarray: NUM_PERMUTATIONS uint32 minimum hashes, or None if the text has no shingles
+    """
+    words = re.findall(r"\w+", (text or '').lower())
+    if len(words) < SHINGLE_SIZE:
+        return None
+    shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+    with np.errstate(over='ignore'):
+        permuted = (_MULTIPLIERS[:, None] * hashes[None, :] + _OFFSETS[:, None]) >> np.uint64(32)
+    return permuted.min(axis=1).astype(np.uint32)
+
+def fingerprint(text: str, email='', phone='') -> Fingerprint:
+    return Fingerprint(normalize_email(email), normalize_phone(phone), minhash_signature(text))
+
+def estimated_similarity(first: np.ndarray | None, second: np.ndarray | None) -> float:
+    """Jaccard similarity of two shingle sets, estimated from their MinHash signatures"""
+    if first is None or second is None:
+        return 0.0
+    return float(np.mean(first == second))
+
+def band_keys(signature: np.ndarray) -> list:
+    """LSH bucket keys of a signature: the band number in the high bits and a hash of its rows in the low bits"""
+    rows = NUM_PERMUTATIONS // LSH_BANDS
+    return [(band << 32) | zlib.crc32(signature[band * rows:(band + 1) * rows].tobytes()) for band in range(LSH_BANDS)]
+
+def _decode_signature(value: bytes | None) -> np.ndarray | None:
+    return np.frombuffer(value, dtype=np.uint32) if value else None
+
+class DuplicateIndex:
+    """
+    Persistent fingerprint index linking resumes of the same candidate.
+
+    Fingerprints live in `resume_fingerprints` (with the candidate id: the id of the
+    candidate's first saved resume) and their LSH band keys in `resume_lsh_bands`. All
+    lookups are indexed queries, so the index keeps no state in memory and every process
+    sees the others' saves immediately.
+    """
+
+    def ensure_schema(self, conn: sqlite3.Connection) -> None:
+        conn.executescript(SCHEMA)
+
+    def is_built(self, conn: sqlite3.Connection) -> bool:
+        return conn.execute("SELECT 1 FROM meta WHERE key = ?", (VERSION_KEY,)).fetchone() is not None
+
+    # Lookups
+
+    def find(self, conn: sqlite3.Connection, fp: Fingerprint, exclude: int | None = None) -> list:
+        """
+        Find saved resumes matching a fingerprint.
+
+        Args:
+            conn: Store connection
+            fp: Fingerprint of the incoming resume
+            exclude: Resume id to leave out, e.g. the resume being re-saved
+
+        Returns:
+            list: Dicts with 'resume_id', 'candidate_id', 'reason' (text, email or phone) and
+                'similarity', near-duplicate texts first, then by similarity
+        """
+        rows = {}
+        if fp.email:
+            rows.update((row[0], row) for row in conn.execute(
+                "SELECT resume_id, candidate_id, email, phone, signature FROM resume_fingerprints WHERE email = ?",
+                (fp.email,)))
+        if fp.phone:
+            rows.update((row[0], row) for row in conn.execute(
+                "SELECT resume_id, candidate_id, email, phone, signature FROM resume_fingerprints WHERE phone = ?",
+                (fp.phone,)))
+        if fp.signature is not None:
+            keys = band_keys(fp.signature)
+            placeholders = ", ".join("?" for _ in keys)
+            rows.update((row[0], row) for row in conn.execute(
+                "SELECT f.resume_id, f.candidate_id, f.email, f.phone, f.signature FROM resume_fingerprints f "
+                f"WHERE f.resume_id IN (SELECT resume_id FROM resume_lsh_bands WHERE band_key IN ({placeholders}))",
+                keys))
+
+        matches = []
+        for resume_id, candidate_id, email, phone, signature in rows.values():
+            if resume_id == exclude:
+                continue
+            similarity = estimated_similarity(fp.signature, _decode_signature(signature))
+            if similarity >= NEAR_DUPLICATE_THRESHOLD:
+                reason = MATCH_TEXT
+            elif fp.email and email == fp.email:
+                reason = MATCH_EMAIL
+            elif fp.phone and phone == fp.phone:
+                reason = MATCH_PHONE
+            else:
+                continue
+            matches.append({"resume_id": resume_id, "candidate_id": candidate_id, "reason": reason, "similarity": similarity})
+        matches.sort(key=lambda match: (match["reason"] != MATCH_TEXT, -match["similarity"], match["resume_id"]))
+        return matches
+
+    def candidate_resumes(self, conn: sqlite3.Connection, resume_id: int) -> list:
+        """Return the ids of every resume linked to the same candidate as resume_id, oldest first"""
+        return [row[0] for row in conn.execute(
+            "SELECT resume_id FROM resume_fingerprints WHERE candidate_id = "
+            "(SELECT candidate_id FROM resume_fingerprints WHERE resume_id = ?) ORDER BY resume_id", (resume_id,))]
+
+    # Updates
+
+    def update(self, conn: sqlite3.Connection, resume_id: int, fp: Fingerprint) -> int:
+        """
+        Store the fingerprint of a saved resume and link it to a candidate.
+
+        A re-saved resume keeps its candidate; a new one joins the candidate of its best
+        match, or starts a new candidate. Must be called inside the caller's write transaction.
+
+        Returns:
+            int: Candidate id of the resume
+        """
+        row = conn.execute("SELECT candidate_id FROM resume_fingerprints WHERE resume_id = ?", (resume_id,)).fetchone()
+        if row is not None:
+            candidate_id = row[0]
+        else:
+            matches = self.find(conn, fp, exclude=resume_id)
+            candidate_id = matches[0]["candidate_id"] if matches else resume_id
+        conn.execute(
+            "INSERT OR REPLACE INTO resume_fingerprints (resume_id, candidate_id, email, phone, signature) VALUES (?, ?, ?, ?, ?)",
+            (resume_id, candidate_id, fp.email, fp.phone, fp.signature.tobytes() if fp.signature is not None else None),
+        )
+        conn.execute("DELETE FROM resume_lsh_bands WHERE resume_id = ?", (resume_id,))
+        if fp.signature is not None:
+            conn.executemany(
+                "INSERT OR IGNORE INTO resume_lsh_bands (band_key, resume_id) VALUES (?, ?)",
+                [(key, resume_id) for key in band_keys(fp.signature)],
+            )
+        return candidate_id
+
+    def rebuild(self, conn: sqlite3.Connection, documents) -> None:
+        """
+        Fingerprint every resume in id order, linking candidates as if they had been saved
+        one by one, committing unless a transaction is open.
+
+        Args:
+            conn: Store connection
+            documents: Iterable of (resume id, text, email, phone) for every saved resume
+        """
+        owns_transaction = not conn.in_transaction
+        conn.execute("DELETE FROM resume_fingerprints")
+        conn.execute("DELETE FROM resume_lsh_bands")
+        for resume_id, text, email, phone in documents:
+            self.update(conn, resume_id, fingerprint(text, email, phone))
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, '1')", (VERSION_KEY,))
+        if owns_transaction:
+            conn.commit()
+
+    # Reports
+
+    def duplicate_groups(self, conn: sqlite3.Connection) -> list:
+        """
+        Group every saved resume with all resumes it matches, transitively.
+
+        Unlike the candidate ids assigned at save time, groups are recomputed from scratch,
+        so two candidates bridged by a later resume end up in one group.
+
+        Returns:
+            list: Groups of two or more resumes, each a dict with 'resume_ids' (sorted) and
+                'matches' ((resume id, resume id, reason, similarity) tuples), largest first
+        """
+        parent = {}
+
+        def root(resume_id):
+            while parent.setdefault(resume_id, resume_id) != resume_id:
+                parent[resume_id] = parent[parent[resume_id]]
+                resume_id = parent[resume_id]
+            return resume_id
+
+        pairs = []
+        rows = conn.execute("SELECT resume_id, email, phone, signature FROM resume_fingerprints ORDER BY resume_id")
+        for resume_id, email, phone, signature in rows.fetchall():
+            fp = Fingerprint(email, phone, _decode_signature(signature))
+            for match in self.find(conn, fp, exclude=resume_id):
+                if match["resume_id"] < resume_id:
+                    pairs.append((match["resume_id"], resume_id, match["reason"], round(match["similarity"], 3)))
+                    parent[root(resume_id)] = root(match["resume_id"])
+
+        groups = {}
+        for pair in pairs:
+            groups.setdefault(root(pair[0]), []).append(pair)
+        report = []
+        for matches in groups.values():
+            resume_ids = sorted({resume_id for pair in matches for resume_id in pair[:2]})
+            report.append({"resume_ids": resume_ids, "matches": matches})
+        report.sort(key=lambda group: (-len(group["resume_ids"]), group["resume_ids"][0]))
+        return report
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Report groups of duplicate and near-duplicate saved resumes")
+    parser.add_argument("--output", help="Also write the full report to this JSON file")
+    args = parser.parse_args(argv)
+
+    from resume_store import get_resume_store
+
+    report = get_resume_store().duplicate_report()
+    for group in report["groups"]:
+        print(f"Candidate with {len(group['resumes'])} resumes:")
+        for resume in group["resumes"]:
+            print(f"  {resume['name'] or 'Unknown Name'} <{resume['email']}> {resume['__filename']}")
+        for first, second, reason, similarity in group["matches"]:
+            print(f"    {first} ~ {second}: {reason} match, text similarity {similarity:.0%}")
+    print(f"{report['duplicate_resumes']} of {report['total_resumes']} saved resume(s) duplicate another "
+          f"({len(report['groups'])} group(s))")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Report written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""
+Module for caching extraction results on disk, keyed by document content
+"""
+import os
+import json
+import time
+import atexit
+import hashlib
+import threading
+
+from llm_extractor import MODEL_NAME, PROMPT_VERSION
+from metrics import increment
+
+CACHE_DIR = os.path.join("resumes_data", ".extraction_cache")
+DEFAULT_MAX_BYTES = int(float(os.getenv("EXTRACTION_CACHE_MAX_MB", "256")) * 1024 * 1024)
+DEFAULT_MAX_AGE_SECONDS = int(float(os.getenv("EXTRACTION_CACHE_MAX_AGE_DAYS", "30")) * 86400)
+
+STATS_FILENAME = "stats.json"
+STAT_KEYS = ("pdf_hits", "text_hits", "misses", "evictions")
+# Counters are kept in memory and merged into stats.json at most this often (and at exit)
+STATS_FLUSH_SECONDS = 30
+# The directory is rescanned at least this often to drop expired entries, even while under the size limit
+SCAN_INTERVAL_SECONDS = 3600
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so cosmetic differences between parses map to the same key"""
+    return " ".join(text.split())
+
+class ExtractionCache:
+    """
+    Persistent content-addressed cache for parsed text and LLM extraction results.
+
+    Entries are stored under two kinds of keys, both salted with the model name and
+    prompt version:
+      - a hash of the raw document bytes (PDF or any other format), which skips both parsing
+        and LLM work on a hit
+      - a hash of the normalized extracted text, which skips LLM work when a
+        different file produces the same text
+
+    Each entry also remembers the saved record it produced so repeated uploads reuse
+    it instead of writing a duplicate. Entries are evicted least-recently-used first
+    when the cache exceeds max_bytes, and unconditionally once older than max_age_seconds.
+    The cache size is tracked as a running total, so the directory is only scanned when
+    the total exceeds max_bytes or once every SCAN_INTERVAL_SECONDS.
+
+    Hit/miss counters are kept in memory and added to stats.json periodically and at exit
+    (see flush_stats), so lookups never write to disk.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age_seconds: int = DEFAULT_MAX_AGE_SECONDS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._stats = self._load_stats()
+        self._unflushed = dict.fromkeys(STAT_KEYS, 0)
+        self._flushed_at = time.monotonic()
+        self._size = 0
+        self._scanned_at = None
+        atexit.register(self.flush_stats)
+
+    # Keys
+
+    def _salted_hash(self, kind: str, payload: bytes) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{kind}:{MODEL_NAME}:{PROMPT_VERSION}:".encode('utf-8'))
+        digest.update(payload)
+        return digest.hexdigest()
+
+    def pdf_key(self, pdf_bytes: bytes) -> str:
+        """Return the cache key for raw PDF bytes"""
+        return self._salted_hash("pdf", pdf_bytes)
+
+    def text_key(self, text: str) -> str:
+        """Return the cache key for extracted text"""
+        return self._salted_hash("text", normalize_text(text).encode('utf-8'))
+
+    # Lookups
+
+    def get_by_pdf(self, pdf_bytes: bytes) -> dict | None:
+        """
+        Look up a cached entry by the raw PDF bytes.
+
+        Args:
+            pdf_bytes: Content of the uploaded PDF
+
+        Returns:
+            dict: Entry with "text", "extraction", "record" and "pdf_backend" keys, or None on a miss
+        """
+        pointer = self._read(self._path("pdf", self.pdf_key(pdf_bytes)))
+        entry = self._read(self._path("text", pointer["text_key"])) if pointer else None
+        if entry is not None:
+            self._count("pdf_hits")
+        return entry
+
+    def get_by_text(self, text: str) -> dict | None:
+        """
+        Look up a cached entry by extracted text. Counts a miss when nothing is found.
+
+        Args:
+            text: Text extracted from the PDF
+
+        Returns:
+            dict: Entry with "text", "extraction", "record" and "pdf_backend" keys, or None on a miss
+        """
+        entry = self._read(self._path("text", self.text_key(text)))
+        self._count("text_hits" if entry is not None else "misses")
+        return entry
+
+    def get_record(self, text: str) -> str | None:
+        """Return the saved record attached to the entry for this text, without counting a lookup"""
+        entry = self._read(self._path("text", self.text_key(text)))
+        return entry.get("record") if entry else None
+
+    # Updates
+
+    def put(self, pdf_bytes: bytes, text: str, extraction: dict, record: str | None = None,
+            pdf_backend: str | None = None) -> None:
+        """
+        Store an extraction result under both the PDF and the text key.
+
+        Args:
+            pdf_bytes: Content of the uploaded PDF
+            text: Text extracted from the PDF
+            extraction: Result of llm_extractor.extract_resume
+            record: Filename of the saved record, if one was written
+            pdf_backend: Name of the PDF backend that produced the text
+        """
+        text_key = self.text_key(text)
+        existing = self._read(self._path("text", text_key))
+        if existing:
+            record = record or existing.get("record")
+            pdf_backend = pdf_backend or existing.get("pdf_backend")
+        entry = {"text": text, "extraction": extraction, "record": record, "pdf_backend": pdf_backend}
+        grown = self._write(self._path("text", text_key), entry)
+        grown += self._write(self._path("pdf", self.pdf_key(pdf_bytes)), {"text_key": text_key})
+        with self._lock:
+            self._size += grown
+            scan = (self._size > self.max_bytes or self._scanned_at is None
+                    or time.monotonic() - self._scanned_at > SCAN_INTERVAL_SECONDS)
+        if scan:
+            self.evict()
+
+    def set_record(self, text: str, record: str) -> None:
+        """Attach the filename of a saved record to the entry for this text"""
+        path = self._path("text", self.text_key(text))
+        entry = self._read(path)
+        if entry is not None:
+            entry["record"] = record
+            grown = self._write(path, entry)
+            with self._lock:
+                self._size += grown
+
+    def evict(self) -> int:
+        """
+        Remove expired entries, then least-recently-used ones until the cache fits in max_bytes.
+
+        Scans the whole directory and resets the running size total, which also picks up
+        entries written by other processes.
+
+        Returns:
+            int: Number of files removed
+        """
+        now = time.time()
+        files = []
+        for filename in os.listdir(self.cache_dir):
+            if filename == STATS_FILENAME or not filename.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            files.append((info.st_mtime, info.st_size, path))
+
+        removed = 0
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in sorted(files):
+            if now - mtime <= self.max_age_seconds and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+                total -= size
+            except OSError:
+                continue
+
+        with self._lock:
+            self._size = total
+            self._scanned_at = time.monotonic()
+        if removed:
+            self._count("evictions", removed)
+        return removed
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters and the current hit rate"""
+        with self._lock:
+            stats = {key: self._stats[key] + self._unflushed[key] for key in STAT_KEYS}
+        lookups = stats["pdf_hits"] + stats["text_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["pdf_hits"] + stats["text_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    # Storage helpers
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{kind}_{key}.json")
+
+    def _read(self, path: str) -> dict | None:
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Touch the file so size-based eviction is least-recently-used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def flush_stats(self) -> None:
+        """
+        Add the counts recorded since the last flush to stats.json.
+
+        The file is re-read first, so counts flushed by other processes sharing the cache
+        are kept, and then replaced atomically.
+        """
+        with self._lock:
+            unflushed, self._unflushed = self._unflushed, dict.fromkeys(STAT_KEYS, 0)
+            self._flushed_at = time.monotonic()
+            if not any(unflushed.values()):
+                return
+            stored = self._load_stats()
+            merged = {key: stored[key] + unflushed[key] for key in STAT_KEYS}
+            try:
+                self._write(os.path.join(self.cache_dir, STATS_FILENAME), merged)
+            except OSError as e:
+                # Keep the counts for the next flush
+                self._unflushed = {key: self._unflushed[key] + unflushed[key] for key in STAT_KEYS}
+                print(f"Warning: Failed to persist cache stats: {str(e)}")
+                return
+            self._stats = merged
+
+    def _write(self, path: str, entry: dict) -> int:
+        """Atomically replace the file at path with the entry and return how much the file grew"""
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        written = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        return written - previous
+
+    def _load_stats(self) -> dict:
+        try:
+            with open(os.path.join(self.cache_dir, STATS_FILENAME), 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = {}
+        return {key: int(stored.get(key, 0)) for key in STAT_KEYS}
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        increment("extraction_cache_events_total", amount, event=key)
+        with self._lock:
+            self._unflushed[key] += amount
+            due = time.monotonic() - self._flushed_at >= STATS_FLUSH_SECONDS
+        if due:
+            self.flush_stats()
+
+_default_cache = None
+
+def get_extraction_cache() -> ExtractionCache:
+    """Return the process-wide cache instance, creating it on first use"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ExtractionCache()
+    return _default_cache
@@ -0,0 +1,395 @@
+"""
+Module providing a shared, rate-limited async client for the Gemini API
+"""
+import os
+import time
+import random
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dotenv import load_dotenv
+
+from metrics import timed, increment, observe
+
+load_dotenv()
+
+# Limits sized to the API quota; override per deployment through the environment
+REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_RPM", "15"))
+TOKENS_PER_MINUTE = int(os.getenv("GEMINI_TPM", "1000000"))
+MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+REQUEST_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "60"))
+MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "4"))
+# Stream responses where the backend supports it; 0 forces the blocking path
+STREAMING_ENABLED = os.getenv("GEMINI_STREAMING", "1").lower() not in ("0", "false", "no")
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+# HTTP statuses worth retrying: quota exhaustion and transient server errors
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Polling interval used while waiting on limits shared across threads and event loops
+_POLL_INTERVAL = 0.01
+
+class GeminiError(Exception):
+    """Raised when a Gemini request fails permanently or exhausts its retries"""
+
+class RetryableGeminiError(GeminiError):
+    """Transient failure (quota or server error) that should be retried with backoff"""
+
+    def __init__(self, message: str, code: int = 503):
+        super().__init__(message)
+        self.code = code
+
+@dataclass
+class Completion:
+    """Text returned by the model together with prompt/response token counts"""
+    text: str
+    prompt_tokens: int
+    response_tokens: int
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at capacity per minute.
+
+    State is guarded by a threading lock rather than asyncio primitives so one bucket
+    can be shared by coroutines running on different event loops and threads.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(max(1, per_minute))
+        self.rate = self.capacity / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, amount: float) -> float:
+        """Take tokens if available and return 0, otherwise return the seconds to wait"""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.rate
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        while True:
+            wait = self._reserve(amount)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+class _ConcurrencyLimiter:
+    """Cap on in-flight requests, shared across event loops"""
+
+    def __init__(self, limit: int):
+        self._semaphore = threading.BoundedSemaphore(max(1, limit))
+
+    async def __aenter__(self):
+        while not self._semaphore.acquire(blocking=False):
+            await asyncio.sleep(_POLL_INTERVAL)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._semaphore.release()
+
+class GeminiBackend:
+    """Backend calling the real Gemini API through google-generativeai"""
+
+    def __init__(self, model_name: str):
+        import google.generativeai as genai
+
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise GeminiError("GEMINI_API_KEY not found in environment variables")
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+
+    @staticmethod
+    def _request_options(timeout: float | None) -> dict:
+        return {"timeout": timeout} if timeout else {}
+
+    async def generate(self, prompt: str, timeout: float | None = None) -> Completion:
+        # The blocking call runs in a worker thread: the SDK's async transport binds to the
+        # event loop it was first used on, while callers may each run their own loop. The
+        # timeout goes to the SDK, so the call in the thread really ends when it expires
+        response = await asyncio.to_thread(
+            self.model.generate_content, prompt, request_options=self._request_options(timeout)
+        )
+        text = response.text
+        usage = getattr(response, 'usage_metadata', None)
+        prompt_tokens = getattr(usage, 'prompt_token_count', 0) or estimate_tokens(prompt)
+        response_tokens = getattr(usage, 'candidates_token_count', 0) or estimate_tokens(text)
+        return Completion(text, prompt_tokens, response_tokens)
+
+    async def stream(self, prompt: str, timeout: float | None = None):
+        """
+        Yield the response text piece by piece as the model generates it.
+
+        Closing or cancelling the stream stops the worker thread at the next piece and waits
+        for it, so the caller's concurrency slot is only freed once the thread has returned.
+        """
+        loop = asyncio.get_running_loop()
+        pieces = asyncio.Queue()
+        finished = object()
+        stopped = threading.Event()
+
+        # The SDK's stream is a blocking iterator; drain it in a worker thread
+        def produce():
+            try:
+                response = self.model.generate_content(
+                    prompt, stream=True, request_options=self._request_options(timeout)
+                )
+                for chunk in response:
+                    if stopped.is_set():
+                        return
+                    loop.call_soon_threadsafe(pieces.put_nowait, chunk.text)
+                loop.call_soon_threadsafe(pieces.put_nowait, finished)
+            except Exception as e:
+                loop.call_soon_threadsafe(pieces.put_nowait, e)
+
+        producer = asyncio.ensure_future(asyncio.to_thread(produce))
+        try:
+            while True:
+                piece = await pieces.get()
+                if piece is finished:
+                    break
+                if isinstance(piece, Exception):
+                    raise piece
+                yield piece
+        finally:
+            stopped.set()
+            await asyncio.wait({producer})
+
+class FakeBackend:
+    """
+    Offline backend for tests and local development.
+
+    Args:
+        responder: Callable mapping a prompt to the response text, or a list of
+            responses returned in order (the last one repeats)
+        latency: Seconds to sleep per request (spread over the pieces when streaming)
+        failures: Number of initial requests that fail with a retryable 429
+        chunk_size: Characters per piece yielded by stream()
+    """
+
+    def __init__(self, responder=None, latency: float = 0.0, failures: int = 0, chunk_size: int = 64):
+        self.responder = responder if responder is not None else (lambda prompt: "{}")
+        self.latency = latency
+        self.failures = failures
+        self.chunk_size = chunk_size
+        self.calls = []
+        self._lock = threading.Lock()
+
+    async def stream(self, prompt: str, timeout: float | None = None):
+        text = await self._respond(prompt, latency=0.0)
+        starts = range(0, len(text), max(1, self.chunk_size))
+        for start in starts:
+            if self.latency:
+                await asyncio.sleep(self.latency / len(starts))
+            yield text[start:start + self.chunk_size]
+
+    async def generate(self, prompt: str, timeout: float | None = None) -> Completion:
+        text = await self._respond(prompt, self.latency, timeout)
+        return Completion(text, estimate_tokens(prompt), estimate_tokens(text))
+
+    async def _respond(self, prompt: str, latency: float, timeout: float | None = None) -> str:
+        with self._lock:
+            self.calls.append(prompt)
+            call_index = len(self.calls) - 1
+            fail = self.failures > 0
+            if fail:
+                self.failures -= 1
+        # Like the real SDK, a request slower than its timeout ends at the timeout
+        if timeout and latency > timeout:
+            await asyncio.sleep(timeout)
+            raise asyncio.TimeoutError()
+        if latency:
+            await asyncio.sleep(latency)
+        if fail:
+            raise RetryableGeminiError("Simulated quota exhaustion", code=429)
+        if callable(self.responder):
+            return self.responder(prompt)
+        return self.responder[min(call_index, len(self.responder) - 1)]
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (RetryableGeminiError, asyncio.TimeoutError)):
+        return True
+    return getattr(error, 'code', None) in RETRYABLE_STATUS
+
+class GeminiClient:
+    """
+    Shared async Gemini client.
+
+    The backend (and with it the API configuration and GenerativeModel) is created lazily
+    on the first request and then reused. Every request waits for the request and token
+    buckets, runs under the concurrency cap with a timeout, and is retried with jittered
+    exponential backoff on 429/5xx and timeouts.
+
+    The timeout is handed to the backend so the underlying call ends with it; a call still
+    running when the timeout expires keeps its concurrency slot until it actually returns,
+    so retries never push the number of in-flight requests past the cap.
+
+    Backends implement generate(prompt, timeout) -> Completion and, optionally, an async
+    generator stream(prompt, timeout) yielding text pieces.
+    """
+
+    def __init__(self, model_name: str, backend=None, requests_per_minute: int = REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = TOKENS_PER_MINUTE, max_concurrency: int = MAX_CONCURRENCY,
+                 timeout: float = REQUEST_TIMEOUT, max_retries: int = MAX_RETRIES):
+        self.model_name = model_name
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._backend = backend
+        self._backend_lock = threading.Lock()
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._concurrency = _ConcurrencyLimiter(max_concurrency)
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    if os.getenv("GEMINI_BACKEND", "").lower() == "fake":
+                        self._backend = FakeBackend()
+                    else:
+                        self._backend = GeminiBackend(self.model_name)
+        return self._backend
+
+    async def generate(self, prompt: str) -> Completion:
+        """
+        Send a prompt and return the completion.
+
+        Raises:
+            GeminiError: If the request fails permanently or all retries are exhausted
+        """
+        backend = self.backend
+        for attempt in range(self.max_retries + 1):
+            await self._requests.acquire(1)
+            await self._tokens.acquire(estimate_tokens(prompt))
+            try:
+                async with self._concurrency:
+                    with timed("llm_call", model=self.model_name):
+                        completion = await self._generate_within_timeout(backend, prompt)
+                increment("gemini_requests_total", outcome="ok")
+                increment("gemini_prompt_tokens_total", completion.prompt_tokens)
+                increment("gemini_response_tokens_total", completion.response_tokens)
+                return completion
+            except Exception as e:
+                if not _is_retryable(e) or attempt == self.max_retries:
+                    increment("gemini_requests_total", outcome="failed")
+                    raise GeminiError(f"Gemini request failed after {attempt + 1} attempt(s): {str(e) or type(e).__name__}") from e
+                increment("gemini_retries_total")
+                delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+                print(f"Retrying Gemini request in {delay:.1f}s after error: {str(e) or type(e).__name__}")
+                await asyncio.sleep(delay)
+
+    async def _generate_within_timeout(self, backend, prompt: str) -> Completion:
+        """Run one backend call, waiting for it to return even past the timeout so its slot stays held"""
+        call = asyncio.ensure_future(backend.generate(prompt, timeout=self.timeout))
+        try:
+            return await asyncio.wait_for(asyncio.shield(call), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            # The backend was given the same timeout, so the call ends shortly; a result that
+            # still arrives is used, anything else is reported as the timeout
+            await asyncio.wait({call})
+            if call.cancelled() or call.exception() is not None:
+                raise
+            return call.result()
+
+    async def stream(self, prompt: str):
+        """
+        Send a prompt and yield the response text in pieces as the model generates it.
+
+        Falls back to a single piece from generate() when streaming is disabled or the
+        backend cannot stream. Failures before the first piece are retried like generate();
+        once pieces have been yielded a failure is raised, since the text cannot be taken back.
+
+        Raises:
+            GeminiError: If the request fails permanently, all retries are exhausted or the stream breaks
+        """
+        backend = self.backend
+        if not STREAMING_ENABLED or not hasattr(backend, 'stream'):
+            yield (await self.generate(prompt)).text
+            return
+        for attempt in range(self.max_retries + 1):
+            await self._requests.acquire(1)
+            await self._tokens.acquire(estimate_tokens(prompt))
+            received = []
+            try:
+                async with self._concurrency:
+                    with timed("llm_call", model=self.model_name):
+                        started = time.monotonic()
+                        deadline = started + self.timeout
+                        pieces = backend.stream(prompt, timeout=self.timeout).__aiter__()
+                        try:
+                            while True:
+                                try:
+                                    piece = await asyncio.wait_for(pieces.__anext__(), max(0.0, deadline - time.monotonic()))
+                                except StopAsyncIteration:
+                                    break
+                                if not received:
+                                    observe("resume_stage_seconds", time.monotonic() - started, stage="llm_first_piece", model=self.model_name)
+                                received.append(piece)
+                                yield piece
+                        finally:
+                            # Closing waits for the backend's worker thread, so the slot is released after it returns
+                            if hasattr(pieces, 'aclose'):
+                                await pieces.aclose()
+                text = "".join(received)
+                increment("gemini_requests_total", outcome="ok")
+                increment("gemini_prompt_tokens_total", estimate_tokens(prompt))
+                increment("gemini_response_tokens_total", estimate_tokens(text))
+                return
+            except Exception as e:
+                if received or not _is_retryable(e) or attempt == self.max_retries:
+                    increment("gemini_requests_total", outcome="failed")
+                    raise GeminiError(f"Gemini stream failed after {attempt + 1} attempt(s): {str(e) or type(e).__name__}") from e
+                increment("gemini_retries_total")
+                delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+                print(f"Retrying Gemini stream in {delay:.1f}s after error: {str(e) or type(e).__name__}")
+                await asyncio.sleep(delay)
+
+    def generate_sync(self, prompt: str) -> Completion:
+        """Blocking variant of generate() for synchronous callers"""
+        return run_sync(self.generate(prompt))
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_gemini_client(model_name: str) -> GeminiClient:
+    """Return the process-wide client for a model, creating it on first use"""
+    with _clients_lock:
+        if model_name not in _clients:
+            _clients[model_name] = GeminiClient(model_name)
+        return _clients[model_name]
+
+def set_gemini_backend(model_name: str, backend) -> GeminiClient:
+    """Replace the backend of the shared client for a model, e.g. with a FakeBackend in tests"""
+    client = get_gemini_client(model_name)
+    client._backend = backend
+    return client
+
+def set_gemini_client(client: GeminiClient) -> GeminiClient:
+    """Install a client as the shared client for its model, e.g. one with benchmark-specific limits"""
+    with _clients_lock:
+        _clients[client.model_name] = client
+    return client
+
+_sync_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="gemini-sync")
+
+def run_sync(coro):
+    """Run a coroutine to completion from synchronous code, even if an event loop is already running"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    return _sync_executor.submit(asyncio.run, coro).result()
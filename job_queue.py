@@ -0,0 +1,425 @@
+"""
+Module for the background job queue that processes uploads off the Streamlit script thread
+
+Uploads are enqueued as jobs keyed by the SHA-256 of their content and handled by a pool
+of worker threads running resume_pipeline.process_document. Job state (and the upload
+itself until the job finishes) lives in a SQLite job table, so queued work survives
+restarts. Several processes (API workers, Streamlit) may share the table: each running job
+is leased by the manager that claimed it, which renews the lease while the job runs, and
+only jobs whose lease expired (their process died) are requeued, up to JOB_MAX_ATTEMPTS
+runs. The queue only carries job ids and can be swapped for another backend through
+JOB_QUEUE_BACKEND and register_queue_backend().
+"""
+import os
+import json
+import time
+import uuid
+import queue
+import socket
+import sqlite3
+import hashlib
+import threading
+
+from resume_store import DATA_DIR, get_resume_store
+
+JOBS_DB_PATH = os.path.join(DATA_DIR, "jobs.db")
+WORKER_COUNT = int(os.getenv("JOB_WORKERS", "4"))
+QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "local")
+# Finished jobs older than this are pruned when the manager starts
+RETENTION_DAYS = float(os.getenv("JOB_RETENTION_DAYS", "7"))
+# Seconds a claimed job stays owned by its manager without a heartbeat; renewed every third of that
+LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+# Runs a job may start before a lease expiring again marks it failed instead of requeuing it,
+# so an upload that crashes its worker process is not retried forever
+MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+# Job statuses; "done" jobs carry the pipeline outcome (saved, duplicate, rejected or failed) in result
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload BLOB,
+    result TEXT,
+    error TEXT,
+    partial TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_until REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at);
+"""
+
+def job_key(content: bytes) -> str:
+    """Return the id of the job for an upload: the SHA-256 of its content"""
+    return hashlib.sha256(content).hexdigest()
+
+def is_failed(job: dict) -> bool:
+    """Whether a job failed, either with an error or with a failed pipeline outcome"""
+    if job['status'] == STATUS_FAILED:
+        return True
+    return job['status'] == STATUS_DONE and (job['result'] or {}).get('status') == "failed"
+
+class LocalQueue:
+    """In-process FIFO of job ids; durability comes from the job table, not the queue"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def put(self, job_id: str) -> None:
+        self._queue.put(job_id)
+
+    def get(self, timeout: float | None = None) -> str | None:
+        """Return the next job id, or None if none arrived within timeout seconds"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+# Queue backends by name; a backend is any object with put(job_id) and get(timeout) -> job_id | None
+QUEUE_BACKENDS = {
+    "local": LocalQueue,
+}
+
+def register_queue_backend(name: str, factory) -> None:
+    """Register a queue backend factory selectable through JOB_QUEUE_BACKEND"""
+    QUEUE_BACKENDS[name] = factory
+
+class JobStore:
+    """SQLite job table in WAL mode with one connection per thread"""
+
+    def __init__(self, db_path: str = JOBS_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        # Job tables created before partial results and leases existed
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for column, declaration in (("partial", "TEXT"), ("owner", "TEXT"), ("lease_until", "REAL")):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {declaration}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, job_id: str) -> dict | None:
+        """Return a job without its payload, or None if it does not exist"""
+        row = self._connection().execute(
+            "SELECT id, filename, status, result, error, partial, attempts, created_at, updated_at FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        job_id, filename, status, result, error, partial, attempts, created_at, updated_at = row
+        return {
+            "id": job_id, "filename": filename, "status": status,
+            "result": json.loads(result) if result else None, "error": error,
+            "partial": json.loads(partial) if partial else None,
+            "attempts": attempts, "created_at": created_at, "updated_at": updated_at,
+        }
+
+    def payload(self, job_id: str) -> bytes | None:
+        row = self._connection().execute("SELECT payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def enqueue(self, job_id: str, filename: str, content: bytes) -> bool:
+        """
+        Create the job, or reset an existing one to queued.
+
+        Returns:
+            bool: True if the job was (re)queued, False if it is already queued or running
+        """
+        now = time.time()
+        conn = self._connection()
+        with self._write_lock, conn:
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                conn.execute(
+                    "INSERT INTO jobs (id, filename, status, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, filename, STATUS_QUEUED, content, now, now),
+                )
+                return True
+            if row[0] in ACTIVE_STATUSES:
+                return False
+            conn.execute(
+                "UPDATE jobs SET filename = ?, status = ?, payload = ?, result = NULL, error = NULL, partial = NULL, "
+                "created_at = ?, updated_at = ? WHERE id = ?",
+                (filename, STATUS_QUEUED, content, now, now, job_id),
+            )
+            return True
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float = LEASE_SECONDS) -> bool:
+        """Atomically move a queued job to running under a lease held by owner; False if another worker has it"""
+        now = time.time()
+        conn = self._connection()
+        with self._write_lock, conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, partial = NULL, attempts = attempts + 1, owner = ?, lease_until = ?, "
+                "updated_at = ? WHERE id = ? AND status = ?",
+                (STATUS_RUNNING, owner, now + lease_seconds, now, job_id, STATUS_QUEUED),
+            )
+            return cursor.rowcount == 1
+
+    def heartbeat(self, owner: str, lease_seconds: float = LEASE_SECONDS) -> int:
+        """Extend the leases of the running jobs held by owner and return how many were renewed"""
+        conn = self._connection()
+        with self._write_lock, conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE owner = ? AND status = ?",
+                (time.time() + lease_seconds, owner, STATUS_RUNNING),
+            )
+            return cursor.rowcount
+
+    def set_partial(self, job_id: str, partial: dict, owner: str) -> None:
+        """Record the sections of a running job extracted so far, unless owner has lost the job"""
+        conn = self._connection()
+        with self._write_lock, conn:
+            conn.execute(
+                "UPDATE jobs SET partial = ?, updated_at = ? WHERE id = ? AND status = ? AND owner = ?",
+                (json.dumps(partial, ensure_ascii=False), time.time(), job_id, STATUS_RUNNING, owner),
+            )
+
+    def finish(self, job_id: str, owner: str, result: dict | None = None, error: str | None = None) -> bool:
+        """
+        Record the outcome of a job and drop its partial sections.
+
+        The payload of a successful job is dropped; a failed job keeps it until it is pruned, so it can be retried.
+
+        Returns:
+            bool: False if owner no longer held the job (its lease expired and it was requeued)
+        """
+        status = STATUS_FAILED if error is not None else STATUS_DONE
+        keep_payload = is_failed({"status": status, "result": result})
+        conn = self._connection()
+        with self._write_lock, conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, payload = CASE WHEN ? THEN payload END, "
+                "partial = NULL, owner = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND status = ? AND owner = ?",
+                (status, json.dumps(result) if result is not None else None, error, keep_payload, time.time(),
+                 job_id, STATUS_RUNNING, owner),
+            )
+            return cursor.rowcount == 1
+
+    def position(self, job_id: str) -> int:
+        """Return the number of queued jobs ahead of this one"""
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < "
+            "(SELECT created_at FROM jobs WHERE id = ?)",
+            (STATUS_QUEUED, job_id),
+        ).fetchone()
+        return row[0]
+
+    def requeue_expired(self, max_attempts: int = MAX_ATTEMPTS) -> list:
+        """
+        Requeue running jobs whose lease expired and return their ids, oldest first.
+
+        Jobs still leased by a live process, in this or another process, are left running.
+        Expired jobs that already ran max_attempts times are marked failed instead; they
+        keep their upload, so they can still be retried explicitly.
+        """
+        now = time.time()
+        conn = self._connection()
+        with self._write_lock, conn:
+            rows = conn.execute(
+                "SELECT id, attempts FROM jobs WHERE status = ? AND (lease_until IS NULL OR lease_until < ?) "
+                "ORDER BY created_at",
+                (STATUS_RUNNING, now),
+            ).fetchall()
+            requeued = [job_id for job_id, attempts in rows if attempts < max_attempts]
+            abandoned = [(job_id, attempts) for job_id, attempts in rows if attempts >= max_attempts]
+            conn.executemany(
+                "UPDATE jobs SET status = ?, owner = NULL, lease_until = NULL WHERE id = ? AND status = ?",
+                [(STATUS_QUEUED, job_id, STATUS_RUNNING) for job_id in requeued],
+            )
+            conn.executemany(
+                "UPDATE jobs SET status = ?, error = ?, partial = NULL, owner = NULL, lease_until = NULL, "
+                "updated_at = ? WHERE id = ? AND status = ?",
+                [(STATUS_FAILED, f"Gave up after {attempts} attempt(s): the process running it stopped responding",
+                  now, job_id, STATUS_RUNNING) for job_id, attempts in abandoned],
+            )
+        for job_id, attempts in abandoned:
+            print(f"Job {job_id} failed: its lease expired in attempt {attempts}")
+        return requeued
+
+    def recover(self, max_attempts: int = MAX_ATTEMPTS) -> list:
+        """Requeue jobs whose lease expired (up to max_attempts runs) and return all queued ids, oldest first"""
+        self.requeue_expired(max_attempts)
+        rows = self._connection().execute(
+            "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (STATUS_QUEUED,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def prune(self, max_age_days: float = RETENTION_DAYS) -> int:
+        """Delete finished jobs older than max_age_days and return how many were removed"""
+        cutoff = time.time() - max_age_days * 86400
+        conn = self._connection()
+        with self._write_lock, conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?", (STATUS_DONE, STATUS_FAILED, cutoff)
+            )
+            return cursor.rowcount
+
+class JobManager:
+    """
+    Worker pool processing upload jobs in the background.
+
+    submit() returns immediately with the job id; callers poll get() until the job is
+    done. While a job runs, get() also returns the resume sections extracted so far under
+    "partial". Submitting content that is already queued, running or processed returns the
+    existing job instead of starting duplicate work. Failed jobs are only run again through
+    retry() or a submit() with retry_failed=True for a new upload, so polling callers that
+    resubmit the same content never spend quota on it again; attempts counts the runs.
+
+    The handler is called as handler(filename, content, on_section=callback) and reports
+    sections through the callback as they are extracted.
+
+    Every manager has its own owner id. A heartbeat thread renews the leases of the jobs
+    it is running and periodically requeues jobs whose lease expired, so jobs of a
+    process that died are picked up by the managers still alive. A job whose lease
+    expires in its max_attempts-th run is marked failed rather than requeued.
+    """
+
+    def __init__(self, store: JobStore | None = None, queue_backend=None, workers: int = WORKER_COUNT, handler=None,
+                 lease_seconds: float = LEASE_SECONDS, max_attempts: int = MAX_ATTEMPTS):
+        self.store = store or JobStore()
+        self.queue = queue_backend or QUEUE_BACKENDS[QUEUE_BACKEND]()
+        if handler is None:
+            from resume_pipeline import process_document
+            handler = process_document
+        self.handler = handler
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._stop = threading.Event()
+        self._threads = []
+        self.store.prune()
+        for job_id in self.store.recover(self.max_attempts):
+            self.queue.put(job_id)
+        targets = [(self._work, f"job-worker-{index}") for index in range(max(1, workers))]
+        for target, name in targets + [(self._heartbeat, "job-heartbeat")]:
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, content: bytes, filename: str, retry_failed: bool = False) -> str:
+        """
+        Enqueue an upload unless the same content is already being or has been processed.
+
+        Args:
+            content: Uploaded file content
+            filename: Original filename, used to name the saved record
+            retry_failed: Run the content again if its previous job failed; pass it only for a
+                new upload, not when resubmitting the same one
+
+        Returns:
+            str: Job id (the content hash)
+        """
+        job_id = job_key(content)
+        job = self.store.get(job_id)
+        if job is not None and not self._needs_rerun(job, retry_failed):
+            return job_id
+        if self.store.enqueue(job_id, filename, content):
+            self.queue.put(job_id)
+        return job_id
+
+    def retry(self, job_id: str) -> bool:
+        """
+        Run a failed job again with its stored upload.
+
+        Returns:
+            bool: True if the job was requeued, False if it is not a failed job or its upload was pruned
+        """
+        job = self.store.get(job_id)
+        if job is None or not is_failed(job):
+            return False
+        content = self.store.payload(job_id)
+        if content is None:
+            return False
+        if self.store.enqueue(job_id, job['filename'], content):
+            self.queue.put(job_id)
+        return True
+
+    @staticmethod
+    def _needs_rerun(job: dict, retry_failed: bool) -> bool:
+        """Failed jobs when retrying is asked for, and results whose saved record was deleted, are run again"""
+        if job['status'] in ACTIVE_STATUSES:
+            return False
+        if is_failed(job):
+            return retry_failed
+        record = (job['result'] or {}).get('record')
+        return bool(record) and not get_resume_store().has_resume(record)
+
+    def get(self, job_id: str) -> dict | None:
+        """Return the job with its current status and, once done, its result"""
+        job = self.store.get(job_id)
+        if job is not None and job['status'] == STATUS_QUEUED:
+            job['position'] = self.store.position(job_id)
+        return job
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            job_id = self.queue.get(timeout=1.0)
+            if job_id is None or not self.store.claim(job_id, self.owner, self.lease_seconds):
+                continue
+            job = self.store.get(job_id)
+            partial = {}
+
+            def publish(field, value, job_id=job_id, partial=partial):
+                partial[field] = value
+                self.store.set_partial(job_id, partial, self.owner)
+
+            try:
+                result = self.handler(job['filename'], self.store.payload(job_id), on_section=publish)
+                finished = self.store.finish(job_id, self.owner, result=result)
+            except Exception as e:
+                print(f"Error processing job {job_id}: {str(e)}")
+                finished = self.store.finish(job_id, self.owner, error=str(e) or type(e).__name__)
+            if not finished:
+                print(f"Warning: lease on job {job_id} expired before it finished; its result was discarded")
+
+    def _heartbeat(self) -> None:
+        """Renew the leases of this manager's running jobs and requeue jobs whose lease expired"""
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                self.store.heartbeat(self.owner, self.lease_seconds)
+                for job_id in self.store.requeue_expired(self.max_attempts):
+                    self.queue.put(job_id)
+            except Exception as e:
+                print(f"Error renewing job leases: {str(e)}")
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers after their current job; queued jobs stay in the table for the next start"""
+        self._stop.set()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+_default_manager = None
+_default_manager_lock = threading.Lock()
+
+def get_job_manager() -> JobManager:
+    """Return the process-wide job manager, starting its workers on first use"""
+    global _default_manager
+    with _default_manager_lock:
+        if _default_manager is None:
+            _default_manager = JobManager()
+    return _default_manager
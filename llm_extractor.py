@@ -1,170 +1,382 @@
 """
 Module for extracting information using LLM (Gemini) integration
 """
-import os
+import re
 import json
+import asyncio
+from typing import TypedDict, get_args, get_origin, get_type_hints, is_typeddict
 from dotenv import load_dotenv
-import google.generativeai as genai
+from gemini_client import get_gemini_client, run_sync, GeminiError
+from text_compactor import compact_text
+from response_decoder import decode_json, validate, IncrementalJSONParser
+from metrics import timed, increment
 
-def extract_contact_info(resume_text: str) -> dict | None:
+MODEL_NAME = "gemini-1.5-flash-latest"
+
+# Bump whenever a prompt or the record schema changes so cached extractions are invalidated
+PROMPT_VERSION = "1"
+
+# Field specification shared by the combined and follow-up section prompts
+RESUME_FIELDS_PROMPT = """- "name": string (Full name of the candidate)
+- "email": string (Primary email address)
+- "phone": string (Primary phone number)
+- "skills": list of strings (Technical and soft skills mentioned)
+- "work_experience": list of objects. Each object must have:
+    - "company": string
+    - "role": string (Job title)
+    - "dates": string (e.g., "Jan 2020 - Present")
+    - "description": string (Key responsibilities and achievements)
+- "education": list of objects (for formal academic degrees from universities or colleges). Each object must have:
+    - "institution": string (Name of the university/college)
+    - "degree": string (Formal degree title, e.g., "Bachelor of Science in Computer Science")
+    - "graduation_date": string (e.g., "May 2020" or "2020-2024")
+    - "details": string (Optional - additional details about the degree)
+- "certifications": list of objects (for professional certifications, online courses, and other learning). Each object must have:
+    - "name": string (Name of the certification/course)
+    - "issuing_organization": string (Organization that issued the certification)
+    - "date_obtained": string (e.g., "Jan 2023" or "2023")
+    - "details": string (Optional - additional details about the certification)
+
+Important notes:
+- Only include formal academic degrees (Bachelors, Masters, PhDs, etc.) in the 'education' field
+- Include all other learning achievements (certifications, online courses, professional training) in the 'certifications' field
+- If a certification is part of a formal degree program, include it in the degree's 'details' field instead of the certifications list
+- If a certification has multiple parts or levels, create separate entries in the certifications list for each part
+"""
+
+# Typed schema of a structured resume record
+class WorkExperience(TypedDict):
+    company: str
+    role: str
+    dates: str
+    description: str
+
+class Education(TypedDict):
+    institution: str
+    degree: str
+    graduation_date: str
+    details: str
+
+class Certification(TypedDict):
+    name: str
+    issuing_organization: str
+    date_obtained: str
+    details: str
+
+class ResumeRecord(TypedDict):
+    name: str
+    email: str
+    phone: str
+    skills: list[str]
+    work_experience: list[WorkExperience]
+    education: list[Education]
+    certifications: list[Certification]
+
+class CombinedVerdict(TypedDict):
+    is_valid_resume: bool
+
+_RECORD_HINTS = get_type_hints(ResumeRecord)
+
+# Keys every structured resume record is expected to carry: list fields with their entry keys
+# (None for lists of strings) and the scalar contact fields
+RESUME_LIST_FIELDS = {
+    field: tuple(get_type_hints(get_args(hint)[0])) if is_typeddict(get_args(hint)[0]) else None
+    for field, hint in _RECORD_HINTS.items() if get_origin(hint) is list
+}
+CONTACT_FIELDS = tuple(field for field, hint in _RECORD_HINTS.items() if hint is str)
+
+VERDICT_FIELD = "is_valid_resume"
+VERDICT_PROMPT = """- "is_valid_resume": boolean (true only if the text is a resume containing at least one of these sections:
+  Work experience, Education, Skills, Projects, Certifications)"""
+
+# Follow-up requests for sections missing from a response, per chunk
+MAX_SECTION_REQUESTS = 1
+
+def _field_prompts(spec: str) -> dict:
+    """Split a field specification into the lines describing each top-level field"""
+    prompts, current = {}, None
+    for line in spec.splitlines():
+        match = re.match(r'- "(\w+)"', line)
+        if match:
+            current = match.group(1)
+            prompts[current] = [line]
+        elif current and line.startswith(" "):
+            prompts[current].append(line)
+        else:
+            current = None
+    return {field: "\n".join(lines) for field, lines in prompts.items()}
+
+FIELD_PROMPTS = {**_field_prompts(RESUME_FIELDS_PROMPT), VERDICT_FIELD: VERDICT_PROMPT}
+
+def validate_resume_record(record: dict) -> tuple:
     """
-    Extract basic contact information from resume text using Gemini AI.
+    Validate and normalize a structured resume record against the ResumeRecord schema.
+
+    Missing or null fields are filled with empty values, scalar fields are coerced
+    to strings and list entries that are not of the expected shape are dropped.
 
     Args:
-        resume_text: String containing the resume text
+        record: Decoded JSON object returned by the model
 
     Returns:
-        dict: Contact information (name, email, phone), or None if extraction fails
+        tuple: (record containing every contact and list field in canonical form,
+            list of fields that were absent or had the wrong type)
     """
-    try:
-        load_dotenv()
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
+    if not isinstance(record, dict):
+        return validate({}, ResumeRecord)
+    return validate(record, ResumeRecord)
+
+def parse_combined_response(response_text: str) -> dict:
+    """
+    Decode and validate the response of the combined extraction prompt.
+
+    Defects such as surrounding prose, trailing commas or a truncated response are
+    repaired. Fields that are absent, of the wrong type or were cut off by truncation are
+    filled with empty values and listed under "missing", so they can be re-requested.
+
+    Args:
+        response_text: Raw text returned by Gemini
+
+    Returns:
+        dict: {"contact": dict, "is_valid_resume": bool, "data": dict, "missing": list}
+
+    Raises:
+        ValueError: If the response is empty or contains no recoverable JSON object
+    """
+    if not response_text.strip():
+        raise ValueError("Empty response from Gemini API")
 
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-1.5-flash-latest")
+    decoded = decode_json(response_text)
+    payload = decoded.payload
+    verdict, missing = validate(payload, CombinedVerdict)
+    data, missing_fields = validate_resume_record(payload.get("resume"))
+    missing += missing_fields
 
-        prompt = f"""Extract ONLY the following contact information from the text and return as JSON:
-        - "name": string (Full name of the candidate)
-        - "email": string (Primary email address)
-        - "phone": string (Primary phone number)
+    # The section the response was cut off in is incomplete even though it decoded
+    path = decoded.open_path
+    if decoded.truncated and len(path) >= 2 and path[0] == "resume" and path[1] in data and path[1] not in missing:
+        missing.append(path[1])
 
+    contact = {field: data[field] for field in CONTACT_FIELDS}
+    return {"contact": contact, "is_valid_resume": verdict[VERDICT_FIELD], "data": data, "missing": missing}
+
+def build_sections_prompt(resume_text: str, fields: list) -> str:
+    """Build a follow-up prompt asking only for the given top-level fields of the combined response"""
+    specs = "\n".join(FIELD_PROMPTS[field] for field in fields)
+    notes = ""
+    if {"education", "certifications"} & set(fields):
+        notes = "\nImportant notes:" + RESUME_FIELDS_PROMPT.partition("Important notes:")[2]
+    return f"""Analyze the following text and return a single JSON object with exactly these keys
+        (use empty strings or empty lists when information is missing):
+
+{specs}
+{notes}
         Text:
         {resume_text}
 
-        Return ONLY the JSON object with these three fields, no additional text.
+        Return ONLY the JSON object, no additional text.
         """
 
-        response = model.generate_content(prompt)
-        clean_response = response.text.strip().replace('```json', '').replace('```', '').strip()
-        return json.loads(clean_response)
-    except Exception as e:
-        print(f"Error extracting contact info: {str(e)}")
-        return None
+def _validate_fields(payload: dict, fields: list) -> tuple:
+    """Validate top-level fields of a combined response (the verdict or resume fields) against their types"""
+    return validate(payload, TypedDict("Sections", {
+        field: bool if field == VERDICT_FIELD else _RECORD_HINTS[field] for field in fields
+    }))
 
-def is_valid_resume(resume_text: str) -> bool:
+def parse_sections_response(response_text: str, fields: list) -> tuple:
     """
-    Check if the resume text contains typical resume sections.
-
-    Args:
-        resume_text: String containing the resume text
+    Decode the response of a follow-up sections prompt.
 
     Returns:
-        bool: True if the text contains typical resume sections, False otherwise
+        tuple: (dict of the fields that were returned, list of fields still missing)
     """
-    try:
-        load_dotenv()
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
+    decoded = decode_json(response_text)
+    values, missing = _validate_fields(decoded.payload, fields)
+    if decoded.truncated and decoded.open_path and decoded.open_path[0] in values and decoded.open_path[0] not in missing:
+        missing.append(decoded.open_path[0])
+    return {field: value for field, value in values.items() if field not in missing}, missing
 
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-1.5-flash-latest")
-
-        prompt = f"""Analyze the following text and determine if it appears to be a valid resume.
-        A valid resume should contain at least one of these sections:
-        - Work experience
-        - Education
-        - Skills
-        - Projects
-        - Certifications
+def build_combined_prompt(resume_text: str, part: int = 1, parts: int = 1) -> str:
+    """Build the single prompt that yields contact info, validity verdict and structured data"""
+    part_note = ""
+    if parts > 1:
+        part_note = f"""
+        The text is part {part} of {parts} of one long resume. Extract only what appears in this part;
+        set "is_valid_resume" to true if this part contains any of the listed sections.
+"""
+    return f"""Analyze the following text and return a single JSON object with exactly two keys:
 
-        Return ONLY true or false.
+        - "is_valid_resume": boolean (true only if the text is a resume containing at least one of these sections:
+          Work experience, Education, Skills, Projects, Certifications)
+        - "resume": object with the fields below (use empty strings or empty lists when information is missing)
 
+{RESUME_FIELDS_PROMPT}{part_note}
         Text:
         {resume_text}
+
+        Return ONLY the JSON object, no additional text.
         """
 
-        response = model.generate_content(prompt)
-        clean_response = response.text.strip().lower()
-        return clean_response in ['true', 'yes', 'valid']
-    except Exception as e:
-        print(f"Error validating resume: {str(e)}")
-        return False
+def _entry_key(entry) -> tuple | str:
+    if isinstance(entry, dict):
+        return tuple(" ".join(str(value).lower().split()) for value in entry.values())
+    return " ".join(str(entry).lower().split())
 
-def extract_structured_data(resume_text: str) -> dict | None:
+def merge_extractions(results: list) -> dict:
     """
-    Extract structured data from resume text using Gemini AI.
+    Merge the extractions of consecutive chunks of one resume.
+
+    The merge depends only on chunk order: contact fields take the first non-empty value,
+    the resume is valid if any chunk says so, and list fields are concatenated in chunk
+    order with case- and whitespace-insensitive duplicates removed.
 
     Args:
-        resume_text: String containing the resume text
+        results: Parsed combined responses, one per chunk, in document order
 
     Returns:
-        dict: Structured data extracted from the resume, or None if extraction fails
+        dict: {"contact": dict, "is_valid_resume": bool, "data": dict}
+    """
+    data = {}
+    for field in CONTACT_FIELDS:
+        data[field] = next((result['data'][field] for result in results if result['data'][field]), "")
+    for field in RESUME_LIST_FIELDS:
+        merged, seen = [], set()
+        for result in results:
+            for entry in result['data'][field]:
+                key = _entry_key(entry)
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(entry)
+        data[field] = merged
+    contact = {field: data[field] for field in CONTACT_FIELDS}
+    return {"contact": contact, "is_valid_resume": any(result['is_valid_resume'] for result in results), "data": data}
+
+def _report_sections(on_section, values: dict) -> None:
+    """Pass finished sections to the caller's callback; a failing callback never breaks extraction"""
+    for field, value in values.items():
+        try:
+            on_section(field, value)
+        except Exception as e:
+            print(f"Error reporting section {field}: {str(e)}")
+
+async def _stream_response(client, prompt: str, on_section) -> str:
     """
+    Stream a combined response, reporting the verdict and each resume section as soon as it is complete.
+
+    Falls back to one blocking request if the stream fails, reporting the sections of its response at once.
+    """
+    parser = IncrementalJSONParser()
+    pieces = []
     try:
-        # Load environment variables and configure Gemini
-        load_dotenv()
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
-
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-1.5-flash-latest")
-
-        # Construct the prompt for Gemini
-        prompt = f"""Extract the following information from the resume text and return it as a JSON object:
-
-        - "name": string (Full name of the candidate)
-        - "email": string (Primary email address)
-        - "phone": string (Primary phone number)
-        - "skills": list of strings (Technical and soft skills mentioned)
-        - "work_experience": list of objects. Each object must have:
-            - "company": string
-            - "role": string (Job title)
-            - "dates": string (e.g., "Jan 2020 - Present")
-            - "description": string (Key responsibilities and achievements)
-        - "education": list of objects (for formal academic degrees from universities or colleges). Each object must have:
-            - "institution": string (Name of the university/college)
-            - "degree": string (Formal degree title, e.g., "Bachelor of Science in Computer Science")
-            - "graduation_date": string (e.g., "May 2020" or "2020-2024")
-            - "details": string (Optional - additional details about the degree)
-        - "certifications": list of objects (for professional certifications, online courses, and other learning). Each object must have:
-            - "name": string (Name of the certification/course)
-            - "issuing_organization": string (Organization that issued the certification)
-            - "date_obtained": string (e.g., "Jan 2023" or "2023")
-            - "details": string (Optional - additional details about the certification)
-
-        Important notes:
-        - Only include formal academic degrees (Bachelors, Masters, PhDs, etc.) in the 'education' field
-        - Include all other learning achievements (certifications, online courses, professional training) in the 'certifications' field
-        - If a certification is part of a formal degree program, include it in the degree's 'details' field instead of the certifications list
-        - If a certification has multiple parts or levels, create separate entries in the certifications list for each part
-
-        Resume text:
-        {resume_text}
+        async for piece in client.stream(prompt):
+            pieces.append(piece)
+            for path, value in parser.feed(piece):
+                field = path[-1]
+                if path == (VERDICT_FIELD,) or (len(path) == 2 and path[0] == "resume" and field in _RECORD_HINTS):
+                    values, problems = _validate_fields({field: value}, [field])
+                    if not problems:
+                        _report_sections(on_section, values)
+    except GeminiError as e:
+        print(f"Streaming failed, falling back to a blocking request: {str(e)}")
+        response_text = (await client.generate(prompt)).text
+        try:
+            result = parse_combined_response(response_text)
+        except ValueError:
+            # Left for the caller to raise when it parses the response
+            return response_text
+        values = {VERDICT_FIELD: result["is_valid_resume"], **result["data"]}
+        _report_sections(on_section, {field: value for field, value in values.items() if field not in result["missing"]})
+        return response_text
+    return "".join(pieces)
 
-        Return ONLY the JSON object, no additional text.
-        """
+async def _extract_chunk(client, chunk: str, part: int, parts: int, on_section=None) -> dict:
+    """
+    Extract one chunk with the combined prompt, re-requesting only the sections missing from the response.
 
-        # Make the API call
+    With on_section the response is streamed and every section is passed to on_section(field, value)
+    as soon as it is complete; sections filled in by the follow-up request are reported afterwards.
+
+    Raises:
+        ValueError: If no usable JSON is returned, or the response lacks the verdict and every section
+    """
+    prompt = build_combined_prompt(chunk, part, parts)
+    if on_section is None:
+        response_text = (await client.generate(prompt)).text
+    else:
+        response_text = await _stream_response(client, prompt, on_section)
+    with timed("json_parse"):
+        result = parse_combined_response(response_text)
+
+    missing = result.pop("missing")
+    for _ in range(MAX_SECTION_REQUESTS):
+        if not missing:
+            break
+        print(f"Re-requesting missing section(s): {', '.join(missing)}")
+        increment("llm_section_requests_total")
         try:
-            response = model.generate_content(prompt)
-            print(f"\nResponse content: {response.text}")
-            
-            if not response.text.strip():
-                raise ValueError("Empty response from Gemini API")
-            
-            # Clean up the response text by removing markdown formatting
-            clean_response = response.text.strip().replace('```json', '').replace('```', '').strip()
-            
-            # Parse the JSON response
-            structured_data = json.loads(clean_response)
-            return structured_data
-            
-        except Exception as e:
-            print(f"\nError details: {str(e)}")
-            print(f"\nRaw response: {response.text}")
-            raise ValueError(f"Failed to process Gemini response: {str(e)}")
+            completion = await client.generate(build_sections_prompt(chunk, missing))
+            with timed("json_parse"):
+                values, missing = parse_sections_response(completion.text, missing)
+        except ValueError as e:
+            print(f"Error decoding missing sections: {str(e)}")
+            break
+        if on_section is not None:
+            _report_sections(on_section, values)
+        if VERDICT_FIELD in values:
+            result["is_valid_resume"] = values.pop(VERDICT_FIELD)
+        result["data"].update(values)
+        result["contact"] = {field: result["data"][field] for field in CONTACT_FIELDS}
 
-    except ValueError as e:
-        print(f"Configuration error: {str(e)}")
-        return None
+    if VERDICT_FIELD in missing and set(_RECORD_HINTS) <= set(missing):
+        raise ValueError("Response contains neither a verdict nor any resume section")
+    return result
+
+async def extract_resume_async(resume_text: str, on_section=None) -> dict | None:
+    """
+    Extract contact info, a resume validity verdict and structured data with the combined prompt.
+
+    The text is compacted to the prompt token budget first. A resume that fits is sent in
+    a single Gemini call; a longer one is split into chunks that are extracted concurrently
+    and merged in document order.
+
+    Args:
+        resume_text: String containing the resume text
+        on_section: Optional callback on_section(field, value) for progressive display. A
+            single-chunk resume is streamed and each section is reported as soon as the
+            model has written it; the sections of a multi-chunk resume are reported once merged.
+
+    Returns:
+        dict: {"contact": dict, "is_valid_resume": bool, "data": dict, "compaction": dict},
+            or None if extraction fails
+    """
+    try:
+        compacted = compact_text(resume_text)
+        if not compacted.chunks:
+            raise ValueError("No text left after compaction")
+        report = compacted.report()
+        print(f"Prompt text compacted from {report['tokens_before']} to {report['tokens_after']} tokens "
+              f"in {report['chunks']} chunk(s){' (truncated)' if report['truncated'] else ''}")
+
+        client = get_gemini_client(MODEL_NAME)
+        parts = len(compacted.chunks)
+        if parts == 1:
+            extraction = await _extract_chunk(client, compacted.chunks[0], 1, 1, on_section)
+        else:
+            results = await asyncio.gather(*(
+                _extract_chunk(client, chunk, part, parts) for part, chunk in enumerate(compacted.chunks, start=1)
+            ))
+            extraction = merge_extractions(results)
+            if on_section is not None:
+                _report_sections(on_section, {VERDICT_FIELD: extraction['is_valid_resume'], **extraction['data']})
+        return {**extraction, "compaction": report}
     except Exception as e:
-        print(f"Error during API call: {str(e)}")
+        print(f"Error during combined extraction: {str(e)}")
         return None
 
+def extract_resume(resume_text: str, on_section=None) -> dict | None:
+    """Blocking variant of extract_resume_async()"""
+    return run_sync(extract_resume_async(resume_text, on_section))
+
 if __name__ == "__main__":
     # Test the function
     try:
@@ -174,11 +386,11 @@ if __name__ == "__main__":
             resume_text = f.read()
 
         print("\nExtracting structured data from resume...")
-        result = extract_structured_data(resume_text)
-        
+        result = extract_resume(resume_text)
+
         if result:
             print("\nStructured Data:")
-            print(json.dumps(result, indent=2))
+            print(json.dumps(result['data'], indent=2))
         else:
             print("\nFailed to extract structured data")
 
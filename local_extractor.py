@@ -0,0 +1,196 @@
+"""
+Module for deterministic local pre-extraction of contact fields and resume sections
+
+Compiled regexes and line heuristics find the email, phone number, probable name and
+section headings of a resume without any network call. The result gates uploads before
+the LLM: documents with no contact details and no resume sections are rejected locally,
+clear resumes are accepted locally, and only ambiguous documents rely on the model's
+verdict. The spaCy model from the Docker image is used as a fallback name finder.
+"""
+import re
+import threading
+
+from metrics import timed
+
+SPACY_MODEL = "en_core_web_sm"
+
+# Only the head of the document is searched for the candidate's name
+NAME_SEARCH_LINES = 8
+NAME_SEARCH_CHARS = 1000
+
+EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+PHONE_RE = re.compile(r"(?<![\w])(?:\+\d{1,3}[\s.-]?)?(?:\(\d{1,4}\)[\s.-]?)?\d{2,5}(?:[\s.-]?\d{2,5}){1,3}(?![\w])")
+_YEAR_RANGE_RE = re.compile(r"^(?:19|20)\d{2}\s*[-–]\s*(?:19|20)\d{2}$")
+_NAME_TOKEN_RE = re.compile(r"^[A-Z][a-zA-Z'’-]*\.?$|^[A-Z]{2,}$")
+_HEADING_STRIP_RE = re.compile(r"[^a-z& ]+")
+
+# Heading spellings per canonical section; a heading line must match one exactly after normalization
+SECTION_HEADINGS = {
+    "experience": (
+        "experience", "work experience", "professional experience", "employment",
+        "employment history", "work history", "career history", "relevant experience",
+    ),
+    "education": ("education", "academic background", "academic qualifications", "education & training"),
+    "skills": (
+        "skills", "technical skills", "key skills", "core competencies", "skills & abilities",
+        "technologies", "tools & technologies", "competencies",
+    ),
+    "projects": ("projects", "personal projects", "academic projects", "key projects"),
+    "certifications": (
+        "certifications", "certificates", "licenses & certifications", "courses",
+        "training", "certifications & training",
+    ),
+    "summary": ("summary", "professional summary", "profile", "objective", "career objective", "about me"),
+}
+_HEADING_LOOKUP = {spelling: section for section, spellings in SECTION_HEADINGS.items() for spelling in spellings}
+
+# Sections that make a document a resume, matching the sections the LLM validity prompt asks for
+RESUME_SECTIONS = {"experience", "education", "skills", "projects", "certifications"}
+
+# Verdicts returned by pre_extract
+VERDICT_RESUME = "resume"
+VERDICT_NOT_RESUME = "not_resume"
+VERDICT_AMBIGUOUS = "ambiguous"
+
+def find_email(text: str) -> str:
+    """Return the first email address in the text, or an empty string"""
+    match = EMAIL_RE.search(text)
+    return match.group(0) if match else ""
+
+def find_phone(text: str) -> str:
+    """
+    Return the first plausible phone number, or an empty string.
+
+    Numbers need 10 to 15 digits, or at least 7 with a country code or area-code
+    parentheses, so ids, dates and year ranges are not mistaken for phones.
+    """
+    for match in PHONE_RE.finditer(text):
+        candidate = match.group(0).strip()
+        digits = sum(char.isdigit() for char in candidate)
+        marked = candidate.startswith('+') or '(' in candidate
+        if (10 <= digits <= 15 or (marked and digits >= 7)) and not _YEAR_RANGE_RE.match(candidate):
+            return candidate
+    return ""
+
+def _heading_section(line: str) -> str | None:
+    normalized = " ".join(_HEADING_STRIP_RE.sub(" ", line.lower().replace(" and ", " & ")).split())
+    return _HEADING_LOOKUP.get(normalized)
+
+def find_sections(text: str) -> list:
+    """Return the canonical sections whose headings appear on a line of their own, in document order"""
+    sections = []
+    for line in text.splitlines():
+        if len(line) > 40:
+            continue
+        section = _heading_section(line)
+        if section and section not in sections:
+            sections.append(section)
+    return sections
+
+def _looks_like_name(line: str) -> bool:
+    tokens = line.split()
+    if not 2 <= len(tokens) <= 4:
+        return False
+    if any(char.isdigit() or char in "@/|:" for char in line):
+        return False
+    return all(_NAME_TOKEN_RE.match(token) for token in tokens) and _heading_section(line) is None
+
+_nlp = None
+_nlp_loaded = False
+_nlp_lock = threading.Lock()
+
+def get_spacy_model():
+    """Return the process-wide spaCy pipeline, loading it on first use; None if spaCy or the model is missing"""
+    global _nlp, _nlp_loaded
+    with _nlp_lock:
+        if not _nlp_loaded:
+            _nlp_loaded = True
+            try:
+                import spacy
+                _nlp = spacy.load(SPACY_MODEL, disable=["parser", "lemmatizer", "tagger", "attribute_ruler"])
+            except Exception as e:
+                print(f"Warning: spaCy model {SPACY_MODEL} unavailable, using heuristics only: {str(e)}")
+        return _nlp
+
+def find_name(text: str) -> str:
+    """
+    Guess the candidate's name.
+
+    The first short title-case line near the top of the document wins; otherwise the
+    first PERSON entity spaCy finds in the head of the document is used.
+
+    Args:
+        text: Extracted resume text
+
+    Returns:
+        str: Probable full name, or an empty string
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    for line in lines[:NAME_SEARCH_LINES]:
+        if _looks_like_name(line):
+            return line
+    nlp = get_spacy_model()
+    if nlp is None:
+        return ""
+    for entity in nlp(text[:NAME_SEARCH_CHARS]).ents:
+        if entity.label_ == "PERSON" and len(entity.text.split()) >= 2:
+            return entity.text.strip()
+    return ""
+
+def pre_extract(text: str) -> dict:
+    """
+    Extract contact fields and section headings locally and decide whether an LLM verdict is needed.
+
+    Args:
+        text: Extracted document text
+
+    Returns:
+        dict: {"contact": {"name", "email", "phone"}, "sections": list, "verdict": str} where the
+            verdict is "resume" (contact details and resume sections found), "not_resume" (neither
+            an email nor any resume section found) or "ambiguous"
+    """
+    with timed("pre_extract"):
+        email = find_email(text)
+        sections = find_sections(text)
+        resume_sections = [section for section in sections if section in RESUME_SECTIONS]
+        # Only look for a name (and possibly load spaCy) when the document is not rejected outright
+        name = find_name(text) if email or resume_sections else ""
+        contact = {"name": name, "email": email, "phone": find_phone(text)}
+
+    if not email and not resume_sections:
+        verdict = VERDICT_NOT_RESUME
+    elif email and name and resume_sections:
+        verdict = VERDICT_RESUME
+    else:
+        verdict = VERDICT_AMBIGUOUS
+    return {"contact": contact, "sections": sections, "verdict": verdict}
+
+def merge_pre_extraction(extraction: dict, pre: dict) -> dict:
+    """
+    Combine an LLM extraction with the local pre-extraction.
+
+    Contact fields the model left empty are filled from the local result, and a local
+    "resume" verdict overrides the model's validity verdict.
+
+    Args:
+        extraction: Result of llm_extractor.extract_resume
+        pre: Result of pre_extract for the same text
+
+    Returns:
+        dict: New extraction with the same keys
+    """
+    contact = dict(extraction['contact'])
+    data = dict(extraction['data'])
+    for field, value in pre['contact'].items():
+        if value and not contact.get(field):
+            contact[field] = value
+            data[field] = value
+    is_valid = extraction['is_valid_resume'] or pre['verdict'] == VERDICT_RESUME
+    return {**extraction, "contact": contact, "is_valid_resume": is_valid, "data": data}
+
+if __name__ == "__main__":
+    import sys
+    import json
+
+    with open(sys.argv[1] if len(sys.argv) > 1 else 'extracted_text.txt', 'r', encoding='utf-8') as f:
+        print(json.dumps(pre_extract(f.read()), indent=2))
@@ -0,0 +1,230 @@
+"""
+Module for lightweight in-process pipeline metrics
+
+Counters and histograms are kept in memory per process and exported in the Prometheus
+text format (served at /metrics by api_server). When METRICS_LOG_PATH is set, every
+timed stage is also appended to that file as one JSON object per line. Recording is a
+dictionary update under a lock, cheap enough to leave on in production; METRICS_ENABLED=0
+turns every call into a no-op.
+
+Usage:
+    with timed("pdf_open", backend="pypdf2"):
+        ...
+
+    @timed("store_save")
+    def save(...): ...
+
+    increment("gemini_retries_total")
+"""
+import os
+import json
+import time
+import bisect
+import threading
+import functools
+
+ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+LOG_PATH = os.getenv("METRICS_LOG_PATH", "")
+
+# Upper bounds (seconds) of the stage duration histogram buckets
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_METRIC = "resume_stage_seconds"
+
+# HELP lines of the metrics recorded by the pipeline
+HELP_TEXT = {
+    STAGE_METRIC: "Duration of pipeline stages in seconds",
+    "resume_stage_failures_total": "Pipeline stages that raised an exception",
+    "extraction_cache_events_total": "Extraction cache hits, misses and evictions",
+    "pdf_backend_fallbacks_total": "PDF backends whose text was rejected or that failed",
+    "gemini_requests_total": "Gemini requests by outcome",
+    "gemini_retries_total": "Gemini requests retried after a transient error",
+    "gemini_prompt_tokens_total": "Prompt tokens sent to Gemini",
+    "gemini_response_tokens_total": "Response tokens received from Gemini",
+    "prompt_tokens_saved_total": "Prompt tokens removed by text compaction",
+    "llm_response_repairs_total": "Defects repaired in model responses, by kind",
+    "llm_section_requests_total": "Follow-up requests for sections missing from a model response",
+    "duplicate_matches_total": "Incoming resumes matching a saved resume of the same candidate, by reason",
+}
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+
+    def inc(self, labels: tuple, amount: float) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(labels)} {_format_value(value)}" for labels, value in sorted(self.values.items())]
+        return lines
+
+class Histogram:
+    """Cumulative-bucket histogram per label set"""
+
+    def __init__(self, name: str, help_text: str = "", buckets: tuple = DURATION_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self.values = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+        series["counts"][bisect.bisect_left(self.buckets, value)] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series["counts"]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {series['count']}")
+        return lines
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        key + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for key, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class MetricsRegistry:
+    """Thread-safe collection of named counters and histograms with an optional JSON log sink"""
+
+    def __init__(self, log_path: str = LOG_PATH):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._log = open(log_path, "a", encoding="utf-8", buffering=1) if log_path else None
+
+    def _get(self, kind, name: str):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = kind(name, HELP_TEXT.get(name, name))
+        return metric
+
+    def increment(self, name: str, amount: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._get(Counter, name).inc(key, amount)
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._get(Histogram, name).observe(key, value)
+
+    def log(self, event: dict) -> None:
+        if self._log is None:
+            return
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._log.write(line)
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            lines = []
+            for name in sorted(self._metrics):
+                lines += self._metrics[name].render()
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        """Return counter values and histogram count/sum per metric and label set"""
+        with self._lock:
+            result = {}
+            for name, metric in self._metrics.items():
+                if isinstance(metric, Counter):
+                    result[name] = {_format_labels(labels) or "total": value for labels, value in metric.values.items()}
+                else:
+                    result[name] = {
+                        _format_labels(labels) or "total": {"count": series["count"], "sum": series["sum"]}
+                        for labels, series in metric.values.items()
+                    }
+            return result
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide metrics registry, creating it on first use"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+    return _registry
+
+def increment(name: str, amount: float = 1, **labels) -> None:
+    """Add amount to a counter (no-op when metrics are disabled)"""
+    if ENABLED:
+        get_metrics().increment(name, amount, **labels)
+
+def observe(name: str, value: float, **labels) -> None:
+    """Record a value in a histogram (no-op when metrics are disabled)"""
+    if ENABLED:
+        get_metrics().observe(name, value, **labels)
+
+class timed:
+    """
+    Context manager (or function decorator) timing one pipeline stage.
+
+    The duration is recorded in the resume_stage_seconds histogram under the stage label
+    (plus any extra labels) and written to the JSON log sink; an exception leaving the
+    block also counts a resume_stage_failures_total.
+    """
+
+    __slots__ = ("stage", "labels", "started")
+
+    def __init__(self, stage: str, **labels):
+        self.stage = stage
+        self.labels = labels
+        self.started = 0.0
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(self.stage, **self.labels):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def __enter__(self):
+        if ENABLED:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if ENABLED:
+            record_stage(self.stage, time.perf_counter() - self.started, exc_type is None, **self.labels)
+        return False
+
+def record_stage(stage: str, elapsed: float, ok: bool = True, **labels) -> None:
+    """
+    Record a stage duration measured by the caller, as timed does on exit.
+
+    For stages whose time is spread over several calls, such as pages pulled from a
+    generator between which the consumer does its own work.
+    """
+    if not ENABLED:
+        return
+    registry = get_metrics()
+    registry.observe(STAGE_METRIC, elapsed, stage=stage, **labels)
+    if not ok:
+        registry.increment("resume_stage_failures_total", stage=stage)
+    registry.log({"ts": time.time(), "stage": stage, "seconds": round(elapsed, 6), "ok": ok, **labels})
+
+def render_prometheus() -> str:
+    """Return all metrics of this process in the Prometheus text exposition format"""
+    return get_metrics().render_prometheus()
@@ -1,53 +1,438 @@
 """
 Module for parsing PDF documents
 """
-import pdfplumber
+import os
 import io
+import re
+import time
+import uuid
+import threading
+import multiprocessing
+from contextlib import contextmanager, ExitStack
+import pdfplumber
+
+from metrics import timed, increment, record_stage
+
+try:
+    from PyPDF2 import PdfReader
+except ImportError:  # optional fast path
+    PdfReader = None
+
+# Budgets protecting the caller from very large or malicious PDFs (0 disables a limit)
+MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))
+MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "200000"))
+TIMEOUT_SECONDS = float(os.getenv("PDF_TIMEOUT", "30"))
+# Files at least this large are opened in a worker process, where the time budget is enforced by termination
+ISOLATE_MIN_BYTES = int(float(os.getenv("PDF_ISOLATE_MIN_MB", "5")) * 1024 * 1024)
+
+# Documents with at least this many pages are split across a process pool
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+PAGES_PER_TASK = 4
+
+# Backends tried in order; later ones are only used when the text from earlier ones fails the quality check
+BACKEND_ORDER = [name.strip() for name in os.getenv("PDF_BACKENDS", "pypdf2,pdfplumber").split(",") if name.strip()]
+
+# Quality heuristics for accepting text from a fast backend
+MIN_CHARS_PER_PAGE = 200
+MAX_GARBAGE_RATIO = 0.05
+SECTION_KEYWORDS = (
+    "experience", "education", "skills", "projects", "certifications", "employment",
+    "summary", "objective", "work history", "qualifications",
+)
+# Pages of the extracted text are separated by a form feed so page structure survives for later stages
+PAGE_BREAK = "\n\f"
+
+_GARBAGE_RE = re.compile(r"\(cid:\d+\)|[\ufffd\ue000-\uf8ff]|[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+class PDFTimeoutError(TimeoutError):
+    """Raised when text extraction exceeds the per-document time budget"""
+
+def _clean_page_text(page_text: str | None) -> str:
+    return (page_text or "").encode('utf-8', 'ignore').decode('utf-8')
 
-def extract_text_from_pdf(pdf_input):
+@contextmanager
+def _open_pdfplumber(source):
+    """Full layout analysis; slow but robust"""
+    with pdfplumber.open(source) as pdf:
+        yield [page.extract_text for page in pdf.pages]
+
+@contextmanager
+def _open_pypdf2(source):
+    """Plain content-stream text extraction; fast but weaker on complex layouts"""
+    if PdfReader is None:
+        raise ImportError("PyPDF2 is not installed")
+    yield [page.extract_text for page in PdfReader(source).pages]
+
+# Each backend opens a source and yields one zero-argument text extractor per page
+PDF_BACKENDS = {
+    "pypdf2": _open_pypdf2,
+    "pdfplumber": _open_pdfplumber,
+}
+
+def available_backends() -> list:
+    """Return the configured backends that can run in this environment, in preference order"""
+    return [name for name in BACKEND_ORDER if name in PDF_BACKENDS and (name != "pypdf2" or PdfReader is not None)]
+
+def assess_text_quality(text: str, page_count: int) -> str | None:
     """
-    Extract text from a PDF file.
-    
+    Decide whether extracted text is good enough to skip slower backends.
+
     Args:
-        pdf_input: Either a file path (string) or a file-like object
-        
+        text: Extracted text of the document
+        page_count: Number of pages the text was extracted from
+
     Returns:
-        str: The extracted text from all pages of the PDF
-        
+        str: Reason the text was rejected, or None if it looks fine
+    """
+    stripped = "".join(text.split())
+    if len(stripped) < MIN_CHARS_PER_PAGE * max(1, page_count):
+        return "low character density"
+    garbage = sum(len(match) for match in _GARBAGE_RE.findall(text))
+    if garbage / len(stripped) > MAX_GARBAGE_RATIO:
+        return "high garbage-glyph ratio"
+    lowered = text.lower()
+    if not any(keyword in lowered for keyword in SECTION_KEYWORDS):
+        return "no section keywords"
+    return None
+
+def _as_source(pdf_input):
+    """
+    Return something pdfplumber can open without copying the caller's buffer.
+
+    Paths and seekable file-like objects are passed through as-is, bytes-like objects
+    are wrapped in a BytesIO (which shares the bytes object's memory) and only
+    non-seekable streams are read into memory.
+    """
+    if isinstance(pdf_input, str):
+        return pdf_input
+    if isinstance(pdf_input, (bytes, bytearray, memoryview)):
+        return io.BytesIO(pdf_input if isinstance(pdf_input, bytes) else bytes(pdf_input))
+    if hasattr(pdf_input, 'read'):
+        if hasattr(pdf_input, 'seek') and (not hasattr(pdf_input, 'seekable') or pdf_input.seekable()):
+            pdf_input.seek(0)
+            return pdf_input
+        return io.BytesIO(pdf_input.read())
+    raise ValueError("Input must be either a file path (string), bytes or a file-like object")
+
+def _source_size(source) -> int:
+    """Size in bytes of a source returned by _as_source"""
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    size = source.seek(0, io.SEEK_END)
+    source.seek(0)
+    return size
+
+def _picklable_source(source):
+    """Return a path or bytes that worker processes can reopen"""
+    if isinstance(source, str):
+        return source
+    if isinstance(source, io.BytesIO):
+        return source.getvalue()
+    source.seek(0)
+    return source.read()
+
+# Worker processes are spawned, never forked: the callers run in multithreaded processes
+# (job workers, the API threadpool, Streamlit) and a forked child could inherit locks held by other threads
+_SPAWN_CONTEXT = multiprocessing.get_context("spawn")
+# Idle worker processes kept for reuse, so only the first documents pay for spawning one
+MAX_IDLE_WORKERS = int(os.getenv("PDF_IDLE_WORKERS", str(os.cpu_count() or 1)))
+
+_idle_workers = []
+_idle_workers_lock = threading.Lock()
+
+# State of a worker process: the document it is serving
+_worker_token = None
+_worker_document = None
+_worker_pages = None
+
+def _open_document(token: str, source, backend: str) -> int:
+    """Open a document in a worker process, replacing the previous one, and return its page count"""
+    global _worker_token, _worker_document, _worker_pages
+    _close_document()
+    document = PDF_BACKENDS[backend](io.BytesIO(source) if isinstance(source, bytes) else source)
+    _worker_pages = document.__enter__()
+    _worker_token, _worker_document = token, document
+    return len(_worker_pages)
+
+def _close_document() -> None:
+    global _worker_token, _worker_document, _worker_pages
+    if _worker_document is not None:
+        document, _worker_document, _worker_pages, _worker_token = _worker_document, None, None, None
+        document.__exit__(None, None, None)
+
+def _extract_page_range(token: str, start: int, stop: int) -> list:
+    """Extract the text of pages [start, stop) of the open document in a worker process"""
+    if token != _worker_token:
+        raise RuntimeError("PDF worker is not serving this document")
+    return [_clean_page_text(_worker_pages[i]()) for i in range(start, stop)]
+
+def _checkout_workers(count: int) -> list:
+    """Take idle worker processes for one document, spawning more as needed; each is a one-process pool"""
+    with _idle_workers_lock:
+        workers = [_idle_workers.pop() for _ in range(min(count, len(_idle_workers)))]
+    while len(workers) < count:
+        workers.append(_SPAWN_CONTEXT.Pool(processes=1))
+    return workers
+
+def _release_workers(workers: list, idle: bool) -> None:
+    """Return workers that finished all their tasks for reuse; busy or broken ones are terminated"""
+    for worker in workers:
+        if idle:
+            worker.apply_async(_close_document)
+            with _idle_workers_lock:
+                if len(_idle_workers) < MAX_IDLE_WORKERS:
+                    _idle_workers.append(worker)
+                    continue
+        worker.terminate()
+
+def _wait(result, deadline: float | None):
+    """Wait for a worker result within the time budget"""
+    remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+    try:
+        return result.get(timeout=remaining)
+    except multiprocessing.TimeoutError:
+        raise PDFTimeoutError("PDF text extraction exceeded the time budget")
+
+def _iter_pages_isolated(source, max_pages: int, deadline: float | None, parallel: bool, backend: str):
+    """
+    Open and extract the document in worker processes, so the time budget holds even when
+    opening the file or a single page never returns: the workers still busy are terminated.
+
+    Each document checks out its own workers, so terminating them never affects another
+    document. Short documents are read in one task by a single worker; long ones, when
+    parallel is allowed, PAGES_PER_TASK pages per task across up to one worker per CPU.
+    """
+    payload = _picklable_source(source)
+    token = uuid.uuid4().hex
+    workers = _checkout_workers(1)
+    results = [workers[0].apply_async(_open_document, (token, payload, backend))]
+    try:
+        with timed("pdf_open", backend=backend):
+            page_count = _wait(results[0], deadline)
+        page_limit = min(page_count, max_pages) if max_pages else page_count
+        # Short documents are read in one task: a round trip per page costs more than it streams
+        pages_per_task = max(1, page_limit)
+        if parallel and page_limit >= PARALLEL_MIN_PAGES:
+            pages_per_task = PAGES_PER_TASK
+            extra = _checkout_workers(min(os.cpu_count() or 1, -(-page_limit // PAGES_PER_TASK)) - 1)
+            results.extend(worker.apply_async(_open_document, (token, payload, backend)) for worker in extra)
+            workers.extend(extra)
+        page_results = [
+            workers[index % len(workers)].apply_async(_extract_page_range, (token, start, min(start + pages_per_task, page_limit)))
+            for index, start in enumerate(range(0, page_limit, pages_per_task))
+        ]
+        results.extend(page_results)
+        for result in page_results:
+            with timed("pdf_page", backend=backend):
+                pages = _wait(result, deadline)
+            yield from pages
+    finally:
+        _release_workers(workers, idle=all(result.ready() for result in results))
+
+def _iter_pages_local(source, max_pages: int, deadline: float | None, parallel: bool, backend: str):
+    """
+    Extract in this process without copying the source, handing long documents to worker
+    processes: they are fanned out when parallel is allowed, and the time budget of a
+    long document is enforced there. For short documents the budget is checked between pages.
+    """
+    with ExitStack() as stack:
+        with timed("pdf_open", backend=backend):
+            page_extractors = stack.enter_context(PDF_BACKENDS[backend](source))
+        page_count = len(page_extractors)
+        page_limit = min(page_count, max_pages) if max_pages else page_count
+        if page_limit < PARALLEL_MIN_PAGES or not (parallel or deadline is not None):
+            for extract_page in page_extractors[:page_limit]:
+                if deadline is not None and time.monotonic() > deadline:
+                    raise PDFTimeoutError("PDF text extraction exceeded the time budget")
+                with timed("pdf_page", backend=backend):
+                    page_text = extract_page()
+                yield _clean_page_text(page_text)
+            return
+    yield from _iter_pages_isolated(source, max_pages, deadline, parallel, backend)
+
+def iter_pdf_pages(pdf_input, max_pages: int = MAX_PAGES, max_chars: int = MAX_CHARS,
+                   timeout: float = TIMEOUT_SECONDS, parallel: bool = True, backend: str = "pdfplumber",
+                   isolate: bool = False):
+    """
+    Lazily yield the text of each page of a PDF.
+
+    Short documents are read in this process straight from the caller's buffer, checking
+    the time budget between pages. Long documents (PARALLEL_MIN_PAGES pages or more), files
+    of ISOLATE_MIN_BYTES or more and documents the caller asks to isolate are read in
+    spawned worker processes, which are terminated when the budget runs out, so a page that
+    never finishes parsing cannot block the caller. Long documents are fanned out across
+    several workers (results are still yielded in page order). Iteration stops early once
+    max_pages pages or max_chars characters have been produced; the page that crosses the
+    character budget is truncated.
+
+    Args:
+        pdf_input: File path, bytes-like object or file-like object
+        max_pages: Maximum number of pages to read (0 for no limit)
+        max_chars: Maximum number of characters to yield (0 for no limit)
+        timeout: Per-document time budget in seconds (0 for no limit, in which case only long
+            documents read in parallel leave this process)
+        parallel: Allow several worker processes for long documents; disable when the caller
+            already parallelizes across documents
+        backend: Name of the text extraction backend in PDF_BACKENDS
+        isolate: Read the document in a worker process whenever a time budget is set, for
+            untrusted files that may hang while being opened
+
+    Yields:
+        str: Text of the next page
+
+    Raises:
+        PDFTimeoutError: If the time budget is exceeded
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+    source = _as_source(pdf_input)
+    if deadline is not None and (isolate or _source_size(source) >= ISOLATE_MIN_BYTES):
+        pages = _iter_pages_isolated(source, max_pages, deadline, parallel, backend)
+    else:
+        pages = _iter_pages_local(source, max_pages, deadline, parallel, backend)
+
+    chars = 0
+    try:
+        for page_text in pages:
+            if max_chars and chars + len(page_text) >= max_chars:
+                yield page_text[:max_chars - chars]
+                return
+            chars += len(page_text)
+            yield page_text
+    finally:
+        pages.close()
+
+def iter_best_pdf_pages(pdf_input, max_pages: int = MAX_PAGES, max_chars: int = MAX_CHARS,
+                        timeout: float = TIMEOUT_SECONDS, parallel: bool = True, on_backend=None,
+                        isolate: bool = False):
+    """
+    Lazily yield page texts from the fastest backend whose output passes the quality check.
+
+    Backends are tried in BACKEND_ORDER and all attempts share one time budget. Pages of a
+    backend that can still be rejected are held back until the whole document has passed
+    the check; the last backend is accepted unconditionally and streams its pages as they
+    are extracted. A backend that raises is skipped in favour of the next.
+
+    Args:
+        pdf_input: A file path (string), bytes-like object or file-like object
+        max_pages: Maximum number of pages to read (0 for no limit)
+        max_chars: Maximum number of characters to extract (0 for no limit)
+        timeout: Per-document time budget in seconds (0 for no limit)
+        parallel: Allow page-parallel extraction for long documents
+        on_backend: Optional callback receiving the name of the backend whose pages are yielded
+        isolate: Always read the document in a worker process when a time budget is set
+
+    Yields:
+        str: Text of the next page (possibly empty)
+
+    Raises:
+        FileNotFoundError: If the file path does not exist
+        PDFTimeoutError: If the time budget is exceeded
+        Exception: If the last backend cannot read the PDF
+    """
+    source = _as_source(pdf_input)
+    deadline = time.monotonic() + timeout if timeout else None
+    backends = available_backends() or ["pdfplumber"]
+    for position, backend in enumerate(backends):
+        remaining = max(0.001, deadline - time.monotonic()) if deadline is not None else 0
+        pages = iter_pdf_pages(source, max_pages, max_chars, remaining, parallel, backend, isolate)
+        if position == len(backends) - 1:
+            if on_backend is not None:
+                on_backend(backend)
+            # Only the time spent fetching pages is recorded, not the time the caller spends on them
+            elapsed, ok = 0.0, False
+            try:
+                while True:
+                    started = time.perf_counter()
+                    try:
+                        page_text = next(pages, None)
+                    finally:
+                        elapsed += time.perf_counter() - started
+                    if page_text is None:
+                        ok = True
+                        return
+                    yield page_text
+            except GeneratorExit:
+                ok = True
+                raise
+            finally:
+                pages.close()
+                record_stage("pdf_extract", elapsed, ok, backend=backend)
+        try:
+            with timed("pdf_extract", backend=backend):
+                page_texts = list(pages)
+        except (FileNotFoundError, PDFTimeoutError):
+            raise
+        except Exception as e:
+            increment("pdf_backend_fallbacks_total", backend=backend, reason="error")
+            print(f"Warning: PDF backend {backend} failed, falling back: {str(e)}")
+            continue
+        reason = assess_text_quality(PAGE_BREAK.join(page_text for page_text in page_texts if page_text), len(page_texts))
+        if reason is None:
+            if on_backend is not None:
+                on_backend(backend)
+            yield from page_texts
+            return
+        increment("pdf_backend_fallbacks_total", backend=backend, reason=reason)
+        print(f"PDF backend {backend} rejected ({reason}), falling back")
+
+def extract_text_and_backend(pdf_input, max_pages: int = MAX_PAGES, max_chars: int = MAX_CHARS,
+                             timeout: float = TIMEOUT_SECONDS, parallel: bool = True) -> tuple:
+    """
+    Extract text with the fastest backend whose output passes the quality check.
+
+    Args:
+        pdf_input: A file path (string), bytes-like object or file-like object
+        max_pages: Maximum number of pages to read (0 for no limit)
+        max_chars: Maximum number of characters to extract (0 for no limit)
+        timeout: Per-document time budget in seconds (0 for no limit)
+        parallel: Allow page-parallel extraction for long documents
+
+    Returns:
+        tuple: (extracted text, name of the backend that produced it)
+
     Raises:
         ValueError: If the input is neither a string nor a file-like object
         FileNotFoundError: If the file path does not exist
-        Exception: If there's an error opening or reading the PDF
+        Exception: If there's an error opening or reading the PDF, or the time budget is exceeded
     """
     try:
-        # If input is a file path (string)
-        if isinstance(pdf_input, str):
-            with pdfplumber.open(pdf_input) as pdf:
-                text = extract_text_from_pdf_pages(pdf)
-        # If input is a file-like object
-        elif hasattr(pdf_input, 'read'):
-            with pdfplumber.open(io.BytesIO(pdf_input.read())) as pdf:
-                text = extract_text_from_pdf_pages(pdf)
-        else:
-            raise ValueError("Input must be either a file path (string) or a file-like object")
-        
-        return text
-    
+        chosen = []
+        page_texts = list(iter_best_pdf_pages(pdf_input, max_pages, max_chars, timeout, parallel, chosen.append))
+        return PAGE_BREAK.join(page_text for page_text in page_texts if page_text).strip(), chosen[-1]
     except FileNotFoundError:
         raise FileNotFoundError("The specified PDF file could not be found")
     except Exception as e:
         raise Exception(f"Error processing PDF: {str(e)}")
 
+def extract_text_from_pdf(pdf_input, max_pages: int = MAX_PAGES, max_chars: int = MAX_CHARS,
+                          timeout: float = TIMEOUT_SECONDS, parallel: bool = True):
+    """
+    Extract text from a PDF file.
+
+    Args:
+        pdf_input: A file path (string), bytes-like object or file-like object
+        max_pages: Maximum number of pages to read (0 for no limit)
+        max_chars: Maximum number of characters to extract (0 for no limit)
+        timeout: Per-document time budget in seconds (0 for no limit)
+        parallel: Allow page-parallel extraction for long documents
+
+    Returns:
+        str: The extracted text from the PDF pages within the budgets, pages separated by PAGE_BREAK
+
+    Raises:
+        ValueError: If the input is neither a string nor a file-like object
+        FileNotFoundError: If the file path does not exist
+        Exception: If there's an error opening or reading the PDF, or the time budget is exceeded
+    """
+    text, _ = extract_text_and_backend(pdf_input, max_pages, max_chars, timeout, parallel)
+    return text
+
 def extract_text_from_pdf_pages(pdf):
     """
-    Helper function to extract text from all pages of a PDF
+    Helper function to extract text from all pages of an open pdfplumber PDF
     """
-    text = ""
-    for page in pdf.pages:
-        page_text = page.extract_text()
-        if page_text:
-            text += page_text + "\n"
-    return text.strip().encode('utf-8', 'ignore').decode('utf-8')
+    page_texts = (_clean_page_text(page.extract_text()) for page in pdf.pages)
+    return "\n".join(page_text for page_text in page_texts if page_text).strip()
 
 
 '''
@@ -56,4 +441,8 @@ text = extract_text_from_pdf("path/to/file.pdf")
 
 # Using a file-like object (e.g., from Streamlit file uploader)
 text = extract_text_from_pdf(uploaded_file)
-'''
\ No newline at end of file
+
+# Streaming pages with tighter budgets
+for page_text in iter_pdf_pages(uploaded_file, max_pages=5, max_chars=20000, timeout=10):
+    ...
+'''
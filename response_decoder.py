@@ -0,0 +1,371 @@
+"""
+Module for decoding and validating JSON objects in LLM responses
+
+Model output is not always clean JSON: it may be wrapped in markdown fences or prose,
+use smart quotes, leave trailing commas or stop mid-object when the response is cut off.
+decode_json() locates the first JSON object in the text, parses it directly when it is
+valid and otherwise repairs it in a single pass: smart quotes become ASCII quotes, raw
+newlines in strings are escaped, trailing commas and Python literals are fixed, and a
+truncated object is closed after dropping its incomplete last member. The decoded
+response records which repairs were made and which keys were still open at the cut.
+
+validate() checks a decoded value against a TypedDict schema and returns the value in
+canonical form together with the fields that were absent or of the wrong type, so callers
+can re-request just those fields.
+"""
+import re
+import json
+from dataclasses import dataclass, field
+from typing import get_args, get_origin, get_type_hints, is_typeddict
+
+from metrics import increment
+
+# Quote characters models substitute for ASCII double quotes
+SMART_QUOTES = "“”„‟″"
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+TRUE_STRINGS = ('true', 'yes', 'valid')
+
+class ResponseDecodeError(ValueError):
+    """Raised when no JSON object can be recovered from a response"""
+
+@dataclass
+class DecodedResponse:
+    """JSON object recovered from a response, with the repairs that were needed"""
+    payload: dict
+    repairs: list = field(default_factory=list)
+    truncated: bool = False
+    # Keys whose values were still open where the response was cut off, outermost first
+    open_path: tuple = ()
+
+def locate_json(text: str) -> str:
+    """
+    Return the first JSON object in the text, from its opening brace to the matching
+    closing brace, or to the end of the text if the object is never closed.
+
+    Raises:
+        ResponseDecodeError: If the text contains no opening brace
+    """
+    start = text.find("{")
+    if start < 0:
+        raise ResponseDecodeError("No JSON object in response")
+    depth = 0
+    closers = None
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if closers:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char in closers:
+                closers = None
+        elif char == '"' or char in SMART_QUOTES:
+            closers = _string_closers(char)
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:index + 1]
+    return text[start:]
+
+def _string_closers(opener: str) -> str:
+    """Characters ending a string: only an ASCII quote closes an ASCII-quoted string"""
+    return '"' if opener == '"' else '"' + SMART_QUOTES
+
+def _strip_trailing_comma(out: list) -> bool:
+    index = len(out) - 1
+    while index >= 0 and out[index].isspace():
+        index -= 1
+    if index >= 0 and out[index] == ",":
+        del out[index:]
+        return True
+    return False
+
+def repair_json(fragment: str) -> tuple:
+    """
+    Rewrite a located JSON object into valid JSON.
+
+    Args:
+        fragment: Text starting at the object's opening brace, as returned by locate_json()
+
+    Returns:
+        tuple: (repaired text, list of repairs made, truncated flag, open key path)
+    """
+    out = []
+    repairs = set()
+    # One frame per open container: [closer, current key, key start offset in out, expecting a key]
+    stack = []
+    closers = None
+    string_is_key = False
+    string_start = 0
+    key_chars = []
+    index = 0
+    length = len(fragment)
+
+    while index < length:
+        char = fragment[index]
+        if closers:
+            if char == "\\":
+                if index + 1 < length:
+                    out.append(fragment[index:index + 2])
+                    if string_is_key:
+                        key_chars.append(fragment[index + 1])
+                index += 2
+                continue
+            if char in closers:
+                out.append('"')
+                closers = None
+                if string_is_key:
+                    stack[-1][1] = "".join(key_chars)
+            elif char in "\n\r\t":
+                out.append({"\n": "\\n", "\r": "\\r", "\t": "\\t"}[char])
+                repairs.add("control characters in string")
+            else:
+                out.append(char)
+                if string_is_key:
+                    key_chars.append(char)
+        elif char == '"' or char in SMART_QUOTES:
+            if char != '"':
+                repairs.add("smart quotes")
+            string_is_key = bool(stack) and stack[-1][0] == "}" and stack[-1][3]
+            if string_is_key:
+                stack[-1][2] = len(out)
+                key_chars = []
+            string_start = len(out)
+            closers = _string_closers(char)
+            out.append('"')
+        elif char in "{[":
+            stack.append(["}" if char == "{" else "]", None, None, char == "{"])
+            out.append(char)
+        elif char in "}]":
+            if _strip_trailing_comma(out):
+                repairs.add("trailing comma")
+            closer = stack.pop()[0] if stack else char
+            if closer != char:
+                repairs.add("mismatched bracket")
+            out.append(closer)
+            if not stack:
+                break
+        elif char == ",":
+            if stack and stack[-1][0] == "}":
+                stack[-1][3] = True
+            out.append(char)
+        elif char == ":":
+            if stack:
+                stack[-1][3] = False
+            out.append(char)
+        elif char.isalpha():
+            end = index
+            while end < length and fragment[end].isalpha():
+                end += 1
+            word = fragment[index:end]
+            if word in PYTHON_LITERALS:
+                repairs.add("python literals")
+                word = PYTHON_LITERALS[word]
+            out.append(word)
+            index = end
+            continue
+        else:
+            out.append(char)
+        index += 1
+
+    truncated = bool(stack)
+    open_path = tuple(frame[1] for frame in stack if frame[0] == "}" and frame[1] is not None and not frame[3])
+    if truncated:
+        repairs.add("truncated")
+        if closers:
+            if string_is_key:
+                del out[string_start:]
+            else:
+                # An escape sequence cut in half would make the closed string invalid
+                if re.search(r"\\u[0-9a-fA-F]{0,3}$", "".join(out[-6:])):
+                    while not out[-1].startswith("\\u"):
+                        out.pop()
+                    out.pop()
+                out.append('"')
+        _close_truncated(out, stack)
+    return "".join(out), sorted(repairs), truncated, open_path
+
+def _close_truncated(out: list, stack: list) -> None:
+    """Drop the incomplete last member of the innermost open containers and close them"""
+    while stack:
+        while out and out[-1].isspace():
+            out.pop()
+        frame = stack[-1]
+        last = out[-1] if out else ""
+        if last == ",":
+            out.pop()
+        elif (last.isalpha() and last not in ("true", "false", "null")) or last in ("-", "+", "."):
+            # A number or literal cut off mid-token
+            out.pop()
+        elif frame[0] == "}" and frame[2] is not None and (last == ":" or (frame[3] and last == '"')):
+            # A key without a value
+            del out[frame[2]:]
+            frame[1], frame[2], frame[3] = None, None, True
+        else:
+            out.append(stack.pop()[0])
+
+def decode_json(text: str) -> DecodedResponse:
+    """
+    Decode the first JSON object in a model response, repairing it if necessary.
+
+    Args:
+        text: Raw response text
+
+    Returns:
+        DecodedResponse: The decoded object and the repairs applied
+
+    Raises:
+        ResponseDecodeError: If no JSON object can be recovered
+    """
+    fragment = locate_json(text)
+    try:
+        payload = json.loads(fragment)
+        repairs, truncated, open_path = [], False, ()
+    except json.JSONDecodeError:
+        repaired, repairs, truncated, open_path = repair_json(fragment)
+        try:
+            payload = json.loads(repaired)
+        except json.JSONDecodeError as e:
+            raise ResponseDecodeError(f"Unrepairable JSON in response: {str(e)}") from e
+        for repair in repairs:
+            increment("llm_response_repairs_total", repair=repair)
+    if not isinstance(payload, dict):
+        raise ResponseDecodeError("Response JSON is not an object")
+    return DecodedResponse(payload, repairs, truncated, open_path)
+
+def _coerce(value, hint):
+    """Return value converted to the type hint, or raise ValueError if it cannot be"""
+    origin = get_origin(hint)
+    if value is None and is_typeddict(hint):
+        return validate({}, hint)[0]
+    if hint is str:
+        if value is None:
+            return ""
+        if isinstance(value, (dict, list)):
+            raise ValueError("expected a string")
+        return str(value).strip()
+    if hint is bool:
+        if isinstance(value, str):
+            return value.strip().lower() in TRUE_STRINGS
+        if isinstance(value, bool) or value is None:
+            return bool(value)
+        raise ValueError("expected a boolean")
+    if origin is list:
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            raise ValueError("expected a list")
+        item_hint = get_args(hint)[0]
+        if is_typeddict(item_hint):
+            return [validate(item, item_hint)[0] for item in value if isinstance(item, dict)]
+        # Scalar items of the wrong shape are dropped rather than failing the field
+        items = []
+        for item in value:
+            if isinstance(item, (str, int, float)) and not isinstance(item, bool) and str(item).strip():
+                items.append(_coerce(item, item_hint))
+        return items
+    if is_typeddict(hint):
+        if not isinstance(value, dict):
+            raise ValueError("expected an object")
+        return validate(value, hint)[0]
+    raise TypeError(f"Unsupported schema type {hint!r}")
+
+def validate(payload: dict, schema) -> tuple:
+    """
+    Validate a decoded object against a TypedDict schema.
+
+    Every schema field is present in the result: absent and null fields get empty values,
+    scalars are coerced to strings and list items of the wrong shape are dropped.
+
+    Args:
+        payload: Decoded JSON object
+        schema: TypedDict class describing the expected fields
+
+    Returns:
+        tuple: (validated dict, list of fields that were absent or had the wrong type)
+    """
+    validated = {}
+    problems = []
+    for name, hint in get_type_hints(schema).items():
+        try:
+            if name not in payload:
+                raise ValueError("missing")
+            validated[name] = _coerce(payload[name], hint)
+        except ValueError:
+            problems.append(name)
+            validated[name] = _coerce(None, hint)
+    return validated, problems
+
+class IncrementalJSONParser:
+    """
+    Parser reporting the members of a streamed JSON object as soon as each one is complete.
+
+    feed() takes the next piece of the response and returns (path, value) for every member
+    completed by it, where path is the tuple of keys leading to the member. Members of the
+    top-level object and of objects nested under its keys are reported down to max_depth
+    levels; deeper values are reported as part of their enclosing member. Text before the
+    first opening brace (prose, markdown fences) is skipped.
+    """
+
+    def __init__(self, max_depth: int = 2):
+        self.max_depth = max_depth
+        self.done = False
+        self._buffer = ""
+        self._position = 0
+        # One frame per open container: {"closer", "path" (None below arrays), "start" of the current member, "key"}
+        self._stack = []
+        self._closers = None
+        self._escaped = False
+
+    def feed(self, piece: str) -> list:
+        self._buffer += piece
+        completed = []
+        buffer = self._buffer
+        while self._position < len(buffer) and not self.done:
+            index = self._position
+            char = buffer[index]
+            self._position += 1
+            if self._closers:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char in self._closers:
+                    self._closers = None
+            elif not self._stack:
+                if char == "{":
+                    self._stack.append({"closer": "}", "path": (), "start": index + 1, "key": None})
+            elif char == '"' or char in SMART_QUOTES:
+                self._closers = _string_closers(char)
+            elif char in "{[":
+                parent = self._stack[-1]
+                path = None
+                if char == "{" and parent["path"] is not None and parent["key"] is not None:
+                    path = parent["path"] + (parent["key"],)
+                self._stack.append({"closer": "}" if char == "{" else "]", "path": path, "start": index + 1, "key": None})
+            elif char == ":":
+                frame = self._stack[-1]
+                if frame["closer"] == "}":
+                    frame["key"] = buffer[frame["start"]:index].strip().strip('"' + SMART_QUOTES)
+            elif char in ",}]":
+                frame = self._stack[-1]
+                if frame["closer"] == "}" and char != "]":
+                    self._complete(frame, index, completed)
+                if char == ",":
+                    frame["start"], frame["key"] = index + 1, None
+                else:
+                    self._stack.pop()
+                    self.done = not self._stack
+        return completed
+
+    def _complete(self, frame: dict, end: int, completed: list) -> None:
+        if frame["path"] is None or frame["key"] is None or len(frame["path"]) >= self.max_depth:
+            return
+        try:
+            member = decode_json("{" + self._buffer[frame["start"]:end] + "}").payload
+        except ResponseDecodeError:
+            return
+        completed.extend((frame["path"] + (key,), value) for key, value in member.items())
@@ -0,0 +1,128 @@
+"""
+Module for the shared resume processing pipeline used by the app, background jobs and batch ingestion
+"""
+import os
+import threading
+
+from document_parser import extract_text_and_format, UnsupportedFormatError, DOCUMENT_TIMEOUT
+from llm_extractor import extract_resume
+from local_extractor import pre_extract, merge_pre_extraction, VERDICT_NOT_RESUME
+from extraction_cache import get_extraction_cache
+from resume_store import get_resume_store, make_record_name
+from skill_normalizer import normalize_resume_skills
+from duplicate_index import MATCH_TEXT
+from metrics import increment
+
+# What to do with a near-duplicate of a saved resume: "link" extracts and saves it linked to the
+# existing candidate, "skip" returns the saved resume without calling the LLM
+DUPLICATE_POLICY = os.getenv("DUPLICATE_POLICY", "link").lower()
+
+# Serializes the duplicate check and save so identical resumes processed concurrently are saved once
+_save_lock = threading.Lock()
+
+def parse_document_bytes(content: bytes, timeout: float = DOCUMENT_TIMEOUT) -> tuple:
+    """
+    Extract text from a document of any supported format without fanning pages out, for
+    callers that parallelize across documents
+
+    Args:
+        content: Document bytes
+        timeout: Time budget in seconds (0 when the caller already runs this in a worker
+            process and enforces the deadline itself)
+
+    Returns:
+        tuple: (extracted text, name of the backend that produced it)
+    """
+    return extract_text_and_format(content, timeout=timeout, parallel=False)
+
+def extract_and_save(document: str, content: bytes, text: str, cached: dict | None,
+                     pdf_backend: str | None = None, on_section=None) -> dict:
+    """
+    Gate the text locally, run LLM extraction (unless cached), validate the result and save it.
+
+    Args:
+        document: Document id (a path, "archive:member" or upload filename); its base name names the record
+        content: Document bytes, used as cache key
+        text: Extracted document text
+        cached: Cache entry found by document bytes, if any
+        pdf_backend: Backend that produced the text (PDF backend or format name), when it was just parsed
+        on_section: Optional callback on_section(field, value) receiving resume sections
+            as the model produces them (see llm_extractor.extract_resume_async)
+
+    Returns:
+        dict: Outcome with a "status" of saved, duplicate, rejected or failed, plus "record" or "error".
+            When the resume matches a saved one of the same candidate, "duplicate_of" names that
+            record and "match" gives the reason (text, email or phone) and text "similarity".
+    """
+    cache = get_extraction_cache()
+    if not text:
+        return {"status": "failed", "error": "No text could be extracted from the document"}
+
+    link = {}
+    if cached is None:
+        cached = cache.get_by_text(text)
+        if cached:
+            extraction = cached['extraction']
+        else:
+            pre = pre_extract(text)
+            if pre['verdict'] == VERDICT_NOT_RESUME:
+                return {"status": "rejected", "error": "No email address or resume sections found locally"}
+            # Checked before the LLM call so near-duplicates can skip extraction
+            matches = get_resume_store().find_duplicates(text, pre['contact']['email'], pre['contact']['phone'])
+            if matches:
+                best = matches[0]
+                link = {"duplicate_of": best['__filename'], "match": best['reason'], "similarity": round(best['similarity'], 3)}
+                increment("duplicate_matches_total", reason=best['reason'])
+                if best['reason'] == MATCH_TEXT and DUPLICATE_POLICY == "skip":
+                    return {"status": "duplicate", "record": best['__filename'], **link}
+            extraction = extract_resume(text, on_section)
+            if extraction is None:
+                return {"status": "failed", "error": "LLM extraction failed"}
+            extraction = merge_pre_extraction(extraction, pre)
+        cache.put(content, text, extraction, pdf_backend=pdf_backend)
+    else:
+        extraction = cached['extraction']
+        pdf_backend = cached.get('pdf_backend')
+
+    contact_info = extraction['contact']
+    if not contact_info.get('name') or not contact_info.get('email'):
+        return {"status": "rejected", "error": "No recognizable name or email address"}
+    if not extraction['is_valid_resume']:
+        return {"status": "rejected", "error": "Missing typical resume sections"}
+
+    store = get_resume_store()
+    with _save_lock:
+        record = cache.get_record(text)
+        if record and store.has_resume(record):
+            return {"status": "duplicate", "record": record}
+
+        record = make_record_name(os.path.basename(document.split(':')[-1]))
+        store.save({**normalize_resume_skills(extraction['data']), 'pdf_backend': pdf_backend}, record, text)
+        cache.set_record(text, record)
+    return {"status": "saved", "record": record, **link}
+
+def process_document(document: str, content: bytes, parallel: bool = True, on_section=None) -> dict:
+    """
+    Run the whole pipeline for one document: cache lookup, parsing, extraction and saving.
+
+    The format (PDF, DOCX, RTF, HTML or plain text) is detected from the content.
+
+    Args:
+        document: Document id or upload filename; its base name names the saved record
+        content: Document bytes
+        parallel: Allow page-parallel parsing of long documents
+        on_section: Optional callback receiving resume sections as they are extracted
+
+    Returns:
+        dict: Outcome as returned by extract_and_save
+    """
+    cached = get_extraction_cache().get_by_pdf(content)
+    if cached:
+        return extract_and_save(document, content, cached['text'], cached)
+    try:
+        text, pdf_backend = extract_text_and_format(content, parallel=parallel)
+    except UnsupportedFormatError as e:
+        return {"status": "rejected", "error": str(e)}
+    except Exception as e:
+        return {"status": "failed", "error": f"Failed to extract text from the document: {str(e)}"}
+    return extract_and_save(document, content, text, None, pdf_backend, on_section)
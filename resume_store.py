@@ -0,0 +1,607 @@
+"""
+Module for persisting extracted resumes in an indexed SQLite store
+"""
+import os
+import re
+import json
+import time
+import uuid
+import zlib
+import sqlite3
+import threading
+
+from skill_index import SkillIndex, bitmap_to_ids
+from similarity_index import SimilarityIndex, document_text, skills_in_text, vectorize
+from duplicate_index import DuplicateIndex, fingerprint
+from metrics import timed
+
+DATA_DIR = "resumes_data"
+DB_PATH = os.path.join(DATA_DIR, "resumes.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL DEFAULT '',
+    email TEXT NOT NULL DEFAULT '',
+    phone TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resume_details (
+    resume_id INTEGER PRIMARY KEY REFERENCES resumes(id) ON DELETE CASCADE,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resume_texts (
+    resume_id INTEGER PRIMARY KEY REFERENCES resumes(id) ON DELETE CASCADE,
+    raw_text BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resume_skills (
+    skill TEXT NOT NULL,
+    resume_id INTEGER NOT NULL REFERENCES resumes(id) ON DELETE CASCADE,
+    PRIMARY KEY (skill, resume_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_resume_skills_resume ON resume_skills(resume_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+SUMMARY_COLUMNS = "id, filename, name, email, phone"
+
+# Meta key of the counter bumped on every save
+DATA_VERSION_KEY = 'data_version'
+
+# Keep IN (...) lists below SQLite's default host parameter limit
+ID_CHUNK_SIZE = 500
+
+# zlib level for raw resume text; text blobs are only read for a single selected resume
+RAW_TEXT_COMPRESSION_LEVEL = 6
+# Rows rewritten per transaction by compact()
+COMPACT_BATCH_SIZE = 200
+
+def sanitize_filename(filename: str) -> str:
+    """Sanitize filename by removing special characters and replacing spaces with underscores"""
+    # Remove special characters, keep only alphanumeric, dots, and underscores
+    sanitized = re.sub(r'[^a-zA-Z0-9._]', '', filename)
+    # Replace spaces with underscores
+    sanitized = sanitized.replace(' ', '_')
+    return sanitized
+
+def make_record_name(original_filename: str) -> str:
+    """Return a new unique record name of the form "<sanitized>_<uuid>.json" """
+    return f"{sanitize_filename(original_filename)}_{uuid.uuid4()}.json"
+
+def encode_details(structured: dict) -> str:
+    """Serialize a structured record as compact JSON (no indentation or separator spaces)"""
+    return json.dumps(structured, ensure_ascii=False, separators=(',', ':'))
+
+def encode_raw_text(raw_text: str) -> bytes:
+    """Compress raw resume text into the blob stored in resume_texts"""
+    return zlib.compress((raw_text or '').encode('utf-8'), RAW_TEXT_COMPRESSION_LEVEL)
+
+def decode_raw_text(value) -> str:
+    """Decode a resume_texts value: a zlib blob, or plain text written before compression"""
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode('utf-8')
+    return value or ''
+
+def _summary_from_row(row: tuple) -> dict:
+    """Build the list-view projection of a resume; raw text and details are never included"""
+    resume_id, filename, name, email, phone = row
+    return {'id': resume_id, '__filename': filename, 'name': name, 'email': email, 'phone': phone}
+
+class ResumeStore:
+    """
+    SQLite-backed resume store running in WAL mode.
+
+    Summary columns used by list views live in the narrow `resumes` table, the structured
+    record lives in `resume_details` as compact JSON and the raw resume text in
+    `resume_texts` as a zlib-compressed blob; both are only read for a single selected
+    resume. `resume_skills` records every (skill, resume) pair and feeds the inverted
+    SkillIndex that answers skill filters without loading records, and `resume_vectors`
+    holds the term vectors behind the SimilarityIndex used for job-description matching.
+    The DuplicateIndex tables fingerprint every resume and link resumes of the same candidate.
+    Each thread gets its own connection so Streamlit sessions can read concurrently.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self.skill_index = SkillIndex()
+        self.similarity_index = SimilarityIndex()
+        self.duplicate_index = DuplicateIndex()
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        self.skill_index.ensure_schema(conn)
+        self.similarity_index.ensure_schema(conn)
+        self.duplicate_index.ensure_schema(conn)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    # Writes
+
+    @timed("store_save")
+    def save(self, data: dict, filename: str, raw_text: str) -> int:
+        """
+        Insert or replace a resume record.
+
+        Args:
+            data: Structured resume data (any 'raw_text' key is ignored)
+            filename: Unique record name, e.g. "<sanitized>_<uuid>.json"
+            raw_text: Text extracted from the original document
+
+        Returns:
+            int: Row id of the stored resume
+        """
+        structured = {k: v for k, v in data.items() if k != 'raw_text' and not k.startswith('__')}
+        skills = sorted({str(skill) for skill in structured.get('skills') or []})
+        summary = (
+            str(structured.get('name') or ''),
+            str(structured.get('email') or ''),
+            str(structured.get('phone') or ''),
+        )
+        features, weights = vectorize(document_text(structured, raw_text), skills)
+        fp = fingerprint(raw_text, structured.get('email'), structured.get('phone'))
+        conn = self._connection()
+        try:
+            with self._write_lock, conn:
+                row = conn.execute("SELECT id FROM resumes WHERE filename = ?", (filename,)).fetchone()
+                if row is None:
+                    cursor = conn.execute(
+                        "INSERT INTO resumes (filename, name, email, phone, created_at) VALUES (?, ?, ?, ?, ?)",
+                        (filename, *summary, time.time()),
+                    )
+                    resume_id = cursor.lastrowid
+                    old_skills = []
+                else:
+                    resume_id = row[0]
+                    conn.execute(
+                        "UPDATE resumes SET name = ?, email = ?, phone = ? WHERE id = ?",
+                        (*summary, resume_id),
+                    )
+                    old_skills = [r[0] for r in conn.execute(
+                        "SELECT skill FROM resume_skills WHERE resume_id = ?", (resume_id,)
+                    )]
+                conn.execute(
+                    "INSERT OR REPLACE INTO resume_details (resume_id, data) VALUES (?, ?)",
+                    (resume_id, encode_details(structured)),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO resume_texts (resume_id, raw_text) VALUES (?, ?)",
+                    (resume_id, encode_raw_text(raw_text)),
+                )
+                conn.execute("DELETE FROM resume_skills WHERE resume_id = ?", (resume_id,))
+                conn.executemany(
+                    "INSERT INTO resume_skills (skill, resume_id) VALUES (?, ?)",
+                    [(skill, resume_id) for skill in skills],
+                )
+                self.skill_index.refresh(conn)
+                self.skill_index.update(conn, resume_id, old_skills, skills)
+                self._refresh_similarity(conn)
+                self.similarity_index.update(conn, resume_id, features, weights)
+                self._refresh_duplicates(conn)
+                self.duplicate_index.update(conn, resume_id, fp)
+                self._bump_data_version(conn)
+        except Exception:
+            self.skill_index.invalidate()
+            self.similarity_index.invalidate()
+            raise
+        return resume_id
+
+    def import_json_directory(self, data_dir: str = DATA_DIR) -> int:
+        """
+        Import legacy per-resume JSON files that are not in the store yet.
+
+        Args:
+            data_dir: Directory containing "<name>_<uuid>.json" records
+
+        Returns:
+            int: Number of files imported
+        """
+        try:
+            json_files = sorted(f for f in os.listdir(data_dir) if f.endswith('.json'))
+        except FileNotFoundError:
+            return 0
+
+        known = {row[0] for row in self._connection().execute("SELECT filename FROM resumes")}
+        imported = 0
+        for filename in json_files:
+            if filename in known:
+                continue
+            try:
+                with open(os.path.join(data_dir, filename), 'r', encoding='utf-8') as f:
+                    resume_data = json.load(f)
+                self.save(resume_data, filename, resume_data.get('raw_text', ''))
+                imported += 1
+            except Exception as e:
+                print(f"Warning: Failed to import {filename}: {str(e)}")
+                continue
+
+        self._set_meta('json_imported_at', str(time.time()))
+        return imported
+
+    def compact(self, vacuum: bool = True) -> dict:
+        """
+        Convert records written in the older layout to the compact one.
+
+        Structured records stored as spaced or indented JSON are re-serialized compactly
+        and plain-text raw texts are compressed, in batches of COMPACT_BATCH_SIZE rows. The
+        database file is then vacuumed so the freed pages are returned to the filesystem.
+
+        Args:
+            vacuum: Run VACUUM after converting (rewrites the whole file)
+
+        Returns:
+            dict: Converted detail and text row counts and the file size before and after
+        """
+        conn = self._connection()
+        size_before = self._file_size()
+        converted = {"details": 0, "texts": 0}
+        for table, column, kind in (("resume_details", "data", "details"), ("resume_texts", "raw_text", "texts")):
+            last_id = 0
+            while True:
+                rows = conn.execute(
+                    f"SELECT resume_id, {column} FROM {table} WHERE resume_id > ? AND typeof({column}) = 'text' "
+                    f"ORDER BY resume_id LIMIT ?", (last_id, COMPACT_BATCH_SIZE),
+                ).fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                updates = []
+                for resume_id, value in rows:
+                    encoded = encode_details(json.loads(value)) if kind == "details" else encode_raw_text(value)
+                    if encoded != value:
+                        updates.append((encoded, resume_id))
+                with self._write_lock, conn:
+                    conn.executemany(f"UPDATE {table} SET {column} = ? WHERE resume_id = ?", updates)
+                converted[kind] += len(updates)
+        if vacuum:
+            with self._write_lock:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                conn.execute("VACUUM")
+        return {**converted, "bytes_before": size_before, "bytes_after": self._file_size()}
+
+    def _file_size(self) -> int:
+        return sum(os.path.getsize(self.db_path + suffix) for suffix in ("", "-wal") if os.path.exists(self.db_path + suffix))
+
+    # Reads
+
+    def has_resume(self, filename: str) -> bool:
+        """Return True if a record with this name exists"""
+        row = self._connection().execute("SELECT 1 FROM resumes WHERE filename = ?", (filename,)).fetchone()
+        return row is not None
+
+    def list_resumes(self, skills: list | None = None, limit: int | None = None, offset: int = 0,
+                     match_all: bool = True) -> list:
+        """
+        List resume summaries, optionally restricted by skills.
+
+        Args:
+            skills: Skills to filter by; matching is case- and whitespace-insensitive
+            limit: Maximum number of summaries to return (all when None)
+            offset: Number of matching summaries to skip, for pagination
+            match_all: Require every skill when True, any of them when False
+
+        Returns:
+            list: Summary dicts with 'id', '__filename', 'name', 'email' and 'phone'
+        """
+        conn = self._connection()
+        if not skills:
+            query = f"SELECT {SUMMARY_COLUMNS} FROM resumes ORDER BY id"
+            params = []
+            if limit is not None:
+                query += " LIMIT ? OFFSET ?"
+                params.extend((limit, offset))
+            return [_summary_from_row(row) for row in conn.execute(query, params)]
+
+        ids = self.matching_ids(skills, match_all)
+        ids = ids[offset:] if limit is None else ids[offset:offset + limit]
+        summaries = []
+        for start in range(0, len(ids), ID_CHUNK_SIZE):
+            chunk = ids[start:start + ID_CHUNK_SIZE]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = conn.execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM resumes WHERE id IN ({placeholders}) ORDER BY id", chunk
+            )
+            summaries.extend(_summary_from_row(row) for row in rows)
+        return summaries
+
+    @timed("store_search")
+    def search_resumes(self, query: str = "", skills: list | None = None, match_all: bool = True,
+                       limit: int = 25, offset: int = 0) -> tuple:
+        """
+        Page through resume summaries matching a text query and a skill filter.
+
+        Args:
+            query: Case-insensitive substring matched against name, email and record name
+            skills: Skills to filter by, as in list_resumes
+            match_all: Require every skill when True, any of them when False
+            limit: Page size
+            offset: Number of matching summaries to skip
+
+        Returns:
+            tuple: (summaries of the requested page, total number of matches)
+        """
+        conn = self._connection()
+        query = query.strip()
+        if not query:
+            if skills:
+                ids = self.matching_ids(skills, match_all)
+                return self.list_resumes(skills, limit, offset, match_all), len(ids)
+            return self.list_resumes(None, limit, offset), self.count()
+
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        where = "name LIKE ? ESCAPE '\\' OR email LIKE ? ESCAPE '\\' OR filename LIKE ? ESCAPE '\\'"
+        if not skills:
+            total = conn.execute(f"SELECT COUNT(*) FROM resumes WHERE {where}", (pattern,) * 3).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM resumes WHERE {where} ORDER BY id LIMIT ? OFFSET ?",
+                (pattern,) * 3 + (limit, offset),
+            )
+            return [_summary_from_row(row) for row in rows], total
+
+        skill_ids = set(self.matching_ids(skills, match_all))
+        ids = [row[0] for row in conn.execute(f"SELECT id FROM resumes WHERE {where} ORDER BY id", (pattern,) * 3)
+               if row[0] in skill_ids]
+        page = ids[offset:offset + limit]
+        if not page:
+            return [], len(ids)
+        placeholders = ", ".join("?" for _ in page)
+        rows = conn.execute(f"SELECT {SUMMARY_COLUMNS} FROM resumes WHERE id IN ({placeholders}) ORDER BY id", page)
+        return [_summary_from_row(row) for row in rows], len(ids)
+
+    def matching_ids(self, skills: list, match_all: bool = True) -> list:
+        """Return the sorted ids of resumes matching all (or any) of the given skills"""
+        self.skill_index.refresh(self._connection())
+        return bitmap_to_ids(self.skill_index.query(skills, match_all))
+
+    @timed("store_similar")
+    def similar_resumes(self, text: str = "", filename: str | None = None, limit: int = 10) -> list:
+        """
+        Rank saved resumes by TF-IDF similarity to a job description or to a saved resume.
+
+        Args:
+            text: Job description (or any free text); known skills mentioned in it are matched as skills
+            filename: Record name of a reference resume, used instead of text when given
+            limit: Number of resumes to return
+
+        Returns:
+            list: Summary dicts as in list_resumes with a cosine 'score' in [0, 1], best first
+        """
+        conn = self._connection()
+        self._refresh_similarity(conn)
+        exclude = None
+        if filename is not None:
+            row = conn.execute("SELECT id FROM resumes WHERE filename = ?", (filename,)).fetchone()
+            vector = self.similarity_index.stored_vector(conn, row[0]) if row else None
+            if vector is None:
+                return []
+            features, weights = vector
+            exclude = row[0]
+        else:
+            self.skill_index.refresh(conn)
+            features, weights = vectorize(text, skills_in_text(text, self.skill_index.count))
+        ranked = self.similarity_index.query(features, weights, limit, exclude)
+        if not ranked:
+            return []
+        scores = dict(ranked)
+        placeholders = ", ".join("?" for _ in scores)
+        rows = conn.execute(f"SELECT {SUMMARY_COLUMNS} FROM resumes WHERE id IN ({placeholders})", list(scores))
+        summaries = [{**_summary_from_row(row), 'score': scores[row[0]]} for row in rows]
+        return sorted(summaries, key=lambda summary: -summary['score'])
+
+    def _refresh_similarity(self, conn: sqlite3.Connection) -> None:
+        """Load new vectors into the similarity index, vectorizing every resume the first time"""
+        if self.similarity_index.stored_version(conn) is None:
+            self.similarity_index.rebuild(conn, (
+                (resume_id, document_text(structured, raw_text), structured.get('skills') or [])
+                for resume_id, structured, raw_text in self._stored_documents(conn)
+            ))
+        else:
+            self.similarity_index.refresh(conn)
+
+    def find_duplicates(self, text: str, email: str = "", phone: str = "", exclude: str | None = None) -> list:
+        """
+        Find saved resumes of the same candidate as an incoming resume, before it is extracted.
+
+        Args:
+            text: Extracted text of the incoming resume
+            email: Email address found in the text, if any
+            phone: Phone number found in the text, if any
+            exclude: Record name to leave out of the results
+
+        Returns:
+            list: Summary dicts as in list_resumes with 'reason' (text, email or phone),
+                'similarity' (estimated text overlap) and 'candidate_id', near-duplicate texts first
+        """
+        conn = self._connection()
+        self._refresh_duplicates(conn)
+        excluded = conn.execute("SELECT id FROM resumes WHERE filename = ?", (exclude,)).fetchone() if exclude else None
+        matches = self.duplicate_index.find(conn, fingerprint(text, email, phone), excluded[0] if excluded else None)
+        summaries = self._summaries_by_id([match['resume_id'] for match in matches])
+        return [{**summaries[match['resume_id']], **{k: match[k] for k in ('reason', 'similarity', 'candidate_id')}}
+                for match in matches if match['resume_id'] in summaries]
+
+    def candidate_resumes(self, filename: str) -> list:
+        """Return summaries of the other saved resumes linked to the same candidate, oldest first"""
+        conn = self._connection()
+        self._refresh_duplicates(conn)
+        row = conn.execute("SELECT id FROM resumes WHERE filename = ?", (filename,)).fetchone()
+        if row is None:
+            return []
+        ids = [resume_id for resume_id in self.duplicate_index.candidate_resumes(conn, row[0]) if resume_id != row[0]]
+        summaries = self._summaries_by_id(ids)
+        return [summaries[resume_id] for resume_id in ids if resume_id in summaries]
+
+    def duplicate_report(self) -> dict:
+        """
+        Group every saved resume with the resumes it duplicates by text, email or phone.
+
+        Returns:
+            dict: 'total_resumes', 'duplicate_resumes' (resumes beyond the first of each group)
+                and 'groups', each with the 'resumes' summaries and the pairwise 'matches'
+                as (record name, record name, reason, similarity)
+        """
+        conn = self._connection()
+        self._refresh_duplicates(conn)
+        groups = self.duplicate_index.duplicate_groups(conn)
+        summaries = self._summaries_by_id([resume_id for group in groups for resume_id in group['resume_ids']])
+        report = []
+        for group in groups:
+            report.append({
+                "resumes": [summaries[resume_id] for resume_id in group['resume_ids'] if resume_id in summaries],
+                "matches": [(summaries[first]['__filename'], summaries[second]['__filename'], reason, similarity)
+                            for first, second, reason, similarity in group['matches']
+                            if first in summaries and second in summaries],
+            })
+        return {
+            "total_resumes": self.count(),
+            "duplicate_resumes": sum(len(group['resumes']) - 1 for group in report),
+            "groups": report,
+        }
+
+    def _refresh_duplicates(self, conn: sqlite3.Connection) -> None:
+        """Fingerprint every saved resume the first time the duplicate index is used"""
+        if self.duplicate_index.is_built(conn):
+            return
+        documents = ((resume_id, raw_text, structured.get('email'), structured.get('phone'))
+                     for resume_id, structured, raw_text in self._stored_documents(conn))
+        if conn.in_transaction:
+            self.duplicate_index.rebuild(conn, documents)
+        else:
+            with self._write_lock, conn:
+                self.duplicate_index.rebuild(conn, documents)
+
+    def _summaries_by_id(self, ids: list) -> dict:
+        """Load summaries for the given resume ids, keyed by id"""
+        summaries = {}
+        for start in range(0, len(ids), ID_CHUNK_SIZE):
+            chunk = ids[start:start + ID_CHUNK_SIZE]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self._connection().execute(f"SELECT {SUMMARY_COLUMNS} FROM resumes WHERE id IN ({placeholders})", chunk)
+            summaries.update((row[0], _summary_from_row(row)) for row in rows)
+        return summaries
+
+    def _stored_documents(self, conn: sqlite3.Connection):
+        """Yield (resume id, structured record, raw text) for every stored resume, reading in batches"""
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                "SELECT d.resume_id, d.data, t.raw_text FROM resume_details d "
+                "LEFT JOIN resume_texts t ON t.resume_id = d.resume_id "
+                "WHERE d.resume_id > ? ORDER BY d.resume_id LIMIT ?", (last_id, COMPACT_BATCH_SIZE),
+            ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            for resume_id, data, raw_text in rows:
+                yield resume_id, json.loads(data), decode_raw_text(raw_text)
+
+    def skill_frequencies(self) -> list:
+        """Return (normalized skill, label, resume count) tuples, most popular first"""
+        self.skill_index.refresh(self._connection())
+        return self.skill_index.skills_by_frequency()
+
+    def all_skills(self) -> list:
+        """Return the display label of every indexed skill, sorted alphabetically"""
+        return sorted(label for _, label, _ in self.skill_frequencies())
+
+    @timed("store_load")
+    def get_resume(self, filename: str, include_raw_text: bool = False) -> dict | None:
+        """
+        Load the full structured record for one resume.
+
+        Args:
+            filename: Record name as returned in '__filename'
+            include_raw_text: Also load the raw text from the separate text table
+
+        Returns:
+            dict: Structured resume data, or None if no such record exists
+        """
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT r.id, d.data FROM resumes r JOIN resume_details d ON d.resume_id = r.id WHERE r.filename = ?",
+            (filename,),
+        ).fetchone()
+        if row is None:
+            return None
+        resume_data = json.loads(row[1])
+        resume_data['__filename'] = filename
+        if include_raw_text:
+            resume_data['raw_text'] = self.get_raw_text(row[0])
+        return resume_data
+
+    def get_raw_text(self, resume_id: int) -> str:
+        """Load the raw text of a resume by row id"""
+        row = self._connection().execute(
+            "SELECT raw_text FROM resume_texts WHERE resume_id = ?", (resume_id,)
+        ).fetchone()
+        return decode_raw_text(row[0]) if row else ''
+
+    def count(self) -> int:
+        """Return the number of stored resumes"""
+        return self._connection().execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    # Metadata
+
+    def data_version(self) -> int:
+        """Return a counter bumped by every save, in any process; use it to key caches of store reads"""
+        return int(self.get_meta(DATA_VERSION_KEY) or 0)
+
+    @staticmethod
+    def _bump_data_version(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, "
+            "COALESCE((SELECT CAST(value AS INTEGER) FROM meta WHERE key = ?), 0) + 1)",
+            (DATA_VERSION_KEY, DATA_VERSION_KEY),
+        )
+
+    def get_meta(self, key: str) -> str | None:
+        row = self._connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        conn = self._connection()
+        with self._write_lock, conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_resume_store() -> ResumeStore:
+    """
+    Return the process-wide store, creating it on first use.
+
+    Legacy JSON files in DATA_DIR are imported the first time the store is created.
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            store = ResumeStore()
+            if store.get_meta('json_imported_at') is None:
+                store.import_json_directory()
+            _default_store = store
+    return _default_store
+
+if __name__ == "__main__":
+    # One-shot conversion: import legacy JSON records (e.g. after copying them into resumes_data/)
+    # and rewrite records stored in the older layout compactly
+    store = get_resume_store()
+    count = store.import_json_directory()
+    print(f"Imported {count} resume(s) into {DB_PATH}")
+    result = store.compact()
+    print(f"Compacted {result['details']} record(s) and {result['texts']} raw text(s): "
+          f"{result['bytes_before'] / 1e6:.1f} MB -> {result['bytes_after'] / 1e6:.1f} MB")
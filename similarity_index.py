@@ -0,0 +1,381 @@
+"""
+Module for the TF-IDF similarity index used to rank saved resumes against a job description
+"""
+import re
+import zlib
+import sqlite3
+import threading
+from collections import Counter
+
+import numpy as np
+
+from skill_index import normalize_skill
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resume_vectors (
+    resume_id INTEGER PRIMARY KEY REFERENCES resumes(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    features BLOB NOT NULL,
+    weights BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_resume_vectors_seq ON resume_vectors(seq);
+"""
+
+VERSION_KEY = 'similarity_index_version'
+
+# Terms and skills are hashed into 2**FEATURE_BITS feature columns, so the vocabulary never has to be stored
+FEATURE_BITS = 20
+FEATURE_COUNT = 1 << FEATURE_BITS
+# Highest-frequency terms kept per resume; skills are always kept
+MAX_TERMS_PER_DOCUMENT = 150
+# Highest-weighted terms of a job description used for scoring
+MAX_QUERY_TERMS = 64
+# Term frequency given to every listed skill, so skills outweigh a word used once or twice
+SKILL_WEIGHT = 3.0
+# Longest skill phrase (in words) recognized in a job description
+MAX_SKILL_WORDS = 3
+# Unmerged entries tolerated before they are merged into the feature-sorted arrays
+MERGE_THRESHOLD = 250_000
+# Corpus growth after which every document norm is recomputed with the current IDF
+NORM_REFRESH_RATIO = 0.1
+# Resumes vectorized per batch when the index is built for an existing store
+REBUILD_BATCH_SIZE = 500
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+STOP_WORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the their this to
+was were will with you your we us i me my he she they them not but if so than then into over
+""".split())
+
+def tokenize(text: str) -> list:
+    """Lowercase word tokens of a text, without stop words and single letters"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 1 and token not in STOP_WORDS]
+
+def feature_id(namespace: str, token: str) -> int:
+    return zlib.crc32(f"{namespace}:{token}".encode('utf-8')) & (FEATURE_COUNT - 1)
+
+def document_text(structured: dict, raw_text: str) -> str:
+    """Text indexed for a resume: its raw text followed by its work-experience roles and descriptions"""
+    parts = [raw_text or '']
+    for job in structured.get('work_experience') or []:
+        if isinstance(job, dict):
+            parts.extend(str(job.get(field) or '') for field in ('role', 'description'))
+    return "\n".join(parts)
+
+def skills_in_text(text: str, known_skill) -> list:
+    """
+    Find known skills mentioned in free text, such as a job description.
+
+    Args:
+        text: Text to scan
+        known_skill: Predicate telling whether a normalized phrase is an indexed skill
+
+    Returns:
+        list: Normalized skills found, in order of first mention
+    """
+    words = normalize_skill(re.sub(r"[^\w+#.\s-]", " ", text)).split()
+    found = {}
+    for start in range(len(words)):
+        for size in range(1, MAX_SKILL_WORDS + 1):
+            phrase = " ".join(words[start:start + size]).lstrip(",-").rstrip(".,-")
+            if start + size <= len(words) and phrase and known_skill(phrase):
+                found.setdefault(phrase, None)
+    return list(found)
+
+def vectorize(text: str, skills: list) -> tuple:
+    """
+    Turn a text and its skills into a sparse term-frequency vector.
+
+    Terms get a sublinear frequency (1 + log count) and only the MAX_TERMS_PER_DOCUMENT most
+    frequent are kept; every skill gets SKILL_WEIGHT. Features colliding in the hash space
+    are summed. IDF is applied at query time, so stored vectors stay valid as the corpus grows.
+
+    Returns:
+        tuple: (sorted uint32 feature ids, float32 weights)
+    """
+    counts = Counter(tokenize(text))
+    features = [feature_id('t', term) for term, _ in counts.most_common(MAX_TERMS_PER_DOCUMENT)]
+    weights = [1.0 + np.log(count) for _, count in counts.most_common(MAX_TERMS_PER_DOCUMENT)]
+    for skill in {normalize_skill(skill) for skill in skills} - {''}:
+        features.append(feature_id('s', skill))
+        weights.append(SKILL_WEIGHT)
+    if not features:
+        return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.float32)
+    unique, inverse = np.unique(np.asarray(features, dtype=np.uint32), return_inverse=True)
+    return unique, np.bincount(inverse, weights=weights).astype(np.float32)
+
+class SimilarityIndex:
+    """
+    Sparse TF-IDF index scoring every saved resume against a query vector in one pass.
+
+    Document vectors are persisted in the `resume_vectors` table and held in memory as a
+    hashed-feature matrix in compressed sparse column form: for each feature, the resume
+    ids using it and their term weights. A query only touches the columns of its own
+    features and accumulates cosine scores for all resumes with np.bincount. Newly saved
+    vectors go to a small unmerged buffer that is scanned linearly and merged into the
+    sorted arrays once it reaches MERGE_THRESHOLD entries. Document frequencies are
+    updated on every save; document norms are computed with the IDF current at save time
+    and all recomputed whenever the corpus has grown by NORM_REFRESH_RATIO. Each save
+    bumps the index version in the `meta` table and stamps its row with it, so other
+    processes load just the rows changed since their last refresh.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._indptr = np.zeros(FEATURE_COUNT + 1, dtype=np.int64)
+        self._docs = np.zeros(0, dtype=np.int32)
+        self._weights = np.zeros(0, dtype=np.float32)
+        self._pending = {}
+        self._pending_size = 0
+        self._pending_arrays = None
+        self._df = np.zeros(FEATURE_COUNT, dtype=np.int32)
+        self._present = np.zeros(0, dtype=bool)
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._doc_count = 0
+        self._norm_doc_count = 0
+
+    # Loading
+
+    def ensure_schema(self, conn: sqlite3.Connection) -> None:
+        conn.executescript(SCHEMA)
+
+    def stored_version(self, conn: sqlite3.Connection) -> int | None:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (VERSION_KEY,)).fetchone()
+        return int(row[0]) if row else None
+
+    def refresh(self, conn: sqlite3.Connection) -> None:
+        """Load the vectors saved since the last refresh, in this or any other process"""
+        version = self.stored_version(conn)
+        if version is None or version == self._version:
+            return
+        with self._lock:
+            if self._version is None:
+                rows = conn.execute("SELECT resume_id, features, weights FROM resume_vectors").fetchall()
+                self._load_all(rows)
+            else:
+                rows = conn.execute(
+                    "SELECT resume_id, features, weights FROM resume_vectors WHERE seq > ?", (self._version,)
+                ).fetchall()
+                for resume_id, features, weights in rows:
+                    self._apply(resume_id, *self._decode(features, weights))
+            self._version = version
+
+    def rebuild(self, conn: sqlite3.Connection, documents) -> None:
+        """
+        Vectorize every resume and replace the persisted vectors, committing unless a transaction is open.
+
+        Args:
+            conn: Store connection
+            documents: Iterable of (resume id, document text, skills) for every saved resume
+        """
+        owns_transaction = not conn.in_transaction
+        with self._lock:
+            conn.execute("DELETE FROM resume_vectors")
+            version = self._bump_version(conn)
+            rows = []
+            batch = []
+            for resume_id, text, skills in documents:
+                features, weights = vectorize(text, skills)
+                rows.append((resume_id, features, weights))
+                batch.append((resume_id, version, features.tobytes(), weights.tobytes()))
+                if len(batch) >= REBUILD_BATCH_SIZE:
+                    conn.executemany("INSERT INTO resume_vectors (resume_id, seq, features, weights) VALUES (?, ?, ?, ?)", batch)
+                    batch = []
+            conn.executemany("INSERT INTO resume_vectors (resume_id, seq, features, weights) VALUES (?, ?, ?, ?)", batch)
+            self._load_all([(resume_id, features.tobytes(), weights.tobytes()) for resume_id, features, weights in rows])
+            self._version = version
+        if owns_transaction:
+            conn.commit()
+
+    # Updates
+
+    def update(self, conn: sqlite3.Connection, resume_id: int, features: np.ndarray, weights: np.ndarray) -> None:
+        """
+        Store the vector of one saved resume, replacing any previous one.
+
+        Must be called inside the caller's write transaction after refresh(); call
+        invalidate() if that transaction is rolled back.
+        """
+        with self._lock:
+            version = self._bump_version(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO resume_vectors (resume_id, seq, features, weights) VALUES (?, ?, ?, ?)",
+                (resume_id, version, features.tobytes(), weights.tobytes()),
+            )
+            self._apply(resume_id, features, weights)
+            self._version = version
+
+    def invalidate(self) -> None:
+        """Force the next refresh() to reload every vector from the database"""
+        with self._lock:
+            self._version = None
+            self._reset()
+
+    # Queries
+
+    def query(self, features: np.ndarray, weights: np.ndarray, limit: int = 10, exclude: int | None = None) -> list:
+        """
+        Rank resumes by cosine similarity of their TF-IDF vectors to a query vector.
+
+        Args:
+            features: Sorted feature ids of the query, as returned by vectorize()
+            weights: Term weights of the query
+            limit: Number of resumes to return
+            exclude: Resume id left out of the ranking, e.g. the reference resume itself
+
+        Returns:
+            list: (resume id, score) tuples with positive scores, best first
+        """
+        with self._lock:
+            if not self._doc_count or not len(features):
+                return []
+            query = weights * self._idf(features)
+            if len(query) > MAX_QUERY_TERMS:
+                keep = np.sort(np.argpartition(-query, MAX_QUERY_TERMS)[:MAX_QUERY_TERMS])
+                features, query = features[keep], query[keep]
+            query = query * self._idf(features) / np.linalg.norm(query)
+
+            docs = [self._docs[self._indptr[f]:self._indptr[f + 1]] for f in features]
+            contributions = [self._weights[self._indptr[f]:self._indptr[f + 1]] * q for f, q in zip(features, query)]
+            pending_docs, pending_features, pending_weights = self._pending_entries()
+            if len(pending_features):
+                positions = np.minimum(np.searchsorted(features, pending_features), len(features) - 1)
+                matched = features[positions] == pending_features
+                docs.append(pending_docs[matched])
+                contributions.append(pending_weights[matched] * query[positions[matched]])
+            scores = np.bincount(np.concatenate(docs), weights=np.concatenate(contributions), minlength=len(self._norms))
+            norms = self._norms
+
+        scores = np.divide(scores, norms, out=np.zeros(len(scores)), where=norms > 0)
+        if exclude is not None and exclude < len(scores):
+            scores[exclude] = 0
+        limit = min(limit, np.count_nonzero(scores > 0))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(resume_id), float(scores[resume_id])) for resume_id in top]
+
+    def stored_vector(self, conn: sqlite3.Connection, resume_id: int) -> tuple | None:
+        """Return the persisted (features, weights) of a resume, or None if it has none"""
+        row = conn.execute("SELECT features, weights FROM resume_vectors WHERE resume_id = ?", (resume_id,)).fetchone()
+        return self._decode(*row) if row else None
+
+    # Helpers (callers hold self._lock)
+
+    def _idf(self, features: np.ndarray) -> np.ndarray:
+        return (np.log((1 + self._doc_count) / (1 + self._df[features])) + 1).astype(np.float32)
+
+    def _load_all(self, rows: list) -> None:
+        """Replace the in-memory matrix with the given (resume id, features, weights) rows"""
+        self._reset()
+        if not rows:
+            return
+        vectors = [self._decode(features, weights) for _, features, weights in rows]
+        ids = np.asarray([resume_id for resume_id, _, _ in rows], dtype=np.int32)
+        lengths = np.fromiter((len(features) for features, _ in vectors), dtype=np.int64, count=len(vectors))
+        features = np.concatenate([features for features, _ in vectors])
+        weights = np.concatenate([weights for _, weights in vectors])
+        self._grow(int(ids.max()))
+        self._present[ids] = True
+        self._doc_count = len(ids)
+        self._df = np.bincount(features, minlength=FEATURE_COUNT).astype(np.int32)
+        self._build_columns(np.repeat(ids, lengths), features, weights)
+        self._refresh_norms()
+
+    def _apply(self, resume_id: int, features: np.ndarray, weights: np.ndarray) -> None:
+        """Insert or replace one document vector"""
+        self._grow(resume_id)
+        if self._present[resume_id]:
+            self._remove(resume_id)
+        self._present[resume_id] = True
+        self._doc_count += 1
+        np.add.at(self._df, features, 1)
+        self._pending[resume_id] = (features, weights)
+        self._pending_size += len(features)
+        self._pending_arrays = None
+        self._norms[resume_id] = np.linalg.norm(weights * self._idf(features)) if len(features) else 0
+        if self._pending_size >= MERGE_THRESHOLD:
+            self._merge()
+        if self._doc_count > self._norm_doc_count * (1 + NORM_REFRESH_RATIO):
+            self._refresh_norms()
+
+    def _remove(self, resume_id: int) -> None:
+        pending = self._pending.pop(resume_id, None)
+        if pending is not None:
+            np.subtract.at(self._df, pending[0], 1)
+            self._pending_size -= len(pending[0])
+            self._pending_arrays = None
+        else:
+            positions = np.flatnonzero((self._docs == resume_id) & (self._weights != 0))
+            np.subtract.at(self._df, np.searchsorted(self._indptr, positions, side='right') - 1, 1)
+            self._weights[positions] = 0
+        self._present[resume_id] = False
+        self._norms[resume_id] = 0
+        self._doc_count -= 1
+
+    def _pending_entries(self) -> tuple:
+        """(doc ids, features, weights) of the unmerged vectors, concatenated"""
+        if self._pending_arrays is None:
+            if self._pending:
+                vectors = list(self._pending.items())
+                self._pending_arrays = (
+                    np.repeat(np.asarray([resume_id for resume_id, _ in vectors], dtype=np.int32),
+                              [len(features) for _, (features, _) in vectors]),
+                    np.concatenate([features for _, (features, _) in vectors]),
+                    np.concatenate([weights for _, (_, weights) in vectors]),
+                )
+            else:
+                self._pending_arrays = (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.uint32),
+                                        np.zeros(0, dtype=np.float32))
+        return self._pending_arrays
+
+    def _merge(self) -> None:
+        """Merge the unmerged vectors into the feature-sorted arrays, dropping removed entries"""
+        pending_docs, pending_features, pending_weights = self._pending_entries()
+        column_features = np.repeat(np.arange(FEATURE_COUNT, dtype=np.uint32), np.diff(self._indptr))
+        kept = self._weights != 0
+        self._build_columns(
+            np.concatenate([self._docs[kept], pending_docs]),
+            np.concatenate([column_features[kept], pending_features]),
+            np.concatenate([self._weights[kept], pending_weights]),
+        )
+        self._pending = {}
+        self._pending_size = 0
+        self._pending_arrays = None
+
+    def _build_columns(self, docs: np.ndarray, features: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(features, kind='stable')
+        self._docs = docs[order].astype(np.int32)
+        self._weights = weights[order].astype(np.float32)
+        self._indptr = np.concatenate(([0], np.cumsum(np.bincount(features, minlength=FEATURE_COUNT))))
+
+    def _refresh_norms(self) -> None:
+        """Recompute every document norm with the current IDF"""
+        if self._pending:
+            self._merge()
+        column_features = np.repeat(np.arange(FEATURE_COUNT, dtype=np.uint32), np.diff(self._indptr))
+        weighted = self._weights * self._idf(column_features)
+        self._norms = np.sqrt(np.bincount(self._docs, weights=weighted * weighted, minlength=len(self._norms))).astype(np.float32)
+        self._norm_doc_count = self._doc_count
+
+    def _grow(self, resume_id: int) -> None:
+        if resume_id >= len(self._present):
+            size = max(resume_id + 1, 2 * len(self._present), 1024)
+            self._present = np.concatenate([self._present, np.zeros(size - len(self._present), dtype=bool)])
+            self._norms = np.concatenate([self._norms, np.zeros(size - len(self._norms), dtype=np.float32)])
+
+    @staticmethod
+    def _decode(features: bytes, weights: bytes) -> tuple:
+        return np.frombuffer(features, dtype=np.uint32), np.frombuffer(weights, dtype=np.float32)
+
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (VERSION_KEY,)).fetchone()
+        version = int(row[0]) + 1 if row else 1
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (VERSION_KEY, str(version)))
+        return version
@@ -0,0 +1,195 @@
+"""
+Module for the persistent inverted skill index used by the saved-resume filter
+"""
+import re
+import sqlite3
+import threading
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS skill_postings (
+    skill TEXT PRIMARY KEY,
+    label TEXT NOT NULL,
+    doc_count INTEGER NOT NULL,
+    bitmap BLOB NOT NULL
+);
+"""
+
+VERSION_KEY = 'skill_index_version'
+
+def normalize_skill(skill: str) -> str:
+    """Normalize a skill for indexing: lowercase, trimmed and with collapsed whitespace"""
+    return re.sub(r'\s+', ' ', str(skill)).strip().lower()
+
+def bitmap_to_ids(bitmap: int) -> list:
+    """Decode a bitmap into the sorted list of resume ids whose bits are set"""
+    if not bitmap:
+        return []
+    raw = np.frombuffer(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder='little')).tolist()
+
+class SkillIndex:
+    """
+    Inverted index from normalized skill to the set of resume ids listing it.
+
+    Postings are Python integers used as bitmaps (bit N set means resume id N has the
+    skill), so multi-skill AND/OR filters are single bitwise operations. Each posting
+    also keeps its document count and the most recently saved spelling as a display
+    label. Postings are persisted in the `skill_postings` table, updated incrementally
+    for the skills of each saved resume, and reloaded when another process bumps the
+    index version in the `meta` table.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._labels = {}
+        self._counts = {}
+        self._version = None
+
+    # Loading
+
+    def ensure_schema(self, conn: sqlite3.Connection) -> None:
+        conn.executescript(SCHEMA)
+
+    def _stored_version(self, conn: sqlite3.Connection) -> str | None:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (VERSION_KEY,)).fetchone()
+        return row[0] if row else None
+
+    def refresh(self, conn: sqlite3.Connection) -> None:
+        """Reload postings if the persisted index changed since they were last loaded"""
+        version = self._stored_version(conn)
+        if version is None:
+            self.rebuild(conn)
+            return
+        if version == self._version:
+            return
+        with self._lock:
+            rows = conn.execute("SELECT skill, label, doc_count, bitmap FROM skill_postings").fetchall()
+            self._postings = {skill: int.from_bytes(bitmap, 'little') for skill, _, _, bitmap in rows}
+            self._labels = {skill: label for skill, label, _, _ in rows}
+            self._counts = {skill: count for skill, _, count, _ in rows}
+            self._version = version
+
+    def rebuild(self, conn: sqlite3.Connection) -> None:
+        """Rebuild every posting from the resume_skills table, committing unless a transaction is open"""
+        owns_transaction = not conn.in_transaction
+        postings = {}
+        labels = {}
+        for skill, resume_id in conn.execute("SELECT skill, resume_id FROM resume_skills ORDER BY resume_id"):
+            key = normalize_skill(skill)
+            if not key:
+                continue
+            postings[key] = postings.get(key, 0) | (1 << resume_id)
+            labels[key] = skill
+        with self._lock:
+            conn.execute("DELETE FROM skill_postings")
+            conn.executemany(
+                "INSERT INTO skill_postings (skill, label, doc_count, bitmap) VALUES (?, ?, ?, ?)",
+                [(key, labels[key], bitmap.bit_count(), self._encode(bitmap)) for key, bitmap in postings.items()],
+            )
+            self._version = self._bump_version(conn)
+            self._postings = postings
+            self._labels = labels
+            self._counts = {key: bitmap.bit_count() for key, bitmap in postings.items()}
+        if owns_transaction:
+            conn.commit()
+
+    # Updates
+
+    def update(self, conn: sqlite3.Connection, resume_id: int, old_skills: list, new_skills: list) -> None:
+        """
+        Move one resume from the postings of its old skills to those of its new skills.
+
+        Must be called inside the caller's write transaction; call invalidate() if that
+        transaction is rolled back.
+
+        Args:
+            conn: Connection holding the open write transaction
+            resume_id: Row id of the saved resume
+            old_skills: Skills previously stored for the resume
+            new_skills: Skills being stored now
+        """
+        bit = 1 << resume_id
+        new_labels = {}
+        for skill in new_skills:
+            key = normalize_skill(skill)
+            if key:
+                new_labels[key] = str(skill)
+        old_keys = {normalize_skill(skill) for skill in old_skills} - {''}
+        touched = old_keys | set(new_labels)
+
+        with self._lock:
+            rows = []
+            for key in touched:
+                bitmap = self._postings.get(key, 0)
+                bitmap = (bitmap | bit) if key in new_labels else (bitmap & ~bit)
+                label = new_labels.get(key) or self._labels.get(key, key)
+                if bitmap:
+                    self._postings[key] = bitmap
+                    self._labels[key] = label
+                    self._counts[key] = bitmap.bit_count()
+                    rows.append((key, label, self._counts[key], self._encode(bitmap)))
+                else:
+                    self._postings.pop(key, None)
+                    self._labels.pop(key, None)
+                    self._counts.pop(key, None)
+                    conn.execute("DELETE FROM skill_postings WHERE skill = ?", (key,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO skill_postings (skill, label, doc_count, bitmap) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._version = self._bump_version(conn)
+
+    def invalidate(self) -> None:
+        """Force the next refresh() to reload postings from the database"""
+        with self._lock:
+            self._version = None
+
+    # Queries
+
+    def query(self, skills: list, match_all: bool = True) -> int:
+        """
+        Combine the postings of the given skills.
+
+        Args:
+            skills: Skills to filter by (normalized or display spelling)
+            match_all: AND the postings when True, OR them when False
+
+        Returns:
+            int: Bitmap of matching resume ids
+        """
+        bitmaps = [self._postings.get(normalize_skill(skill), 0) for skill in skills]
+        if not bitmaps:
+            return 0
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            result = (result & bitmap) if match_all else (result | bitmap)
+        return result
+
+    def skills_by_frequency(self) -> list:
+        """Return (normalized skill, label, resume count) tuples, most popular first"""
+        ranked = sorted(self._counts.items(), key=lambda item: (-item[1], item[0]))
+        return [(key, self._labels[key], count) for key, count in ranked]
+
+    def label(self, skill: str) -> str:
+        """Return the display spelling for a normalized skill"""
+        return self._labels.get(skill, skill)
+
+    def count(self, skill: str) -> int:
+        """Return the number of resumes listing a normalized skill"""
+        return self._counts.get(skill, 0)
+
+    # Helpers
+
+    @staticmethod
+    def _encode(bitmap: int) -> bytes:
+        return bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection) -> str:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (VERSION_KEY,)).fetchone()
+        version = str(int(row[0]) + 1 if row else 1)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (VERSION_KEY, version))
+        return version
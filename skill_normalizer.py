@@ -0,0 +1,329 @@
+"""
+Module for normalizing free-form skills to a canonical vocabulary
+"""
+import os
+import re
+import sys
+import json
+import difflib
+from collections import deque
+
+# Canonical skill -> aliases (matched case-insensitively after normalization). Only aliases that
+# cannot mean anything else belong here: backfill() rewrites stored records, so abbreviations such
+# as "tf", "cv" or "node" and related but distinct skills such as Scrum are left as written
+SKILL_ALIASES = {
+    "Python": ["python", "python programming", "python language", "py"],
+    "Java": ["java", "core java", "java programming"],
+    "JavaScript": ["javascript", "js", "java script", "ecmascript", "es6"],
+    "TypeScript": ["typescript", "ts"],
+    "C": ["c", "c language", "c programming"],
+    "C++": ["c++", "cpp", "c plus plus"],
+    "C#": ["c#", "c sharp", "csharp"],
+    ".NET": [".net", "dotnet", "dot net", ".net core", ".net framework"],
+    "ASP.NET": ["asp.net", "aspnet", "asp .net", "asp.net core", "asp.net mvc"],
+    "Go": ["go", "golang"],
+    "Rust": ["rust"],
+    "R": ["r", "r programming", "r language"],
+    "SQL": ["sql", "structured query language"],
+    "PostgreSQL": ["postgresql", "postgres", "psql"],
+    "MySQL": ["mysql"],
+    "MongoDB": ["mongodb", "mongo"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3"],
+    "React": ["react", "reactjs", "react.js", "react js"],
+    "Angular": ["angular", "angularjs", "angular.js"],
+    "Vue.js": ["vue", "vuejs", "vue.js"],
+    "Node.js": ["nodejs", "node.js", "node js", "node.js runtime"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi", "fast api"],
+    "REST APIs": ["rest", "rest api", "rest apis", "restful", "restful api", "restful apis"],
+    "GraphQL": ["graphql"],
+    "Machine Learning": ["machine learning", "ml"],
+    "Deep Learning": ["deep learning"],
+    "Natural Language Processing": ["natural language processing", "nlp"],
+    "Computer Vision": ["computer vision"],
+    "Generative AI": ["generative ai", "genai", "gen ai"],
+    "Large Language Models": ["large language models", "large language model", "llm", "llms"],
+    "Retrieval-Augmented Generation": ["retrieval augmented generation", "retrieval-augmented generation", "rag"],
+    "TensorFlow": ["tensorflow", "tensor flow"],
+    "PyTorch": ["pytorch", "torch"],
+    "Keras": ["keras"],
+    "Scikit-Learn": ["scikit-learn", "scikit learn", "sklearn", "scikit"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "LangChain": ["langchain", "lang chain"],
+    "LlamaIndex": ["llamaindex", "llama index"],
+    "Transformers": ["transformers", "hugging face transformers", "huggingface transformers"],
+    "Hugging Face": ["hugging face", "huggingface"],
+    "Streamlit": ["streamlit"],
+    "Amazon Web Services": ["amazon web services", "aws"],
+    "Google Cloud Platform": ["google cloud platform", "google cloud", "gcp"],
+    "Microsoft Azure": ["microsoft azure", "azure"],
+    "Docker": ["docker", "docker containers"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Git": ["git", "git version control"],
+    "GitHub": ["github"],
+    "Linux": ["linux", "unix/linux"],
+    "CI/CD": ["ci/cd", "ci cd", "cicd", "continuous integration", "continuous delivery"],
+    "Apache Spark": ["apache spark", "spark", "pyspark"],
+    "Hadoop": ["hadoop", "apache hadoop"],
+    "Tableau": ["tableau"],
+    "Power BI": ["power bi", "powerbi"],
+    "Microsoft Excel": ["microsoft excel", "ms excel", "excel"],
+    "Data Analysis": ["data analysis", "data analytics"],
+    "Data Visualization": ["data visualization", "data visualisation"],
+    "Agile": ["agile", "agile methodology", "agile methodologies"],
+    "Communication": ["communication", "communication skills"],
+    "Leadership": ["leadership", "team leadership"],
+    "Teamwork": ["teamwork", "team work"],
+    "Problem Solving": ["problem solving", "problem-solving"],
+}
+
+# Optional JSON file ({"Canonical": ["alias", ...]}) merged over the built-in table
+ALIASES_PATH = os.getenv("SKILL_ALIASES_PATH", "")
+
+# Words that do not change which skill a phrase refers to
+FILLER_TOKENS = {
+    "programming", "language", "languages", "framework", "frameworks", "library", "libraries",
+    "basics", "basic", "advanced", "proficient", "proficiency", "in", "with", "using",
+    "knowledge", "of", "experience", "skills", "skill", "tools", "and",
+}
+
+FUZZY_MIN_LENGTH = 5
+FUZZY_CUTOFF = 0.88
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#./-]+")
+_PAREN_RE = re.compile(r"\(([^)]*)\)")
+_VERSION_RE = re.compile(r"^(.*?[a-z+#])\s*v?\d+(?:\.(?:\d+|x))*$")
+
+def _strip_separators(text: str) -> str:
+    """
+    Trim whitespace, quotes and trailing separators, keeping the dots of names like ".NET" and "Node.js".
+
+    A trailing "." is only removed when the last word has no other dot: "Python." but not "ASP.NET".
+    Text made only of punctuation is dropped.
+    """
+    if not re.search(r"[\w+#]", text):
+        return ""
+    text = text.strip(" \t\n'\"").rstrip(",;:").rstrip()
+    words = text.rsplit(" ", 1)
+    if text.endswith(".") and "." not in words[-1][:-1]:
+        text = text[:-1].rstrip()
+    return text
+
+def _normalize(text: str) -> str:
+    """Lowercase, unify quotes/dashes and collapse whitespace"""
+    text = str(text).lower().replace("–", "-").replace("—", "-").replace("’", "'")
+    return _strip_separators(re.sub(r"\s+", " ", text))
+
+def _tokens(text: str) -> tuple:
+    return tuple(_TOKEN_RE.findall(text))
+
+class _TokenAutomaton:
+    """Aho-Corasick automaton over token sequences, reporting (start, end, canonical) matches"""
+
+    def __init__(self, patterns: dict):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for tokens, canonical in patterns.items():
+            state = 0
+            for token in tokens:
+                if token not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][token] = len(self._goto) - 1
+                state = self._goto[state][token]
+            self._output[state].append((len(tokens), canonical))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, tokens: tuple) -> list:
+        matches = []
+        state = 0
+        for end, token in enumerate(tokens, start=1):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for length, canonical in self._output[state]:
+                matches.append((end - length, end, canonical))
+        return matches
+
+class SkillNormalizer:
+    """
+    Map free-form skill strings onto a canonical vocabulary without calling the LLM.
+
+    Lookup order for each skill:
+      1. exact alias match after normalization (also tried without version suffixes and
+         parenthetical qualifiers, e.g. "python3" or "Python (Programming)")
+      2. token-level Aho-Corasick match where a single alias covers every non-filler token,
+         e.g. "Proficient in Python"
+      3. fuzzy match with difflib against aliases sharing the first character and a similar
+         length, for typos such as "Pytorh"
+    Unmatched skills are kept with cleaned whitespace. Results are memoized, so bulk
+    normalization over thousands of skills only pays for each distinct string once.
+    """
+
+    def __init__(self, aliases: dict | None = None):
+        aliases = dict(SKILL_ALIASES if aliases is None else aliases)
+        self._lookup = {}
+        for canonical, names in aliases.items():
+            for name in [canonical, *names]:
+                self._lookup.setdefault(_normalize(name), canonical)
+        self._automaton = _TokenAutomaton({_tokens(alias): canonical for alias, canonical in self._lookup.items() if _tokens(alias)})
+        # Fuzzy candidates are bucketed by first character to keep the fallback cheap in bulk
+        self._fuzzy_buckets = {}
+        for alias in sorted(self._lookup):
+            if len(alias) >= FUZZY_MIN_LENGTH:
+                self._fuzzy_buckets.setdefault(alias[0], []).append(alias)
+        self._memo = {}
+
+    def canonicalize(self, skill: str) -> str:
+        """
+        Return the canonical name for a skill, or the cleaned input if it is unknown.
+
+        Args:
+            skill: Skill string as extracted from a resume
+
+        Returns:
+            str: Canonical skill name
+        """
+        if skill in self._memo:
+            return self._memo[skill]
+        cleaned = _strip_separators(re.sub(r"\s+", " ", str(skill)))
+        result = self._match(_normalize(cleaned)) or cleaned
+        self._memo[skill] = result
+        return result
+
+    def normalize_skills(self, skills: list) -> list:
+        """Canonicalize a list of skills, dropping empties and duplicates while keeping order"""
+        seen = set()
+        normalized = []
+        for skill in skills or []:
+            canonical = self.canonicalize(skill)
+            key = canonical.lower()
+            if canonical and key not in seen:
+                seen.add(key)
+                normalized.append(canonical)
+        return normalized
+
+    def _match(self, key: str) -> str | None:
+        if not key:
+            return None
+
+        candidates = [key]
+        inner = _PAREN_RE.findall(key)
+        outer = _normalize(_PAREN_RE.sub(" ", key))
+        if outer and outer != key:
+            candidates.append(outer)
+        candidates.extend(_normalize(part) for part in inner if _normalize(part))
+        for candidate in list(candidates):
+            version_match = _VERSION_RE.match(candidate)
+            if version_match:
+                candidates.append(version_match.group(1).strip())
+
+        for candidate in candidates:
+            if candidate in self._lookup:
+                return self._lookup[candidate]
+
+        for candidate in candidates:
+            tokens = _tokens(candidate)
+            content = [i for i, token in enumerate(tokens) if token not in FILLER_TOKENS]
+            if not content:
+                continue
+            for start, end, canonical in self._automaton.find(tokens):
+                if start <= content[0] and end > content[-1]:
+                    return canonical
+
+        if len(outer) >= FUZZY_MIN_LENGTH:
+            bucket = [alias for alias in self._fuzzy_buckets.get(outer[0], []) if abs(len(alias) - len(outer)) <= 2]
+            close = difflib.get_close_matches(outer, bucket, n=1, cutoff=FUZZY_CUTOFF)
+            if close:
+                return self._lookup[close[0]]
+        return None
+
+def _load_aliases() -> dict:
+    aliases = dict(SKILL_ALIASES)
+    if ALIASES_PATH:
+        try:
+            with open(ALIASES_PATH, 'r', encoding='utf-8') as f:
+                aliases.update(json.load(f))
+        except Exception as e:
+            print(f"Warning: Failed to load skill aliases from {ALIASES_PATH}: {str(e)}")
+    return aliases
+
+_default_normalizer = None
+
+def get_skill_normalizer() -> SkillNormalizer:
+    """Return the process-wide normalizer, compiling the alias table on first use"""
+    global _default_normalizer
+    if _default_normalizer is None:
+        _default_normalizer = SkillNormalizer(_load_aliases())
+    return _default_normalizer
+
+def normalize_resume_skills(resume_data: dict) -> dict:
+    """Return a copy of a resume record with its skills canonicalized"""
+    normalized = dict(resume_data)
+    normalized['skills'] = get_skill_normalizer().normalize_skills(resume_data.get('skills', []))
+    return normalized
+
+def backfill(data_dir: str = "resumes_data") -> dict:
+    """
+    Re-normalize the skills of every existing record.
+
+    Legacy JSON files in data_dir are rewritten in place and every record in the resume
+    store is re-saved, which also updates the skill index.
+
+    Args:
+        data_dir: Directory holding legacy "<name>_<uuid>.json" records
+
+    Returns:
+        dict: Number of JSON files and store records that changed
+    """
+    from resume_store import get_resume_store
+
+    changed = {'json_files': 0, 'store_records': 0}
+    for filename in sorted(os.listdir(data_dir)):
+        if not filename.endswith('.json'):
+            continue
+        path = os.path.join(data_dir, filename)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                resume_data = json.load(f)
+            normalized = normalize_resume_skills(resume_data)
+            if normalized['skills'] != resume_data.get('skills', []):
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(normalized, f, indent=2, ensure_ascii=False)
+                changed['json_files'] += 1
+        except Exception as e:
+            print(f"Warning: Failed to normalize {filename}: {str(e)}")
+
+    store = get_resume_store()
+    for summary in store.list_resumes():
+        resume_data = store.get_resume(summary['__filename'], include_raw_text=True)
+        normalized = normalize_resume_skills(resume_data)
+        if normalized['skills'] != resume_data.get('skills', []):
+            store.save(normalized, summary['__filename'], resume_data.get('raw_text', ''))
+            changed['store_records'] += 1
+    return changed
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--backfill"]:
+        result = backfill()
+        print(f"Normalized {result['json_files']} JSON file(s) and {result['store_records']} stored resume(s)")
+    else:
+        # Normalize skills given on the command line, one per argument
+        normalizer = get_skill_normalizer()
+        for raw_skill in sys.argv[1:]:
+            print(f"{raw_skill!r} -> {normalizer.canonicalize(raw_skill)!r}")
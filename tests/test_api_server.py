@@ -0,0 +1,145 @@
+import json
+import time
+
+import pytest
+from starlette.testclient import TestClient
+
+import api_server
+import job_queue
+import resume_store
+from job_queue import JobManager, JobStore
+from resume_store import ResumeStore
+
+RESUME = b"Jane Doe\njane@example.com\n\nExperience\nPython developer at Acme\n\nSkills\nPython, SQL\n"
+RECORD = {
+    "name": "Jane Doe", "email": "jane@example.com", "phone": "", "skills": ["Python", "SQL"],
+    "work_experience": [{"company": "Acme", "role": "Python developer", "dates": "2019 - 2023",
+                         "description": "Built data pipelines in Python"}],
+    "education": [], "certifications": [],
+}
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ResumeStore(str(tmp_path / "resumes.db"))
+    monkeypatch.setattr(resume_store, "_default_store", store)
+    return store
+
+@pytest.fixture
+def processed(store, monkeypatch):
+    calls = []
+
+    def process_document(filename, content, on_section=None):
+        calls.append(filename)
+        if b"fail" in content:
+            raise RuntimeError("model error")
+        record = filename.rsplit(".", 1)[0] + ".json"
+        store.save(RECORD, record, content.decode())
+        return {"status": "saved", "record": record}
+
+    monkeypatch.setattr(api_server, "process_document", process_document)
+    return calls
+
+@pytest.fixture
+def client():
+    return TestClient(api_server.app)
+
+def test_health(client):
+    assert client.get("/health").json() == {"status": "ok"}
+
+def test_extract_returns_the_saved_record(client, processed):
+    response = client.post("/extract", files={"file": ("jane.txt", RESUME, "text/plain")})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "saved"
+    assert body["resume"]["name"] == "Jane Doe"
+    assert processed == ["jane.txt"]
+
+def test_extract_rejects_unsupported_and_oversized_files(client, processed, monkeypatch):
+    response = client.post("/extract", files={"file": ("x.bin", b"\x00\x01\x02\x03", "application/octet-stream")})
+    assert response.status_code == 415
+    assert client.post("/extract", data={"file": "not a file"}).status_code == 400
+    monkeypatch.setattr(api_server, "MAX_FILE_BYTES", 10)
+    assert client.post("/extract", files={"file": ("jane.txt", RESUME, "text/plain")}).status_code == 413
+    assert processed == []
+
+def test_request_body_limit(processed):
+    client = TestClient(api_server.BodySizeLimitMiddleware(api_server.app.app, max_bytes=100))
+    response = client.post("/extract", files={"file": ("jane.txt", RESUME * 10, "text/plain")})
+    assert response.status_code == 413
+
+def test_batch_streams_one_line_per_document(client, processed):
+    files = [("files", (f"{name}.txt", content, "text/plain"))
+             for name, content in (("a", RESUME), ("b", RESUME + b"fail"))]
+    response = client.post("/extract/batch", files=files)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda line: line["index"])
+    assert [line["status"] for line in lines] == ["saved", "failed"]
+    assert lines[1]["error"] == "model error"
+
+def test_background_jobs_and_retry(client, store, processed, monkeypatch, tmp_path):
+    attempts = []
+
+    def handler(filename, content, on_section=None):
+        attempts.append(filename)
+        if len(attempts) == 1:
+            raise RuntimeError("model error")
+        return {"status": "saved", "record": None}
+
+    manager = JobManager(store=JobStore(str(tmp_path / "jobs.db")), workers=1, handler=handler)
+    monkeypatch.setattr(job_queue, "_default_manager", manager)
+    try:
+        response = client.post("/extract?background=true", files={"file": ("jane.txt", RESUME, "text/plain")})
+        assert response.status_code == 202
+        status_url = response.json()["status_url"]
+
+        def wait_for(status):
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                job = client.get(status_url).json()
+                if job["status"] == status:
+                    return job
+                time.sleep(0.02)
+            raise AssertionError(f"job did not reach {status}")
+
+        assert wait_for("failed")["error"] == "model error"
+        job_id = response.json()["job_id"]
+        assert client.post(f"/jobs/{job_id}/retry").status_code == 202
+        assert wait_for("done")["attempts"] == 2
+        assert client.post(f"/jobs/{job_id}/retry").status_code == 409
+        assert client.get("/jobs/missing").status_code == 404
+    finally:
+        manager.shutdown()
+
+def test_resumes_listing_filters_and_pagination(client, store):
+    for index in range(5):
+        store.save({**RECORD, "name": f"Candidate {index}", "skills": ["Python"] + (["Go"] if index % 2 else [])},
+                   f"candidate_{index}.json", f"Candidate {index} Python developer")
+    page = client.get("/resumes?limit=2&offset=1").json()
+    assert len(page["resumes"]) == 2 and page["offset"] == 1
+    go = client.get("/resumes", params=[("skill", "go"), ("skill", "python")]).json()["resumes"]
+    assert sorted(resume["name"] for resume in go) == ["Candidate 1", "Candidate 3"]
+    either = client.get("/resumes", params=[("skill", "go"), ("skill", "rust"), ("match", "any")]).json()
+    assert len(either["resumes"]) == 2
+    assert client.get("/resumes?limit=x").status_code == 400
+    assert client.get("/resumes/candidate_0.json").json()["name"] == "Candidate 0"
+    assert client.get("/resumes/missing.json").status_code == 404
+
+def test_similar_and_match(client, store):
+    store.save(RECORD, "jane.json", "Jane Doe Python developer building data pipelines")
+    store.save({**RECORD, "name": "John Roe", "skills": ["Java"], "work_experience": []},
+               "john.json", "John Roe Java developer building Android apps")
+    store.save({**RECORD, "name": "Ann Poe"}, "ann.json", "Ann Poe Python engineer building data pipelines")
+    similar = client.get("/resumes/jane.json/similar?limit=1").json()["resumes"]
+    assert [resume["__filename"] for resume in similar] == ["ann.json"]
+    assert client.get("/resumes/missing.json/similar").status_code == 404
+    ranked = client.post("/match", json={"job_description": "Java Android developer", "limit": 3}).json()["resumes"]
+    assert ranked[0]["__filename"] == "john.json"
+    assert client.post("/match", json={"limit": 3}).status_code == 400
+    assert client.post("/match", content=b"not json").status_code == 400
+
+def test_metrics_formats(client):
+    client.get("/resumes/missing.json")
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'resume_stage_seconds_count{stage="store_load"}' in response.text
+    assert any(key == "resume_stage_seconds" for key in client.get("/metrics?format=json").json())
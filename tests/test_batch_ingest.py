@@ -0,0 +1,66 @@
+import json
+import time
+
+import pytest
+
+import batch_ingest
+from benchmarks.corpus import build_pdf
+from extraction_cache import ExtractionCache
+
+RESUME_TEXT = "Jane Doe\njane@example.com\n\nExperience\nPython developer at Acme\n"
+
+@pytest.fixture
+def corpus(tmp_path):
+    source = tmp_path / "resumes"
+    (source / "nested").mkdir(parents=True)
+    (source / "a.txt").write_text(RESUME_TEXT)
+    (source / "nested" / "b.pdf").write_bytes(build_pdf([[("F1", 11, 72, 720, "John Smith - Experience")]]))
+    (source / "broken.pdf").write_bytes(b"\x00\x01 not a document")
+    (source / "notes.xyz").write_text("ignored")
+    return source
+
+@pytest.fixture
+def extracted(monkeypatch, tmp_path):
+    calls = []
+
+    def extract_and_save(document, content, text, cached, pdf_backend=None, on_section=None):
+        calls.append((document, text, pdf_backend))
+        return {"status": "saved", "record": document}
+
+    monkeypatch.setattr(batch_ingest, "extract_and_save", extract_and_save)
+    monkeypatch.setattr(batch_ingest, "get_extraction_cache", lambda: ExtractionCache(str(tmp_path / "cache")))
+    return calls
+
+def parse_forever(content, timeout):
+    time.sleep(60)
+
+def read_manifest(path):
+    with open(path, encoding="utf-8") as f:
+        return {entry["document"]: entry for entry in map(json.loads, f)}
+
+def test_ingest_parses_in_workers_and_checkpoints(corpus, extracted, tmp_path):
+    manifest = str(tmp_path / "manifest.jsonl")
+    counts = batch_ingest.ingest(str(corpus), manifest, parse_workers=2, llm_concurrency=2)
+    assert counts == {"saved": 2, "rejected": 1}
+    by_document = {document: (text, backend) for document, text, backend in extracted}
+    assert by_document[str(corpus / "a.txt")] == (RESUME_TEXT.strip(), "text")
+    text, backend = by_document[str(corpus / "nested" / "b.pdf")]
+    assert "John Smith" in text and backend in ("pypdf2", "pdfplumber")
+    assert read_manifest(manifest)[str(corpus / "broken.pdf")]["status"] == "rejected"
+
+    # A second run resumes from the manifest and has nothing left to do
+    assert batch_ingest.ingest(str(corpus), manifest, parse_workers=2) == {}
+    assert len(extracted) == 2
+
+def test_parse_deadline_is_enforced_by_the_pool(corpus, extracted, tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_ingest, "parse_document_bytes", parse_forever)
+    monkeypatch.setattr(batch_ingest, "DOCUMENT_TIMEOUT", 0.5)
+    monkeypatch.setattr(batch_ingest, "DEADLINE_POLL_SECONDS", 0.05)
+    manifest = str(tmp_path / "manifest.jsonl")
+    started = time.monotonic()
+    counts = batch_ingest.ingest(str(corpus), manifest, parse_workers=3)
+    # The stuck workers are terminated instead of holding up the run
+    assert time.monotonic() - started < 30
+    assert counts == {"failed": 3}
+    assert all("time budget" in entry["error"] for entry in read_manifest(manifest).values())
+    assert extracted == []
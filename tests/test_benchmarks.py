@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.corpus import generate_corpus, load_manifest
+from benchmarks.pdf_backends import token_f1
+from benchmarks.pipeline import compare, percentiles
+from benchmarks.recorded_backend import (RecordedBackend, RecordingBackend, load_recordings, prompt_key,
+                                         truth_responder)
+from gemini_client import Completion, GeminiError
+from pdf_parser import extract_text_from_pdf
+
+def test_corpus_is_reproducible(tmp_path):
+    first = generate_corpus(str(tmp_path / "a"), count=4, seed=7)
+    second = generate_corpus(str(tmp_path / "b"), count=4, seed=7)
+    assert first == second
+    for filename in first:
+        assert (tmp_path / "a" / filename).read_bytes() == (tmp_path / "b" / filename).read_bytes()
+    assert generate_corpus(str(tmp_path / "c"), count=4, seed=8) != first
+    assert load_manifest(str(tmp_path / "a")) == first
+    assert load_manifest(str(tmp_path / "missing")) == {}
+
+def test_corpus_documents_match_their_manifest(tmp_path):
+    manifest = generate_corpus(str(tmp_path), count=4)
+    assert {entry["layout"] for entry in manifest.values()} == {"single_column", "two_column", "table", "dense"}
+    for filename, entry in manifest.items():
+        pdf_bytes = (tmp_path / filename).read_bytes()
+        assert len(pdf_bytes) == entry["bytes"]
+        text = extract_text_from_pdf(pdf_bytes, max_pages=0, timeout=0)
+        assert entry["truth"]["email"] in text
+
+def test_recorded_backend_replays_and_falls_back():
+    recordings = {prompt_key("known"): {"response": "{}", "latency": 5.0}}
+    backend = RecordedBackend(recordings, fallback=lambda prompt: "fallback", latency_scale=0)
+    assert asyncio.run(backend.generate("known")).text == "{}"
+    assert asyncio.run(backend.generate("other")).text == "fallback"
+    assert (backend.hits, backend.misses) == (1, 1)
+    with pytest.raises(GeminiError):
+        asyncio.run(RecordedBackend(recordings, latency_scale=0).generate("other"))
+
+def test_recording_backend_writes_replayable_responses(tmp_path):
+    class Inner:
+        async def generate(self, prompt, timeout=None):
+            return Completion(f"answer to {prompt}", 3, 4)
+
+    path = str(tmp_path / "responses.jsonl")
+    recorder = RecordingBackend(Inner(), path)
+    asyncio.run(recorder.generate("question"))
+    replay = RecordedBackend(load_recordings(path), latency_scale=0)
+    completion = asyncio.run(replay.generate("question"))
+    assert (completion.text, completion.prompt_tokens, completion.response_tokens) == ("answer to question", 3, 4)
+
+def test_truth_responder_answers_by_email(tmp_path):
+    manifest = generate_corpus(str(tmp_path), count=2)
+    truth = next(iter(manifest.values()))["truth"]
+    respond = truth_responder(manifest)
+    answer = json.loads(respond(f"Text:\n{truth['name']}\n{truth['email']}\nReturn ONLY the JSON object"))
+    assert answer["is_valid_resume"] is True
+    assert answer["resume"]["name"] == truth["name"]
+    assert answer["resume"]["skills"] == truth["skills"]
+
+def test_percentiles_and_compare():
+    stats = percentiles([0.001 * n for n in range(1, 101)])
+    assert stats["count"] == 100
+    assert stats["p50_ms"] == pytest.approx(50)
+    assert stats["p99_ms"] == pytest.approx(99)
+    assert percentiles([]) == {"count": 0}
+    rows = compare({"scenarios": {"parse": {"p50_ms": 10, "label": "x"}}},
+                   {"scenarios": {"parse": {"p50_ms": 5}, "e2e": {"p50_ms": 1}}})
+    assert rows == [("parse.p50_ms", 10, 5, -0.5)]
+
+def test_token_f1():
+    assert token_f1("a b c", "a b c") == 1.0
+    assert token_f1("", "") == 1.0
+    assert token_f1("x", "a b") == 0.0
+    assert token_f1("a b", "a b c d") == pytest.approx(2 / 3)
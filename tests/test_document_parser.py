@@ -0,0 +1,90 @@
+import io
+import zipfile
+
+import pytest
+
+import document_parser
+from benchmarks.corpus import build_pdf
+from document_parser import (DocumentFormat, DocumentTimeoutError, UnsupportedFormatError, detect_format,
+                             extract_text_and_format, iter_document_text, register_format)
+
+def make_docx(paragraphs):
+    body = "".join(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>" for text in paragraphs)
+    document = ('<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                f"<w:body>{body}</w:body></w:document>")
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", document)
+        archive.writestr("[Content_Types].xml", "<Types/>")
+    return buffer.getvalue()
+
+PDF = build_pdf([[("F1", 11, 72, 720, "Jane Doe"), ("F1", 11, 72, 700, "Experience at Acme")]])
+DOCX = make_docx(["Jane Doe", "", "", "Experience", "Data engineer at Acme"])
+RTF = (rb"{\rtf1\ansi{\fonttbl{\f0 Arial;}}{\info{\title Hidden}}\f0 Jane Doe\par\par\par "
+       rb"Experience\par Caf\'e9 owner\tab 2020\par}")
+HTML = (b"<html><head><title>Hidden</title><style>p {}</style></head><body><h1>Jane Doe</h1>"
+        b"<script>var x = 1;</script><p>Experience</p><ul><li>Python</li><li>SQL</li></ul></body></html>")
+TEXT = "Jane Doe\n\n\n\nExperience\nCafé owner\n".encode("utf-8")
+
+@pytest.fixture(params=["libmagic", "signatures"])
+def sniffing(request, monkeypatch):
+    if request.param == "signatures":
+        monkeypatch.setattr(document_parser, "magic", None)
+    elif document_parser.magic is None:
+        pytest.skip("python-magic is not installed")
+    return request.param
+
+@pytest.mark.parametrize("content, name", [(PDF, "pdf"), (DOCX, "docx"), (RTF, "rtf"), (HTML, "html"), (TEXT, "text")])
+def test_format_is_detected_from_content(sniffing, content, name):
+    assert detect_format(content).name == name
+
+def test_binary_content_is_unsupported(sniffing):
+    with pytest.raises(UnsupportedFormatError):
+        detect_format(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR" + bytes(range(256)))
+    with pytest.raises(UnsupportedFormatError):
+        detect_format(b"")
+
+def test_plain_zip_is_not_docx(sniffing):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("notes.txt", "hello")
+    with pytest.raises(UnsupportedFormatError):
+        detect_format(buffer.getvalue())
+
+def test_pdf_text_and_backend():
+    text, backend = extract_text_and_format(PDF)
+    assert "Jane Doe" in text and "Experience at Acme" in text
+    assert backend in ("pypdf2", "pdfplumber")
+
+@pytest.mark.parametrize("content, expected", [
+    (DOCX, "Jane Doe\n\nExperience\nData engineer at Acme"),
+    (RTF, "Jane Doe\n\nExperience\nCafé owner\t2020"),
+    (TEXT, "Jane Doe\n\nExperience\nCafé owner"),
+])
+def test_runs_of_blank_blocks_collapse_to_one(content, expected):
+    assert extract_text_and_format(content)[0] == expected
+
+def test_html_skips_invisible_elements():
+    text, backend = extract_text_and_format(HTML)
+    assert backend == "html"
+    assert "Hidden" not in text and "var x" not in text
+    assert [line.strip() for line in text.splitlines() if line.strip()] == ["Jane Doe", "Experience", "Python", "SQL"]
+
+def test_text_decoding_falls_back_to_cp1252():
+    assert extract_text_and_format("Café résumé".encode("cp1252"))[0] == "Café résumé"
+    assert extract_text_and_format("Jane".encode("utf-16"))[0] == "Jane"
+
+def test_budgets_apply_to_every_format():
+    assert sum(len(block) for block in iter_document_text(TEXT * 100, max_chars=12)) == 12
+    with pytest.raises(DocumentTimeoutError):
+        list(iter_document_text(TEXT, timeout=1e-9))
+
+def test_registered_formats_are_checked_in_order(monkeypatch):
+    monkeypatch.setattr(document_parser, "FORMATS", dict(document_parser.FORMATS))
+    monkeypatch.setattr(document_parser, "magic", None)
+    custom = DocumentFormat("vcard", ("text/vcard",), lambda head: head.startswith(b"BEGIN:VCARD"),
+                            lambda content, context: iter(["Jane Doe"]), "\n", (".vcf",))
+    register_format(custom, before="text")
+    assert list(document_parser.FORMATS)[-2:] == ["vcard", "text"]
+    assert extract_text_and_format(b"BEGIN:VCARD\nFN:Jane Doe\nEND:VCARD") == ("Jane Doe", "vcard")
+    assert ".vcf" in document_parser.supported_extensions()
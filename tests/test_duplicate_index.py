@@ -0,0 +1,76 @@
+import pytest
+
+from duplicate_index import (MATCH_EMAIL, MATCH_PHONE, MATCH_TEXT, estimated_similarity, minhash_signature,
+                             normalize_email, normalize_phone)
+from resume_store import ResumeStore
+
+BODY = " ".join(f"Led project {index} delivering a data platform for client {index * 7} in region {index % 5}."
+                for index in range(40))
+
+@pytest.fixture
+def store(tmp_path):
+    return ResumeStore(str(tmp_path / "resumes.db"))
+
+def save(store, filename, text, email="", phone=""):
+    store.save({"name": filename, "email": email, "phone": phone}, filename, text)
+
+def test_contact_keys_are_normalized():
+    assert normalize_email("  Jane@Example.COM ") == "jane@example.com"
+    assert normalize_phone("+1 (555) 010-2030") == normalize_phone("555.010.2030") == "5550102030"
+    assert normalize_phone("12-34") == ""
+
+def test_signatures_ignore_layout_and_estimate_overlap():
+    signature = minhash_signature(BODY)
+    assert estimated_similarity(signature, minhash_signature(BODY.upper().replace(" ", "\n  "))) == 1.0
+    assert estimated_similarity(signature, minhash_signature("An entirely different document " * 20)) < 0.2
+    assert minhash_signature("too short") is None
+    assert estimated_similarity(None, signature) == 0.0
+
+def test_near_duplicate_text_is_found(store):
+    save(store, "first.json", f"Jane Doe\n{BODY}")
+    save(store, "other.json", "Unrelated candidate with a completely different history " * 10)
+    matches = store.find_duplicates(f"JANE DOE  {BODY} Updated.")
+    assert [match["__filename"] for match in matches] == ["first.json"]
+    assert matches[0]["reason"] == MATCH_TEXT and matches[0]["similarity"] >= 0.8
+    assert store.find_duplicates(f"Jane Doe\n{BODY}", exclude="first.json") == []
+
+def test_contact_matches_rank_after_text_matches(store):
+    save(store, "text.json", BODY)
+    save(store, "email.json", "Different resume text for the same person " * 5, email="jane@example.com")
+    save(store, "phone.json", "Yet another unrelated resume body " * 5, phone="555 010 2030")
+    matches = store.find_duplicates(BODY, email="JANE@example.com", phone="+1 555-010-2030")
+    assert [(match["__filename"], match["reason"]) for match in matches] == [
+        ("text.json", MATCH_TEXT), ("email.json", MATCH_EMAIL), ("phone.json", MATCH_PHONE)]
+
+def test_saved_duplicates_share_a_candidate(store):
+    save(store, "v1.json", BODY, email="jane@example.com")
+    save(store, "v2.json", "Rewritten resume " * 10, email="jane@example.com")
+    save(store, "v3.json", BODY + " Extra line.")
+    save(store, "solo.json", "Someone else entirely " * 10)
+    assert [s["__filename"] for s in store.candidate_resumes("v3.json")] == ["v1.json", "v2.json"]
+    assert store.candidate_resumes("solo.json") == []
+    assert store.candidate_resumes("missing.json") == []
+
+def test_duplicate_report_groups_transitively(store):
+    save(store, "a.json", "Alpha resume text " * 10, email="a@example.com")
+    save(store, "b.json", "Bravo resume text " * 10, phone="555 010 2030")
+    save(store, "bridge.json", "Charlie resume text " * 10, email="a@example.com", phone="5550102030")
+    save(store, "solo.json", "Delta resume text " * 10)
+    report = store.duplicate_report()
+    assert report["total_resumes"] == 4
+    assert report["duplicate_resumes"] == 2
+    [group] = report["groups"]
+    assert sorted(s["__filename"] for s in group["resumes"]) == ["a.json", "b.json", "bridge.json"]
+    assert {(first, second, reason) for first, second, reason, _ in group["matches"]} == {
+        ("a.json", "bridge.json", MATCH_EMAIL), ("b.json", "bridge.json", MATCH_PHONE)}
+
+def test_index_is_built_for_an_existing_store(store):
+    save(store, "first.json", BODY)
+    save(store, "second.json", BODY)
+    conn = store._connection()
+    with conn:
+        conn.execute("DELETE FROM resume_fingerprints")
+        conn.execute("DELETE FROM resume_lsh_bands")
+        conn.execute("DELETE FROM meta WHERE key = 'duplicate_index_version'")
+    fresh = ResumeStore(store.db_path)
+    assert [s["__filename"] for s in fresh.candidate_resumes("second.json")] == ["first.json"]
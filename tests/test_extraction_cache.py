@@ -0,0 +1,101 @@
+import os
+import json
+import time
+
+import pytest
+
+import extraction_cache
+from extraction_cache import STATS_FILENAME, ExtractionCache
+
+EXTRACTION = {"is_valid_resume": True, "data": {"name": "Jane Doe"}}
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExtractionCache(str(tmp_path / "cache"))
+
+def entry_files(cache):
+    return sorted(name for name in os.listdir(cache.cache_dir) if name != STATS_FILENAME)
+
+def read_stats(cache):
+    with open(os.path.join(cache.cache_dir, STATS_FILENAME), encoding="utf-8") as f:
+        return json.load(f)
+
+def test_hits_by_document_bytes_and_by_text(cache):
+    assert cache.get_by_pdf(b"pdf-a") is None
+    assert cache.get_by_text("Jane  Doe\nPython") is None
+    cache.put(b"pdf-a", "Jane Doe Python", EXTRACTION, record="jane.json", pdf_backend="pypdf2")
+    assert cache.get_by_pdf(b"pdf-a")["record"] == "jane.json"
+    # Whitespace differences in the text map to the same entry
+    assert cache.get_by_text("Jane  Doe\nPython")["extraction"] == EXTRACTION
+    cache.put(b"pdf-b", "Jane Doe Python", EXTRACTION)
+    assert cache.get_by_pdf(b"pdf-b")["pdf_backend"] == "pypdf2"
+    stats = cache.stats()
+    assert (stats["pdf_hits"], stats["text_hits"], stats["misses"]) == (2, 1, 1)
+    assert stats["hit_rate"] == 0.75
+
+def test_lookups_do_not_write_stats_until_flushed(cache):
+    for _ in range(5):
+        cache.get_by_text("missing")
+    assert not os.path.exists(os.path.join(cache.cache_dir, STATS_FILENAME))
+    cache.flush_stats()
+    assert read_stats(cache)["misses"] == 5
+
+def test_flush_adds_to_counts_of_other_processes(tmp_path):
+    first = ExtractionCache(str(tmp_path / "cache"))
+    second = ExtractionCache(str(tmp_path / "cache"))
+    first.get_by_text("a")
+    second.get_by_text("b")
+    second.get_by_text("c")
+    first.flush_stats()
+    second.flush_stats()
+    assert read_stats(first)["misses"] == 3
+    assert ExtractionCache(str(tmp_path / "cache")).stats()["misses"] == 3
+
+def test_stats_are_flushed_periodically(cache, monkeypatch):
+    monkeypatch.setattr(extraction_cache, "STATS_FLUSH_SECONDS", 0)
+    cache.get_by_text("missing")
+    assert read_stats(cache)["misses"] == 1
+
+def test_directory_is_scanned_only_over_the_size_limit(cache, monkeypatch):
+    scans = []
+    original = ExtractionCache.evict
+
+    def evict(self):
+        scans.append(self._size)
+        return original(self)
+
+    monkeypatch.setattr(ExtractionCache, "evict", evict)
+    cache.put(b"pdf-0", "text 0", EXTRACTION)
+    assert len(scans) == 1
+    entry_size = cache._size
+    cache.max_bytes = entry_size * 5 // 2
+    cache.put(b"pdf-1", "text 1", EXTRACTION)
+    assert len(scans) == 1
+    cache.put(b"pdf-2", "text 2", EXTRACTION)
+    assert len(scans) == 2
+    assert cache._size <= cache.max_bytes
+    assert cache.stats()["evictions"] >= 1
+
+def test_least_recently_used_entries_are_evicted_first(cache):
+    base = time.time() - 100
+    for index in range(3):
+        cache.put(f"pdf-{index}".encode(), f"text {index}", EXTRACTION)
+        paths = (cache._path("pdf", cache.pdf_key(f"pdf-{index}".encode())), cache._path("text", cache.text_key(f"text {index}")))
+        for path in paths:
+            os.utime(path, (base + index * 10, base + index * 10))
+    # Reading an entry makes it the most recently used
+    assert cache.get_by_pdf(b"pdf-0") is not None
+    cache.max_bytes = cache._size - 1
+    assert cache.evict() == 1
+    assert cache.get_by_pdf(b"pdf-1") is None
+    assert cache.get_by_pdf(b"pdf-0") is not None
+    assert cache.get_by_pdf(b"pdf-2") is not None
+
+def test_expired_entries_are_misses_and_evicted(cache):
+    cache.put(b"pdf-a", "text a", EXTRACTION)
+    expired = time.time() - cache.max_age_seconds - 10
+    for name in entry_files(cache):
+        os.utime(os.path.join(cache.cache_dir, name), (expired, expired))
+    assert cache.get_by_pdf(b"pdf-a") is None
+    assert cache.evict() == 2
+    assert entry_files(cache) == []
@@ -0,0 +1,87 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+import gemini_client
+from gemini_client import Completion, FakeBackend, GeminiClient, GeminiError
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(gemini_client, "BACKOFF_BASE", 0.001)
+
+def make_client(backend, **kwargs):
+    kwargs.setdefault("requests_per_minute", 10**6)
+    kwargs.setdefault("tokens_per_minute", 10**9)
+    return GeminiClient("test-model", backend=backend, **kwargs)
+
+def test_generate_returns_the_backend_response():
+    backend = FakeBackend(responder=lambda prompt: prompt.upper())
+    completion = make_client(backend).generate_sync("hello")
+    assert completion.text == "HELLO"
+    assert backend.calls == ["hello"]
+
+def test_retryable_failures_are_retried():
+    backend = FakeBackend(responder=["ok"], failures=2)
+    assert make_client(backend, max_retries=2).generate_sync("p").text == "ok"
+    assert len(backend.calls) == 3
+
+def test_retries_are_bounded():
+    backend = FakeBackend(failures=5)
+    with pytest.raises(GeminiError, match="after 2 attempt"):
+        make_client(backend, max_retries=1).generate_sync("p")
+
+def test_slow_requests_time_out():
+    backend = FakeBackend(latency=1.0)
+    with pytest.raises(GeminiError):
+        make_client(backend, timeout=0.05, max_retries=1).generate_sync("p")
+    assert len(backend.calls) == 2
+
+def test_stream_yields_the_response_in_pieces():
+    backend = FakeBackend(responder=lambda prompt: '{"name": "Jane Doe"}', chunk_size=5)
+
+    async def collect():
+        return [piece async for piece in make_client(backend).stream("p")]
+
+    pieces = asyncio.run(collect())
+    assert len(pieces) > 1
+    assert "".join(pieces) == '{"name": "Jane Doe"}'
+
+class ThreadedBackend:
+    """Blocking calls in worker threads, like the SDK; the first calls overrun the timeout before they end"""
+
+    def __init__(self, slow_calls: int):
+        self.slow_calls = slow_calls
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _call(self, timeout):
+        with self._lock:
+            self.calls += 1
+            slow = self.calls <= self.slow_calls
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(timeout + 0.05 if slow else 0.01)
+            if slow:
+                raise TimeoutError("deadline exceeded")
+            return "ok"
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    async def generate(self, prompt, timeout=None):
+        return Completion(await asyncio.to_thread(self._call, timeout), 1, 1)
+
+def test_timed_out_calls_hold_their_slot_until_they_return():
+    backend = ThreadedBackend(slow_calls=4)
+    client = make_client(backend, max_concurrency=2, timeout=0.1, max_retries=4)
+
+    async def run():
+        return await asyncio.gather(*(client.generate("p") for _ in range(6)))
+
+    assert [completion.text for completion in asyncio.run(run())] == ["ok"] * 6
+    assert backend.peak <= 2
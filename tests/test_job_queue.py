@@ -0,0 +1,194 @@
+import time
+import threading
+
+import pytest
+
+from job_queue import JobManager, JobStore, STATUS_DONE, STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING, job_key
+
+def wait_for(manager, job_id, statuses=(STATUS_DONE, STATUS_FAILED), timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not reach {statuses}")
+
+class Handler:
+    """Records calls and returns the queued outcomes in order (the last repeats)"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes) or [{"status": "saved", "record": None}]
+        self.calls = []
+
+    def __call__(self, filename, content, on_section=None):
+        self.calls.append((filename, content))
+        outcome = self.outcomes[min(len(self.calls), len(self.outcomes)) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        if on_section is not None:
+            on_section("name", "Jane")
+        return outcome
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.db"))
+
+@pytest.fixture
+def managers():
+    started = []
+    yield started
+    for manager in started:
+        manager.shutdown()
+
+def start(managers, store, handler, **kwargs):
+    manager = JobManager(store=store, workers=1, handler=handler, **kwargs)
+    managers.append(manager)
+    return manager
+
+def test_submit_runs_once_per_content(store, managers):
+    handler = Handler()
+    manager = start(managers, store, handler)
+    job_id = manager.submit(b"resume", "a.pdf")
+    assert job_id == job_key(b"resume")
+    job = wait_for(manager, job_id)
+    assert job['status'] == STATUS_DONE
+    assert job['result'] == {"status": "saved", "record": None}
+    assert job['attempts'] == 1
+    assert manager.submit(b"resume", "copy.pdf") == job_id
+    time.sleep(0.1)
+    assert len(handler.calls) == 1
+    assert store.payload(job_id) is None
+
+def test_failed_job_is_not_rerun_on_resubmit(store, managers):
+    handler = Handler(RuntimeError("boom"))
+    manager = start(managers, store, handler)
+    job_id = manager.submit(b"bad", "bad.pdf")
+    assert wait_for(manager, job_id)['status'] == STATUS_FAILED
+    for _ in range(3):
+        manager.submit(b"bad", "bad.pdf")
+    time.sleep(0.2)
+    assert len(handler.calls) == 1
+    assert manager.get(job_id)['error'] == "boom"
+
+def test_failed_outcome_is_not_rerun_on_resubmit(store, managers):
+    handler = Handler({"status": "failed", "error": "model error"})
+    manager = start(managers, store, handler)
+    job_id = manager.submit(b"bad", "bad.pdf")
+    assert wait_for(manager, job_id)['status'] == STATUS_DONE
+    manager.submit(b"bad", "bad.pdf")
+    time.sleep(0.2)
+    assert len(handler.calls) == 1
+
+def test_failed_job_reruns_on_retry_and_new_upload(store, managers):
+    handler = Handler(RuntimeError("boom"), RuntimeError("boom"), {"status": "saved", "record": None})
+    manager = start(managers, store, handler)
+    job_id = manager.submit(b"bad", "bad.pdf")
+    wait_for(manager, job_id)
+    assert manager.retry(job_id)
+    assert wait_for(manager, job_id)['attempts'] == 2
+    manager.submit(b"bad", "bad.pdf", retry_failed=True)
+    job = wait_for(manager, job_id, statuses=(STATUS_DONE,))
+    assert job['attempts'] == 3
+    assert len(handler.calls) == 3
+    # Successful jobs are not retried and their upload is dropped
+    assert not manager.retry(job_id)
+    assert store.payload(job_id) is None
+
+def test_retry_of_unknown_job_is_refused(store, managers):
+    manager = start(managers, store, Handler())
+    assert not manager.retry("missing")
+
+def test_partial_sections_are_published_while_running(store, managers):
+    release = threading.Event()
+
+    def handler(filename, content, on_section=None):
+        on_section("name", "Jane")
+        release.wait(5)
+        return {"status": "saved", "record": None}
+
+    manager = start(managers, store, handler)
+    job_id = manager.submit(b"resume", "a.pdf")
+    deadline = time.monotonic() + 5
+    while (manager.get(job_id)['partial'] or {}) != {"name": "Jane"} and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert manager.get(job_id)['partial'] == {"name": "Jane"}
+    release.set()
+    assert wait_for(manager, job_id)['partial'] is None
+
+def test_recover_leaves_leased_jobs_running(store):
+    store.enqueue("live", "live.pdf", b"live")
+    assert store.claim("live", "other-process", lease_seconds=60)
+    store.enqueue("queued", "queued.pdf", b"queued")
+    assert store.recover() == ["queued"]
+    assert store.get("live")['status'] == STATUS_RUNNING
+
+def test_recover_requeues_expired_leases(store):
+    store.enqueue("dead", "dead.pdf", b"dead")
+    assert store.claim("dead", "dead-process", lease_seconds=-1)
+    assert store.recover() == ["dead"]
+    job = store.get("dead")
+    assert job['status'] == STATUS_QUEUED
+    assert job['attempts'] == 1
+
+def test_only_the_lease_owner_can_finish(store):
+    store.enqueue("job", "job.pdf", b"job")
+    assert store.claim("job", "owner-a", lease_seconds=60)
+    assert not store.finish("job", "owner-b", result={"status": "saved"})
+    assert store.get("job")['status'] == STATUS_RUNNING
+    assert store.finish("job", "owner-a", result={"status": "saved"})
+    assert store.get("job")['status'] == STATUS_DONE
+
+def test_heartbeat_keeps_long_jobs_from_being_requeued(store, managers):
+    release = threading.Event()
+    calls = []
+
+    def handler(filename, content, on_section=None):
+        calls.append(filename)
+        release.wait(5)
+        return {"status": "saved", "record": None}
+
+    first = start(managers, store, handler, lease_seconds=0.3)
+    job_id = first.submit(b"slow", "slow.pdf")
+    wait_for(first, job_id, statuses=(STATUS_RUNNING,))
+    # A second process starting on the same table while the job runs past several lease periods
+    start(managers, JobStore(store.db_path), handler, lease_seconds=0.3)
+    time.sleep(1.0)
+    assert first.get(job_id)['status'] == STATUS_RUNNING
+    release.set()
+    assert wait_for(first, job_id)['status'] == STATUS_DONE
+    assert calls == ["slow.pdf"]
+
+def test_jobs_of_a_dead_manager_are_picked_up(store, managers):
+    store.enqueue(job_key(b"orphan"), "orphan.pdf", b"orphan")
+    assert store.claim(job_key(b"orphan"), "crashed-process", lease_seconds=0.2)
+    handler = Handler()
+    manager = start(managers, store, handler, lease_seconds=0.3)
+    job = wait_for(manager, job_key(b"orphan"))
+    assert job['status'] == STATUS_DONE
+    assert job['attempts'] == 2
+    assert handler.calls == [("orphan.pdf", b"orphan")]
+
+def test_expired_jobs_fail_once_attempts_are_exhausted(store):
+    store.enqueue("crashy", "crashy.pdf", b"crashy")
+    for attempt in range(1, 3):
+        assert store.claim("crashy", f"process-{attempt}", lease_seconds=-1)
+        assert store.requeue_expired(max_attempts=2) == (["crashy"] if attempt < 2 else [])
+    job = store.get("crashy")
+    assert job['status'] == STATUS_FAILED
+    assert job['attempts'] == 2
+    assert "2 attempt(s)" in job['error']
+    # The upload is kept so the job can still be retried by hand
+    assert store.payload("crashy") == b"crashy"
+    assert store.recover(max_attempts=2) == []
+
+def test_manager_does_not_requeue_a_job_past_max_attempts(store, managers):
+    store.enqueue(job_key(b"crashy"), "crashy.pdf", b"crashy")
+    assert store.claim(job_key(b"crashy"), "crashed-process", lease_seconds=-1)
+    handler = Handler()
+    manager = start(managers, store, handler, max_attempts=1)
+    job = manager.get(job_key(b"crashy"))
+    assert job['status'] == STATUS_FAILED
+    assert manager.retry(job_key(b"crashy"))
+    assert wait_for(manager, job_key(b"crashy"), statuses=(STATUS_DONE,))['attempts'] == 2
+    assert len(handler.calls) == 1
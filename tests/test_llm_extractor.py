@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+import gemini_client
+from gemini_client import FakeBackend, GeminiClient
+from llm_extractor import MODEL_NAME, VERDICT_FIELD, extract_resume
+
+RESUME_TEXT = "Jane Doe\njane@example.com\nExperience\nPython developer at Acme, 2019 - 2023\nSkills\nPython, SQL"
+
+RESPONSE = json.dumps({
+    "is_valid_resume": True,
+    "resume": {
+        "name": "Jane Doe",
+        "email": "jane@example.com",
+        "phone": "",
+        "skills": ["Python", "SQL"],
+        "work_experience": [{"company": "Acme", "role": "Python developer", "dates": "2019 - 2023", "description": ""}],
+        "education": [],
+        "certifications": [],
+    },
+})
+
+@pytest.fixture
+def install_backend(monkeypatch):
+    monkeypatch.setattr(gemini_client, "BACKOFF_BASE", 0.001)
+
+    def install(backend, **kwargs):
+        client = GeminiClient(MODEL_NAME, backend=backend, requests_per_minute=10**6, tokens_per_minute=10**9, **kwargs)
+        monkeypatch.setitem(gemini_client._clients, MODEL_NAME, client)
+        return backend
+
+    return install
+
+def collect_sections():
+    sections = []
+    return sections, lambda field, value: sections.append((field, value))
+
+def test_streamed_sections_are_reported_as_they_complete(install_backend):
+    backend = install_backend(FakeBackend(responder=[RESPONSE], chunk_size=16))
+    sections, on_section = collect_sections()
+    result = extract_resume(RESUME_TEXT, on_section=on_section)
+    assert result["is_valid_resume"]
+    assert result["data"]["skills"] == ["Python", "SQL"]
+    reported = dict(sections)
+    assert reported[VERDICT_FIELD] is True
+    assert reported["name"] == "Jane Doe"
+    assert reported["work_experience"][0]["company"] == "Acme"
+    # Sections arrive in the order the model writes them, in one request
+    assert [field for field, _ in sections][:3] == [VERDICT_FIELD, "name", "email"]
+    assert len(backend.calls) == 1
+
+def test_failed_stream_falls_back_and_still_reports_sections(install_backend):
+    backend = install_backend(FakeBackend(responder=[RESPONSE], failures=1), max_retries=0)
+    sections, on_section = collect_sections()
+    result = extract_resume(RESUME_TEXT, on_section=on_section)
+    assert result["data"]["name"] == "Jane Doe"
+    assert len(backend.calls) == 2
+    reported = dict(sections)
+    assert reported[VERDICT_FIELD] is True
+    assert reported["skills"] == ["Python", "SQL"]
+    assert set(reported) >= {"name", "email", "work_experience", "education", "certifications"}
+
+def test_blocking_extraction_reports_nothing(install_backend):
+    backend = install_backend(FakeBackend(responder=[RESPONSE]))
+    assert extract_resume(RESUME_TEXT)["contact"]["email"] == "jane@example.com"
+    assert len(backend.calls) == 1
@@ -0,0 +1,67 @@
+import pytest
+
+import local_extractor
+from local_extractor import (VERDICT_AMBIGUOUS, VERDICT_NOT_RESUME, VERDICT_RESUME, find_name, find_phone,
+                             find_sections, merge_pre_extraction, pre_extract)
+
+RESUME = """Jane Doe
+jane.doe@example.com | +1 (555) 010-2030
+
+Work Experience
+Data Engineer, Acme 2019 - 2023
+
+Education
+BSc Computer Science
+
+Technical Skills
+Python, SQL
+"""
+
+@pytest.fixture(autouse=True)
+def no_spacy(monkeypatch):
+    # Keep the tests on the heuristics so they do not depend on an installed spaCy model
+    monkeypatch.setattr(local_extractor, "get_spacy_model", lambda: None)
+
+def test_contact_fields_and_sections():
+    result = pre_extract(RESUME)
+    assert result["contact"] == {"name": "Jane Doe", "email": "jane.doe@example.com", "phone": "+1 (555) 010-2030"}
+    assert result["sections"] == ["experience", "education", "skills"]
+    assert result["verdict"] == VERDICT_RESUME
+
+@pytest.mark.parametrize("text, phone", [
+    ("Call 555-010-2030 today", "555-010-2030"),
+    ("Employed 2019 - 2023", ""),
+    ("Order 12345", ""),
+    ("Tel: (020) 7946 0018", "(020) 7946 0018"),
+])
+def test_find_phone_skips_dates_and_short_numbers(text, phone):
+    assert find_phone(text) == phone
+
+def test_headings_must_be_on_their_own_line():
+    assert find_sections("I have experience with education software\nSKILLS & ABILITIES\n") == ["skills"]
+
+def test_name_is_not_taken_from_headings_or_contact_lines():
+    assert find_name("Work Experience\njane@example.com\nJane Mary Doe\n") == "Jane Mary Doe"
+    assert find_name("Invoice 2023\nTotal: 40 USD\n") == ""
+
+def test_junk_is_rejected_without_a_name_lookup(monkeypatch):
+    monkeypatch.setattr(local_extractor, "find_name", lambda text: pytest.fail("name lookup on junk"))
+    result = pre_extract("Grocery list\nMilk, eggs, bread\n")
+    assert result["verdict"] == VERDICT_NOT_RESUME
+    assert result["contact"]["name"] == ""
+
+def test_partial_signals_are_ambiguous():
+    assert pre_extract("Contact jane@example.com about the invoice")["verdict"] == VERDICT_AMBIGUOUS
+    assert pre_extract("Education\nBSc Physics\n")["verdict"] == VERDICT_AMBIGUOUS
+
+def test_merge_fills_empty_fields_and_applies_the_local_verdict():
+    extraction = {
+        "is_valid_resume": False,
+        "contact": {"name": "J. Doe", "email": "", "phone": ""},
+        "data": {"name": "J. Doe", "email": "", "phone": "", "skills": ["Python"]},
+    }
+    merged = merge_pre_extraction(extraction, pre_extract(RESUME))
+    assert merged["is_valid_resume"] is True
+    assert merged["contact"] == {"name": "J. Doe", "email": "jane.doe@example.com", "phone": "+1 (555) 010-2030"}
+    assert merged["data"]["email"] == "jane.doe@example.com"
+    assert extraction["contact"]["email"] == ""
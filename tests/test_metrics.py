@@ -0,0 +1,42 @@
+import time
+
+import pytest
+
+import metrics
+from benchmarks.corpus import build_pdf
+from metrics import STAGE_METRIC, increment, record_stage, timed
+from pdf_parser import iter_best_pdf_pages
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = metrics.MetricsRegistry(log_path="")
+    monkeypatch.setattr(metrics, "_registry", registry)
+    return registry
+
+def test_timed_records_durations_and_failures(registry):
+    with timed("compact"):
+        pass
+    with pytest.raises(ValueError):
+        with timed("compact"):
+            raise ValueError("bad")
+    snapshot = registry.snapshot()
+    assert snapshot[STAGE_METRIC]['{stage="compact"}']["count"] == 2
+    assert snapshot["resume_stage_failures_total"] == {'{stage="compact"}': 1}
+
+def test_prometheus_rendering(registry):
+    increment("gemini_requests_total", outcome="ok")
+    increment("gemini_requests_total", 2, outcome="ok")
+    record_stage("llm_call", 0.3)
+    text = metrics.render_prometheus()
+    assert 'gemini_requests_total{outcome="ok"} 3' in text
+    assert 'resume_stage_seconds_bucket{stage="llm_call",le="0.25"} 0' in text
+    assert 'resume_stage_seconds_bucket{stage="llm_call",le="0.5"} 1' in text
+    assert 'resume_stage_seconds_count{stage="llm_call"} 1' in text
+
+def test_streamed_pdf_extract_excludes_the_consumer(registry):
+    pdf = build_pdf([[("F1", 11, 72, 720, f"Experience page {page}")] for page in range(3)])
+    for _ in iter_best_pdf_pages(pdf, timeout=0, parallel=False):
+        time.sleep(0.1)
+    extract = registry.snapshot()[STAGE_METRIC]['{backend="pdfplumber",stage="pdf_extract"}']
+    assert extract["count"] == 1
+    assert extract["sum"] < 0.25
@@ -0,0 +1,116 @@
+import io
+
+import pytest
+
+import metrics
+import pdf_parser
+from benchmarks.corpus import build_pdf
+from pdf_parser import PDFTimeoutError, iter_pdf_pages
+
+def make_pdf(page_count):
+    return build_pdf([[("F1", 11, 72, 720, f"Experience on page {page}")] for page in range(1, page_count + 1)])
+
+@pytest.fixture
+def isolated_calls(monkeypatch):
+    calls = []
+    original = pdf_parser._iter_pages_isolated
+
+    def record(source, max_pages, deadline, parallel, backend):
+        calls.append(deadline)
+        return original(source, max_pages, deadline, parallel, backend)
+
+    monkeypatch.setattr(pdf_parser, "_iter_pages_isolated", record)
+    return calls
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = metrics.MetricsRegistry(log_path="")
+    monkeypatch.setattr(metrics, "_registry", registry)
+    return registry
+
+def test_short_documents_are_read_in_process(isolated_calls):
+    pages = list(iter_pdf_pages(make_pdf(3), timeout=30))
+    assert [page.strip() for page in pages] == [f"Experience on page {page}" for page in (1, 2, 3)]
+    assert isolated_calls == []
+
+def test_seekable_uploads_are_not_copied(isolated_calls):
+    upload = io.BytesIO(make_pdf(2))
+    assert len(list(iter_pdf_pages(upload, timeout=30))) == 2
+    assert isolated_calls == []
+
+def test_long_documents_are_isolated_with_the_budget(isolated_calls):
+    pages = list(iter_pdf_pages(make_pdf(pdf_parser.PARALLEL_MIN_PAGES), timeout=30, parallel=False))
+    assert len(pages) == pdf_parser.PARALLEL_MIN_PAGES
+    assert "page 8" in pages[-1]
+    assert len(isolated_calls) == 1 and isolated_calls[0] is not None
+
+def test_long_documents_without_budget_or_parallelism_stay_in_process(isolated_calls):
+    assert len(list(iter_pdf_pages(make_pdf(pdf_parser.PARALLEL_MIN_PAGES), timeout=0, parallel=False))) == 8
+    assert isolated_calls == []
+
+def test_large_files_and_explicit_requests_are_isolated(isolated_calls, monkeypatch):
+    assert len(list(iter_pdf_pages(make_pdf(2), timeout=30, isolate=True))) == 2
+    monkeypatch.setattr(pdf_parser, "ISOLATE_MIN_BYTES", 1)
+    assert len(list(iter_pdf_pages(make_pdf(2), timeout=30))) == 2
+    assert len(isolated_calls) == 2
+
+def test_page_and_character_budgets():
+    assert len(list(iter_pdf_pages(make_pdf(5), max_pages=2, timeout=0))) == 2
+    pages = list(iter_pdf_pages(make_pdf(5), max_chars=30, timeout=0))
+    assert sum(len(page) for page in pages) == 30
+
+def test_exhausted_budget_raises_in_process_and_isolated():
+    with pytest.raises(PDFTimeoutError):
+        list(iter_pdf_pages(make_pdf(3), timeout=1e-9))
+    with pytest.raises(PDFTimeoutError):
+        list(iter_pdf_pages(make_pdf(3), timeout=1e-9, isolate=True))
+
+def test_open_timings_are_recorded_in_the_caller(registry):
+    list(iter_pdf_pages(make_pdf(2), timeout=30, isolate=True))
+    list(iter_pdf_pages(make_pdf(2), timeout=30))
+    stages = registry.snapshot()[metrics.STAGE_METRIC]
+    assert stages['{backend="pdfplumber",stage="pdf_open"}']["count"] == 2
+    # The isolated short document is read in one task, the in-process one page by page
+    assert stages['{backend="pdfplumber",stage="pdf_page"}']["count"] == 3
+
+def test_missing_file_raises():
+    with pytest.raises(FileNotFoundError):
+        list(iter_pdf_pages("/nonexistent/resume.pdf"))
+
+def make_dense_pdf(page_count):
+    lines = [f"Experience line {line}: built and shipped data pipelines" for line in range(8)]
+    return build_pdf([[("F1", 11, 72, 720 - 14 * index, text) for index, text in enumerate(lines)]
+                      for _ in range(page_count)])
+
+@pytest.mark.parametrize("text, reason", [
+    ("Experience", "low character density"),
+    ("Experience " + "(cid:12)" * 40 + "x" * 200, "high garbage-glyph ratio"),
+    ("x" * 300, "no section keywords"),
+    ("Skills " + "x" * 300, None),
+])
+def test_assess_text_quality(text, reason):
+    assert pdf_parser.assess_text_quality(text, 1) == reason
+
+def test_dense_text_is_taken_from_the_fast_backend():
+    chosen = []
+    text, backend = pdf_parser.extract_text_and_backend(make_dense_pdf(2))
+    assert backend == "pypdf2"
+    assert text.count("Experience line 0") == 2
+    assert list(pdf_parser.iter_best_pdf_pages(make_dense_pdf(1), on_backend=chosen.append)) and chosen == ["pypdf2"]
+
+def test_sparse_text_falls_back_to_pdfplumber(registry):
+    text, backend = pdf_parser.extract_text_and_backend(make_pdf(2))
+    assert backend == "pdfplumber"
+    assert "Experience on page 2" in text
+    fallbacks = registry.snapshot()["pdf_backend_fallbacks_total"]
+    assert fallbacks['{backend="pypdf2",reason="low character density"}'] == 1
+
+def test_failing_backend_is_skipped(monkeypatch, capsys):
+    def broken(source):
+        raise RuntimeError("cannot parse")
+        yield
+
+    monkeypatch.setitem(pdf_parser.PDF_BACKENDS, "broken", broken)
+    monkeypatch.setattr(pdf_parser, "BACKEND_ORDER", ["broken", "pdfplumber"])
+    assert pdf_parser.extract_text_and_backend(make_dense_pdf(1))[1] == "pdfplumber"
+    assert "PDF backend broken failed" in capsys.readouterr().out
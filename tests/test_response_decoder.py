@@ -0,0 +1,99 @@
+from typing import TypedDict
+
+import pytest
+
+from response_decoder import IncrementalJSONParser, ResponseDecodeError, decode_json, locate_json, validate
+
+class Job(TypedDict):
+    company: str
+    role: str
+
+class Record(TypedDict):
+    name: str
+    valid: bool
+    skills: list[str]
+    jobs: list[Job]
+
+def test_clean_json_needs_no_repair():
+    decoded = decode_json('{"name": "Jane", "skills": ["Python"]}')
+    assert decoded.payload == {"name": "Jane", "skills": ["Python"]}
+    assert decoded.repairs == []
+    assert not decoded.truncated
+
+def test_json_is_located_inside_fences_and_prose():
+    text = 'Here is the result:\n```json\n{"a": {"b": "}"}}\n```\nThanks'
+    assert locate_json(text) == '{"a": {"b": "}"}}'
+    assert decode_json(text).payload == {"a": {"b": "}"}}
+
+def test_text_without_object_raises():
+    with pytest.raises(ResponseDecodeError):
+        decode_json("I could not read this resume.")
+
+def test_non_object_json_raises():
+    with pytest.raises(ResponseDecodeError):
+        decode_json("[1, 2]")
+
+def test_smart_quotes_and_trailing_commas_are_repaired():
+    decoded = decode_json('{“name”: “Jane”, "skills": ["Python",],}')
+    assert decoded.payload == {"name": "Jane", "skills": ["Python"]}
+    assert set(decoded.repairs) == {"smart quotes", "trailing comma"}
+
+def test_python_literals_are_repaired():
+    decoded = decode_json('{"valid": True, "phone": None, "remote": False}')
+    assert decoded.payload == {"valid": True, "phone": None, "remote": False}
+    assert "python literals" in decoded.repairs
+
+def test_raw_newlines_in_strings_are_escaped():
+    assert decode_json('{"description": "line one\nline two"}').payload == {"description": "line one\nline two"}
+
+def test_truncated_object_is_closed_and_reports_open_path():
+    decoded = decode_json('{"name": "Jane", "jobs": [{"company": "Acme", "role": "Dev')
+    assert decoded.truncated
+    assert decoded.payload["name"] == "Jane"
+    assert decoded.payload["jobs"][0]["company"] == "Acme"
+    assert decoded.open_path[0] == "jobs"
+
+def test_validate_coerces_and_reports_problems():
+    payload = {"name": 42, "valid": "yes", "skills": ["Python", None, {"x": 1}, 3], "jobs": [{"company": "Acme"}, "junk"]}
+    validated, problems = validate(payload, Record)
+    assert validated == {
+        "name": "42",
+        "valid": True,
+        "skills": ["Python", "3"],
+        "jobs": [{"company": "Acme", "role": ""}],
+    }
+    assert problems == []
+
+def test_validate_fills_missing_and_wrong_typed_fields():
+    validated, problems = validate({"name": "Jane", "skills": "Python"}, Record)
+    assert validated == {"name": "Jane", "valid": False, "skills": [], "jobs": []}
+    assert sorted(problems) == ["jobs", "skills", "valid"]
+
+def test_incremental_parser_reports_members_as_they_complete():
+    parser = IncrementalJSONParser()
+    pieces = ['Sure:\n```json\n{"name": "Ja', 'ne", "skills": ["a", "b"], "contact": {"email": "j@x.com"',
+              ', "phone": "1"}, "count": 1}\n```']
+    completed = [parser.feed(piece) for piece in pieces]
+    assert completed[0] == []
+    assert completed[1] == [(("name",), "Jane"), (("skills",), ["a", "b"])]
+    assert (("contact", "email"), "j@x.com") in completed[2]
+    assert (("contact",), {"email": "j@x.com", "phone": "1"}) in completed[2]
+    assert completed[2][-1] == (("count",), 1)
+    assert parser.done
+
+def test_incremental_parser_ignores_delimiters_inside_strings():
+    parser = IncrementalJSONParser()
+    completed = parser.feed('{"summary": "a, b: {c}", "n": [1, 2]}')
+    assert completed == [(("summary",), "a, b: {c}"), (("n",), [1, 2])]
+
+def test_incremental_parser_matches_whole_decode_for_any_split():
+    text = '{"name": "Jane", "skills": ["Python", "SQL"], "jobs": [{"company": "Acme", "role": "Dev"}]}'
+    expected = decode_json(text).payload
+    for size in (1, 3, 7, len(text)):
+        parser = IncrementalJSONParser()
+        members = {}
+        for start in range(0, len(text), size):
+            for path, value in parser.feed(text[start:start + size]):
+                if len(path) == 1:
+                    members[path[0]] = value
+        assert members == expected
@@ -0,0 +1,124 @@
+import json
+
+import pytest
+
+from resume_store import ResumeStore, decode_raw_text, encode_details, encode_raw_text, make_record_name
+
+RECORD = {"name": "Jane Doe", "email": "jane@example.com", "phone": "555-0100", "skills": ["Python", "SQL"]}
+
+@pytest.fixture
+def store(tmp_path):
+    return ResumeStore(str(tmp_path / "resumes.db"))
+
+def test_save_and_load_a_record(store):
+    resume_id = store.save({**RECORD, "raw_text": "ignored", "__filename": "ignored"}, "jane.json", "Jane Doe resume")
+    assert store.has_resume("jane.json") and not store.has_resume("john.json")
+    loaded = store.get_resume("jane.json")
+    assert loaded == {**RECORD, "__filename": "jane.json"}
+    assert store.get_resume("jane.json", include_raw_text=True)["raw_text"] == "Jane Doe resume"
+    assert store.get_raw_text(resume_id) == "Jane Doe resume"
+    assert store.get_resume("missing.json") is None
+
+def test_saving_the_same_name_replaces_the_record(store):
+    first = store.save(RECORD, "jane.json", "first")
+    second = store.save({**RECORD, "name": "Jane Smith", "skills": ["Go"]}, "jane.json", "second")
+    assert first == second
+    assert store.count() == 1
+    assert store.get_resume("jane.json", include_raw_text=True)["raw_text"] == "second"
+    assert store.list_resumes() == [{"id": first, "__filename": "jane.json", "name": "Jane Smith",
+                                     "email": "jane@example.com", "phone": "555-0100"}]
+    assert store.all_skills() == ["Go"]
+
+def test_data_version_changes_on_every_save(store):
+    assert store.data_version() == 0
+    store.save(RECORD, "jane.json", "")
+    store.save(RECORD, "jane.json", "")
+    assert store.data_version() == 2
+
+def test_records_are_visible_to_other_instances(store):
+    store.save(RECORD, "jane.json", "")
+    other = ResumeStore(store.db_path)
+    assert other.get_resume("jane.json")["name"] == "Jane Doe"
+    assert other.list_resumes(["python"])[0]["__filename"] == "jane.json"
+
+def test_import_json_directory_skips_known_and_broken_files(store, tmp_path, capsys):
+    data_dir = tmp_path / "legacy"
+    data_dir.mkdir()
+    (data_dir / "jane.json").write_text(json.dumps({**RECORD, "raw_text": "Jane text"}), encoding="utf-8")
+    (data_dir / "broken.json").write_text("{not json", encoding="utf-8")
+    (data_dir / "notes.txt").write_text("ignored", encoding="utf-8")
+    assert store.import_json_directory(str(data_dir)) == 1
+    assert "Failed to import broken.json" in capsys.readouterr().out
+    assert store.get_resume("jane.json", include_raw_text=True)["raw_text"] == "Jane text"
+    assert store.import_json_directory(str(data_dir)) == 0
+    assert store.import_json_directory(str(tmp_path / "missing")) == 0
+
+def test_make_record_name_is_sanitized_and_unique():
+    first = make_record_name("Jane Doe (CV).pdf")
+    assert first.startswith("JaneDoeCV.pdf_") and first.endswith(".json")
+    assert make_record_name("Jane Doe (CV).pdf") != first
+
+@pytest.fixture
+def candidates(store):
+    for index in range(7):
+        skills = ["Python"] + (["Go"] if index % 2 else [])
+        store.save({"name": f"Candidate {index}", "email": f"c{index}@example.com", "skills": skills},
+                   f"candidate_{index}.json", "")
+    return store
+
+def test_list_resumes_pages(candidates):
+    assert [s["name"] for s in candidates.list_resumes(limit=3, offset=2)] == ["Candidate 2", "Candidate 3", "Candidate 4"]
+    assert [s["name"] for s in candidates.list_resumes(["go"], limit=2, offset=1)] == ["Candidate 3", "Candidate 5"]
+    assert len(candidates.list_resumes(["python"], offset=5)) == 2
+
+def test_search_resumes_returns_a_page_and_the_total(candidates):
+    page, total = candidates.search_resumes(limit=3, offset=6)
+    assert (len(page), total) == (1, 7)
+    page, total = candidates.search_resumes(skills=["go"], limit=2)
+    assert ([s["name"] for s in page], total) == (["Candidate 1", "Candidate 3"], 3)
+    page, total = candidates.search_resumes("C5@EXAMPLE")
+    assert ([s["name"] for s in page], total) == (["Candidate 5"], 1)
+    page, total = candidates.search_resumes("candidate", skills=["go"], limit=1, offset=2)
+    assert ([s["name"] for s in page], total) == (["Candidate 5"], 3)
+    assert candidates.search_resumes("candidate", skills=["rust"]) == ([], 0)
+
+def test_search_treats_wildcards_literally(candidates):
+    assert candidates.search_resumes("%")[1] == 0
+    # "_" would also match "candidateX1" as a LIKE wildcard
+    candidates.save({"name": "Other"}, "candidateX1.json", "")
+    assert [s["__filename"] for s in candidates.search_resumes("candidate_1")[0]] == ["candidate_1.json"]
+
+def test_raw_text_encoding_round_trips():
+    text = "Jane Doe\n\fÉducation " * 50
+    blob = encode_raw_text(text)
+    assert isinstance(blob, bytes) and len(blob) < len(text)
+    assert decode_raw_text(blob) == text
+    assert decode_raw_text("legacy plain text") == "legacy plain text"
+    assert decode_raw_text(None) == ""
+    assert encode_details({"name": "Zoë", "skills": ["Go"]}) == '{"name":"Zoë","skills":["Go"]}'
+
+def test_records_are_stored_compactly(store):
+    resume_id = store.save(RECORD, "jane.json", "Jane Doe resume")
+    conn = store._connection()
+    details = conn.execute("SELECT data FROM resume_details WHERE resume_id = ?", (resume_id,)).fetchone()[0]
+    raw_text = conn.execute("SELECT raw_text FROM resume_texts WHERE resume_id = ?", (resume_id,)).fetchone()[0]
+    assert details == encode_details(RECORD)
+    assert isinstance(raw_text, bytes)
+
+def test_compact_converts_legacy_rows(store, monkeypatch):
+    monkeypatch.setattr("resume_store.COMPACT_BATCH_SIZE", 2)
+    ids = [store.save({**RECORD, "name": f"Candidate {index}"}, f"c{index}.json", f"text {index}") for index in range(5)]
+    conn = store._connection()
+    with conn:
+        for resume_id in ids[:3]:
+            conn.execute("UPDATE resume_details SET data = ? WHERE resume_id = ?",
+                         (json.dumps({**RECORD, "name": f"Candidate {resume_id}"}, indent=2), resume_id))
+            conn.execute("UPDATE resume_texts SET raw_text = ? WHERE resume_id = ?", (f"legacy {resume_id}", resume_id))
+    assert store.get_resume("c0.json", include_raw_text=True)["raw_text"] == f"legacy {ids[0]}"
+    result = store.compact()
+    assert (result["details"], result["texts"]) == (3, 3)
+    assert result["bytes_after"] > 0
+    assert conn.execute("SELECT COUNT(*) FROM resume_texts WHERE typeof(raw_text) = 'text'").fetchone()[0] == 0
+    assert store.get_resume("c1.json", include_raw_text=True)["raw_text"] == f"legacy {ids[1]}"
+    assert store.get_resume("c4.json", include_raw_text=True)["raw_text"] == "text 4"
+    assert store.compact(vacuum=False)["details"] == 0
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+import similarity_index
+from resume_store import ResumeStore
+from similarity_index import SimilarityIndex, document_text, skills_in_text, tokenize, vectorize
+
+RESUMES = {
+    "backend.json": ("Backend engineer building Python microservices with PostgreSQL and Docker",
+                     ["Python", "PostgreSQL", "Docker"]),
+    "mobile.json": ("Mobile developer shipping Android apps in Kotlin and Java", ["Kotlin", "Java", "Android"]),
+    "data.json": ("Data scientist training machine learning models in Python with pandas",
+                  ["Python", "Machine Learning", "pandas"]),
+    "dotnet.json": ("Developer maintaining .NET services and C# APIs", [".NET", "C#"]),
+}
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResumeStore(str(tmp_path / "resumes.db"))
+    for filename, (text, skills) in RESUMES.items():
+        store.save({"name": filename, "skills": skills}, filename, text)
+    return store
+
+def ranked(summaries):
+    return [summary["__filename"] for summary in summaries]
+
+def test_tokenize_keeps_technical_terms():
+    assert tokenize("I use C++, C#, Node.js and the .NET stack") == ["use", "c++", "c#", "node.js", "net", "stack"]
+
+def test_skills_in_text_finds_phrases_and_dotted_names():
+    known = {"python", "machine learning", ".net", "c#"}.__contains__
+    text = "We want Python, Machine Learning and .NET (C#) experience."
+    assert skills_in_text(text, known) == ["python", "machine learning", ".net", "c#"]
+
+def test_vectorize_weights_skills_and_merges_duplicates():
+    features, weights = vectorize("python python sql", ["Python", "python "])
+    assert features.dtype == np.uint32 and list(features) == sorted(features)
+    assert len(features) == 3
+    assert sorted(weights.tolist()) == pytest.approx([1.0, 1 + np.log(2), similarity_index.SKILL_WEIGHT])
+    assert len(vectorize("", [])[0]) == 0
+
+def test_document_text_includes_roles():
+    record = {"work_experience": [{"role": "Data Engineer", "description": "Built pipelines"}, "bad entry"]}
+    assert document_text(record, "raw") == "raw\nData Engineer\nBuilt pipelines"
+
+def test_job_description_ranks_matching_resumes_first(store):
+    results = store.similar_resumes("Senior Android engineer, Kotlin required", limit=2)
+    assert ranked(results)[0] == "mobile.json"
+    assert all(0 < summary["score"] <= 1 for summary in results)
+    assert ranked(store.similar_resumes("We need .NET and C# experience", limit=1)) == ["dotnet.json"]
+    assert store.similar_resumes("zzz qqq") == []
+
+def test_similar_to_a_saved_resume_excludes_it(store):
+    results = store.similar_resumes(filename="backend.json", limit=3)
+    assert ranked(results)[0] == "data.json"
+    assert "backend.json" not in ranked(results)
+    assert store.similar_resumes(filename="missing.json") == []
+
+def test_updates_replace_the_stored_vector(store):
+    store.save({"name": "mobile", "skills": ["Python"]}, "mobile.json", "Python backend services with PostgreSQL")
+    assert "mobile.json" not in ranked(store.similar_resumes("Android Kotlin", limit=4))
+    other = ResumeStore(store.db_path)
+    assert "mobile.json" in ranked(other.similar_resumes("Python PostgreSQL backend", limit=4))
+
+def test_merged_and_pending_entries_score_the_same(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(similarity_index, "MERGE_THRESHOLD", 0)
+    merged = ResumeStore(str(tmp_path / "merged.db"))
+    for filename, (text, skills) in RESUMES.items():
+        merged.save({"name": filename, "skills": skills}, filename, text)
+    for target in (store, merged):
+        # Replacing a vector removes its old entries from the unmerged buffer or the merged arrays
+        target.save({"name": "data", "skills": ["Python"]}, "data.json", "Python analytics with pandas")
+    query = "Python pandas analytics engineer"
+    expected = [(s["__filename"], s["score"]) for s in store.similar_resumes(query, limit=4)]
+    actual = [(s["__filename"], s["score"]) for s in merged.similar_resumes(query, limit=4)]
+    assert [name for name, _ in actual] == [name for name, _ in expected]
+    assert [score for _, score in actual] == pytest.approx([score for _, score in expected])
+
+def test_empty_index_returns_nothing():
+    index = SimilarityIndex()
+    assert index.query(*vectorize("python", []), limit=5) == []
@@ -0,0 +1,48 @@
+import pytest
+
+from resume_store import ResumeStore
+from skill_index import bitmap_to_ids, normalize_skill
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResumeStore(str(tmp_path / "resumes.db"))
+    for name, skills in (("a", ["Python", "SQL"]), ("b", ["python", "Go"]), ("c", ["Machine  Learning"])):
+        store.save({"name": name, "skills": skills}, f"{name}.json", "")
+    return store
+
+def names(summaries):
+    return [summary["__filename"] for summary in summaries]
+
+def test_normalize_skill_and_bitmaps():
+    assert normalize_skill("  Machine \n Learning ") == "machine learning"
+    assert bitmap_to_ids(0) == []
+    assert bitmap_to_ids((1 << 3) | (1 << 9) | (1 << 200)) == [3, 9, 200]
+
+def test_and_and_or_filters(store):
+    assert names(store.list_resumes(["PYTHON"])) == ["a.json", "b.json"]
+    assert names(store.list_resumes(["python", "go"])) == ["b.json"]
+    assert names(store.list_resumes(["sql", "go"], match_all=False)) == ["a.json", "b.json"]
+    assert names(store.list_resumes(["machine learning"])) == ["c.json"]
+    assert store.list_resumes(["rust"]) == []
+
+def test_frequencies_follow_updates(store):
+    assert store.skill_frequencies()[0] == ("python", "python", 2)
+    store.save({"name": "b", "skills": ["Go"]}, "b.json", "")
+    assert ("python", "python", 1) in store.skill_frequencies()
+    store.save({"name": "c", "skills": []}, "c.json", "")
+    assert "Machine  Learning" not in store.all_skills()
+    assert names(store.list_resumes(["python"])) == ["a.json"]
+
+def test_other_processes_see_updates(store):
+    other = ResumeStore(store.db_path)
+    assert names(other.list_resumes(["go"])) == ["b.json"]
+    store.save({"name": "a", "skills": ["Go"]}, "a.json", "")
+    assert names(other.list_resumes(["go"])) == ["a.json", "b.json"]
+
+def test_missing_postings_are_rebuilt(store):
+    conn = store._connection()
+    with conn:
+        conn.execute("DELETE FROM skill_postings")
+        conn.execute("DELETE FROM meta WHERE key = 'skill_index_version'")
+    fresh = ResumeStore(store.db_path)
+    assert names(fresh.list_resumes(["python"])) == ["a.json", "b.json"]
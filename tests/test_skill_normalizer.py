@@ -0,0 +1,55 @@
+import pytest
+
+from skill_normalizer import SkillNormalizer
+
+@pytest.fixture(scope="module")
+def normalizer():
+    return SkillNormalizer()
+
+@pytest.mark.parametrize("skill, expected", [
+    ("python", "Python"),
+    ("JS", "JavaScript"),
+    ("k8s", "Kubernetes"),
+    ("python3", "Python"),
+    ("Python (Programming)", "Python"),
+    ("Proficient in Python", "Python"),
+    ("Pytorh", "PyTorch"),
+    ("Python.", "Python"),
+    ("python;", "Python"),
+    (" 'Java', ", "Java"),
+])
+def test_aliases_and_variants_map_to_canonical_names(normalizer, skill, expected):
+    assert normalizer.canonicalize(skill) == expected
+
+@pytest.mark.parametrize("skill, expected", [
+    (".NET", ".NET"),
+    (".net core", ".NET"),
+    (".NET 8", ".NET"),
+    ("ASP.NET", "ASP.NET"),
+    ("Node.js", "Node.js"),
+    ("node.js.", "Node.js"),
+    ("Vue.js", "Vue.js"),
+    ("Proficient in .NET", ".NET"),
+])
+def test_dotted_names_keep_their_dots(normalizer, skill, expected):
+    assert normalizer.canonicalize(skill) == expected
+
+def test_unknown_skills_are_kept_with_cleaned_whitespace(normalizer):
+    assert normalizer.canonicalize("  Some   Niche Tool ") == "Some Niche Tool"
+    assert normalizer.canonicalize(".hidden-tool") == ".hidden-tool"
+
+def test_punctuation_only_skills_are_dropped(normalizer):
+    assert normalizer.canonicalize("...") == ""
+    assert normalizer.normalize_skills(["...", "", "Python"]) == ["Python"]
+
+def test_normalize_skills_deduplicates_in_order(normalizer):
+    assert normalizer.normalize_skills(["python", "JS", "Python 3", "javascript", "SQL"]) == ["Python", "JavaScript", "SQL"]
+
+def test_custom_alias_table():
+    normalizer = SkillNormalizer({"Kotlin": ["kotlin", "kt"]})
+    assert normalizer.canonicalize("KT") == "Kotlin"
+    assert normalizer.canonicalize("python") == "python"
+
+@pytest.mark.parametrize("skill", ["TF", "CV", "DL", "Node", "Scrum", "Collaboration"])
+def test_ambiguous_terms_are_left_as_written(normalizer, skill):
+    assert normalizer.canonicalize(skill) == skill
@@ -0,0 +1,79 @@
+import pytest
+
+from gemini_client import estimate_tokens
+from text_compactor import chunk_pages, clean_pages, compact_text, is_page_number
+
+PAGE_BREAK = "\n\f"
+
+@pytest.mark.parametrize("line", ["Page 2", "page 3 of 5", "2 of 5", "2/5", "- 2 -", "– 12 –"])
+def test_explicit_page_numbers(line):
+    assert is_page_number(line)
+
+@pytest.mark.parametrize("line", ["2019", "05/2021", "(2020)", "2019 - 2021", "12", "6/5", "3 of 2", "Page 0"])
+def test_dates_and_bare_numbers_are_not_page_numbers(line):
+    assert not is_page_number(line)
+
+def test_dates_are_kept_on_every_page():
+    text = PAGE_BREAK.join([
+        "Jane Doe\nExperience\nAcme Corp\n2019\n05/2021\n(2020)\nPage 1 of 2",
+        "Jane Doe\nEducation\nMIT\n2015\n2/2",
+    ])
+    pages = clean_pages(text)
+    lines = [line for page in pages for line in page]
+    for date in ("2019", "05/2021", "(2020)", "2015"):
+        assert date in lines
+    assert "Page 1 of 2" not in lines
+    assert "2/2" not in lines
+
+def test_page_number_away_from_edges_is_kept_unless_it_repeats():
+    body = [f"Line {index} of the summary section" for index in range(10)]
+    single_page = "\n".join(body[:5] + ["1/4"] + body[5:])
+    assert "1/4" in clean_pages(single_page)[0]
+    pages = ["\n".join(body[:5] + [f"{page}/2"] + body[5:]) for page in (1, 2)]
+    assert not any(line.endswith("/2") for page in clean_pages(PAGE_BREAK.join(pages)) for line in page)
+
+def test_repeated_header_and_footer_are_kept_once():
+    topics = ["Experience", "Projects", "Education", "Certifications"]
+    pages = [
+        "\n".join(["Jane Doe - Curriculum Vitae"] + [f"{topic} detail {line}" for line in range(8)]
+                  + ["Confidential resume footer"])
+        for topic in topics
+    ]
+    cleaned = clean_pages(PAGE_BREAK.join(pages))
+    lines = [line for page in cleaned for line in page]
+    assert lines.count("Jane Doe - Curriculum Vitae") == 1
+    assert lines.count("Confidential resume footer") == 1
+    assert len(cleaned) == 4
+    assert all(f"{topic} detail 4" in lines for topic in topics)
+
+def test_year_lines_at_page_edges_are_not_furniture():
+    pages = [f"{2015 + index}\nRole {index} at Company {index}\nDid things" for index in range(4)]
+    lines = [line for page in clean_pages(PAGE_BREAK.join(pages)) for line in page]
+    assert [line for line in lines if line.isdigit()] == ["2015", "2016", "2017", "2018"]
+
+def test_whitespace_and_invisible_characters_are_normalized():
+    assert clean_pages("Jane  Doe​\n\n   Python   Developer  ") == [["Jane Doe", "Python Developer"]]
+
+def test_chunks_stay_within_budget_and_keep_order():
+    pages = [[f"page {page} line {line} " + "word " * 20 for line in range(10)] for page in range(6)]
+    budget = 200
+    chunks = chunk_pages(pages, budget)
+    # The budget applies to the per-line estimates the chunks are packed by
+    assert all(sum(estimate_tokens(line) for line in chunk.splitlines()) <= budget for chunk in chunks)
+    assert len(chunks) > 1
+    joined = "\n".join(chunks).splitlines()
+    assert joined == [line for page in pages for line in page]
+
+def test_compact_text_truncates_to_max_chunks():
+    text = PAGE_BREAK.join("\n".join(f"page {page} unique line {line} " + "x" * 80 for line in range(20))
+                           for page in range(8))
+    result = compact_text(text, token_budget=600, max_chunks=2)
+    assert len(result.chunks) == 2
+    assert result.truncated
+    assert result.tokens_after < result.tokens_before
+    assert result.report()["chunks"] == 2
+
+def test_compact_text_without_chunking():
+    result = compact_text("Jane Doe\n\nPython", token_budget=0)
+    assert result.chunks == ["Jane Doe\nPython"]
+    assert not result.truncated
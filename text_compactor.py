@@ -0,0 +1,215 @@
+"""
+Module for compacting extracted resume text to a token budget before prompting
+
+Between pdf_parser and llm_extractor the text is cleaned so the prompt carries only
+content: whitespace is normalized, page numbers ("Page 2", "2 of 5", "- 2 -") at page
+edges are stripped, and header/footer lines repeated on most pages and long lines repeated verbatim are kept only once.
+Text that still exceeds the token budget is split into page/line-aligned chunks
+(extracted in parallel and merged by llm_extractor); text beyond the chunk cap is dropped.
+"""
+import os
+import re
+from dataclasses import dataclass, field
+
+from gemini_client import estimate_tokens
+from metrics import timed, increment
+
+# Token budget of the resume text in one prompt, and how many chunks a long CV may use
+TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "6000"))
+MAX_CHUNKS = int(os.getenv("PROMPT_MAX_CHUNKS", "4"))
+
+# Lines this close to the top or bottom of a page are candidates for headers and footers
+FURNITURE_DEPTH = 3
+# Only lines at least this long are de-duplicated, so short labels and bullets may repeat
+MIN_DEDUPE_CHARS = 25
+
+_PAGE_SPLIT_RE = re.compile(r"\f")
+_SPACE_RE = re.compile(r"[ \t\u00a0\u2000-\u200a\u202f\u205f\u3000]+")
+_INVISIBLE_RE = re.compile(r"[\u200b-\u200d\u2060\ufeff\u00ad]")
+_DIGITS_RE = re.compile(r"\d+")
+_LETTER_RE = re.compile(r"[^\W\d_]")
+# Explicit page-number forms only, so bare years and dates such as "2019" or "05/2021" are never matched
+_PAGE_NUMBER_RE = re.compile(
+    r"^(?:page\s*(?P<page>\d{1,3})(?:\s*(?:of|/)\s*(?P<page_total>\d{1,3}))?"
+    r"|(?P<number>\d{1,3})\s*(?:of|/)\s*(?P<total>\d{1,3})"
+    r"|[-–]\s*(?P<dashed>\d{1,3})\s*[-–])$",
+    re.IGNORECASE,
+)
+
+@dataclass
+class CompactedText:
+    """Compacted text, its prompt-sized chunks and the token counts before and after compaction"""
+    text: str
+    chunks: list = field(default_factory=list)
+    tokens_before: int = 0
+    tokens_after: int = 0
+    truncated: bool = False
+
+    def report(self) -> dict:
+        return {
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "chunks": len(self.chunks),
+            "truncated": self.truncated,
+        }
+
+def normalize_line(line: str) -> str:
+    """Drop invisible characters and collapse runs of horizontal whitespace"""
+    return _SPACE_RE.sub(" ", _INVISIBLE_RE.sub("", line)).strip()
+
+def is_page_number(line: str) -> bool:
+    """Whether a normalized line is an explicit page number: "Page 2", "2 of 5", "2/5" or "- 2 -"."""
+    match = _PAGE_NUMBER_RE.match(line)
+    if match is None:
+        return False
+    number = match.group('page') or match.group('number') or match.group('dashed')
+    total = match.group('page_total') or match.group('total')
+    return int(number) > 0 and (total is None or int(number) <= int(total))
+
+def _furniture_key(line: str) -> str:
+    """Key under which header/footer lines match across pages even when page numbers differ"""
+    return _DIGITS_RE.sub("#", line.lower())
+
+def split_pages(text: str) -> list:
+    """Split extracted text into pages of normalized, non-empty lines"""
+    pages = []
+    for page in _PAGE_SPLIT_RE.split(text):
+        lines = [normalize_line(line) for line in page.splitlines()]
+        pages.append([line for line in lines if line])
+    return [page for page in pages if page]
+
+def find_page_furniture(pages: list) -> set:
+    """
+    Find header and footer lines repeated across pages.
+
+    Args:
+        pages: Pages as lists of normalized lines
+
+    Returns:
+        set: Furniture keys of lines found near the top or bottom of at least half the
+            pages (and at least two); lines without letters, such as dates, never qualify
+    """
+    if len(pages) < 2:
+        return set()
+    page_counts = {}
+    for lines in pages:
+        edge_keys = {_furniture_key(line) for line in lines[:FURNITURE_DEPTH] + lines[-FURNITURE_DEPTH:]}
+        for key in edge_keys:
+            if not _LETTER_RE.search(key):
+                continue
+            page_counts[key] = page_counts.get(key, 0) + 1
+    threshold = max(2, (len(pages) + 1) // 2)
+    return {key for key, count in page_counts.items() if count >= threshold}
+
+def clean_pages(text: str) -> list:
+    """
+    Normalize whitespace, drop page numbers and keep page furniture and long lines only once.
+
+    Args:
+        text: Extracted text, pages separated by form feeds
+
+    Returns:
+        list: Cleaned pages as lists of lines
+    """
+    pages = split_pages(text)
+    furniture = find_page_furniture(pages)
+    # Page numbers away from the page edges are only dropped when they run through the document
+    numbered_pages = sum(any(is_page_number(line) for line in lines) for lines in pages)
+    seen = set()
+    cleaned = []
+    for lines in pages:
+        kept = []
+        for position, line in enumerate(lines):
+            at_edge = position < FURNITURE_DEPTH or position >= len(lines) - FURNITURE_DEPTH
+            if (at_edge or numbered_pages >= 2) and is_page_number(line):
+                continue
+            # The first occurrence of a running header is kept since it often carries the candidate's name;
+            # other lines only count as duplicates when they match exactly, numbers included
+            key = _furniture_key(line)
+            if not (at_edge and key in furniture):
+                key = line.lower() if len(line) >= MIN_DEDUPE_CHARS else None
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            kept.append(line)
+        if kept:
+            cleaned.append(kept)
+    return cleaned
+
+def chunk_pages(pages: list, token_budget: int) -> list:
+    """
+    Greedily pack lines into chunks within the token budget, breaking at page boundaries when possible.
+
+    Args:
+        pages: Cleaned pages as lists of lines
+        token_budget: Maximum estimated tokens per chunk
+
+    Returns:
+        list: Chunk texts in document order
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+    for lines in pages:
+        page_text = "\n".join(lines)
+        page_tokens = estimate_tokens(page_text)
+        if current and current_tokens + page_tokens <= token_budget:
+            current.append(page_text)
+            current_tokens += page_tokens
+            continue
+        if current:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        if page_tokens <= token_budget:
+            current, current_tokens = [page_text], page_tokens
+            continue
+        # A single page over budget is split between lines
+        for line in lines:
+            line_tokens = estimate_tokens(line)
+            if current and current_tokens + line_tokens > token_budget:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(line)
+            current_tokens += line_tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+def compact_text(text: str, token_budget: int = TOKEN_BUDGET, max_chunks: int = MAX_CHUNKS) -> CompactedText:
+    """
+    Compact extracted resume text for prompting.
+
+    Args:
+        text: Extracted text, pages separated by form feeds
+        token_budget: Maximum estimated tokens per chunk (0 disables chunking)
+        max_chunks: Maximum number of chunks kept; later text is dropped
+
+    Returns:
+        CompactedText: Compacted text, its chunks and the token counts before and after
+    """
+    with timed("compact"):
+        pages = clean_pages(text)
+        compacted = "\n".join("\n".join(lines) for lines in pages)
+        chunks = chunk_pages(pages, token_budget) if token_budget else [compacted]
+        truncated = len(chunks) > max_chunks
+        if truncated:
+            chunks = chunks[:max_chunks]
+            compacted = "\n".join(chunks)
+        result = CompactedText(
+            text=compacted,
+            chunks=chunks,
+            tokens_before=estimate_tokens(text),
+            tokens_after=estimate_tokens(compacted),
+            truncated=truncated,
+        )
+    increment("prompt_tokens_saved_total", max(0, result.tokens_before - result.tokens_after))
+    return result
+
+if __name__ == "__main__":
+    import sys
+
+    with open(sys.argv[1] if len(sys.argv) > 1 else 'extracted_text.txt', 'r', encoding='utf-8') as f:
+        result = compact_text(f.read())
+    print(result.text)
+    print(result.report(), file=sys.stderr)